@@ -0,0 +1,134 @@
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from FTP.Common.constants import FTPResponseCode, DEFAULT_TIMEOUT
+from FTP.Common.exceptions import FTPConnectionError
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+
+class ActiveListenerPool:
+    """Sockets de escucha reutilizables para las conexiones de datos en modo activo.
+
+    En modo activo (PORT) el servidor se conecta a un puerto del cliente. Abrir
+    un listener por transferencia agota los puertos del rango permitido por el
+    firewall cuando hay muchas transferencias en paralelo, así que los
+    listeners se reutilizan: cada transferencia toma uno libre en exclusiva y
+    lo devuelve al terminar. Las conexiones que quedaron en la cola de un
+    listener (una transferencia rechazada, un servidor lento) se descartan
+    antes de volver a anunciarlo.
+
+    ``port_range`` es un ``(primero, último)`` inclusivo; sin él, el sistema
+    elige puertos libres.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port_range: Optional[Tuple[int, int]] = None,
+                 accept_timeout: float = DEFAULT_TIMEOUT):
+        self.host = host
+        self.port_range = port_range
+        self.accept_timeout = accept_timeout
+        self._idle: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._next_port = port_range[0] if port_range else 0
+        self._closed = False
+        # Contador para diagnóstico: listeners abiertos en total
+        self.created = 0
+
+    def _bind(self) -> socket.socket:
+        ports = [0]
+        if self.port_range:
+            first, last = self.port_range
+            count = last - first + 1
+            with self._lock:
+                start = self._next_port
+                self._next_port = first + (start - first + 1) % count
+            ports = [first + (start - first + i) % count for i in range(count)]
+        for port in ports:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                listener.bind((self.host, port))
+                listener.listen(1)
+            except OSError:
+                listener.close()
+                continue
+            with self._lock:
+                self.created += 1
+            return listener
+        raise FTPConnectionError(FTPResponseCode.CANNOT_OPEN_DATA_CONNECTION,
+                                 f"No hay puertos libres en el rango {self.port_range}")
+
+    @staticmethod
+    def _drain(listener: socket.socket) -> None:
+        """Cierra las conexiones pendientes en la cola del listener"""
+        listener.setblocking(False)
+        try:
+            while True:
+                stale, _ = listener.accept()
+                stale.close()
+        except (BlockingIOError, OSError):
+            pass
+        finally:
+            listener.setblocking(True)
+
+    def acquire(self) -> socket.socket:
+        """Listener libre para una transferencia (en exclusiva hasta ``release``)"""
+        with self._lock:
+            listener = self._idle.pop() if self._idle else None
+        if listener is None:
+            return self._bind()
+        self._drain(listener)
+        return listener
+
+    def release(self, listener: socket.socket) -> None:
+        self._drain(listener)
+        with self._lock:
+            if not self._closed:
+                self._idle.append(listener)
+                return
+        listener.close()
+
+    def accept(self, listener: socket.socket, peer: Optional[str] = None) -> socket.socket:
+        """Espera la conexión del servidor; ignora las que no vienen de ``peer``"""
+        deadline = time.monotonic() + self.accept_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FTPConnectionError(FTPResponseCode.CANNOT_OPEN_DATA_CONNECTION,
+                                         "Timeout esperando la conexión de datos del servidor")
+            listener.settimeout(remaining)
+            try:
+                conn, address = listener.accept()
+            except socket.timeout:
+                continue
+            finally:
+                listener.settimeout(None)
+            if peer is None or address[0] == peer:
+                # Bloqueante, igual que el socket de datos del modo pasivo
+                conn.settimeout(None)
+                return conn
+            logger.warning("Conexión de datos rechazada de %s (se esperaba %s)", address[0], peer)
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for listener in idle:
+            listener.close()
+
+
+_default_pool: Optional[ActiveListenerPool] = None
+_default_lock = threading.Lock()
+
+
+def default_listener_pool() -> ActiveListenerPool:
+    """Pool compartido por todos los clientes del proceso"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ActiveListenerPool()
+        return _default_pool
@@ -0,0 +1,523 @@
+import asyncio
+import os
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+from FTP.Client.client import DATA_COMMANDS, PASV_ADDRESS, REPLY_CODES
+from FTP.Common.constants import FTPResponseCode, DEFAULT_BUFFER_SIZE, DEFAULT_TIMEOUT
+from FTP.Common.exceptions import FTPClientError, FTPTransferError, FTPAuthError, FTPConnectionError
+from FTP.Common.logger import get_logger
+from FTP.Common.utils import (validate_transfer_type, validate_transfer_mode, validate_structure,
+                              parse_restart_marker, validate_path, parse_features_response,
+                              parse_list_line, parse_list_response, ListEntry)
+
+
+class AsyncFTPClient:
+    """Cliente FTP sobre streams de asyncio con la misma interfaz que ``FTPClient``.
+
+    Cada sesión usa dos streams (control y datos PASV) y ningún hilo, así que
+    un solo bucle de eventos puede atender cientos de sesiones a la vez. Los
+    métodos son corrutinas; ``iter_download``, ``iter_directory`` e
+    ``iter_files`` son iteradores asíncronos. Una sesión atiende una
+    operación cada vez: para trabajar en paralelo se abren varias.
+
+    Si se cancela la tarea durante una transferencia, se cierra la conexión
+    de datos, se envía ABOR y se consumen las respuestas pendientes, de modo
+    que la sesión sigue sirviendo. Las respuestas que quedan sin leer (un
+    iterador abandonado a medias) se descartan antes del siguiente comando.
+
+        async with AsyncFTPClient("127.0.0.1", 21) as client:
+            await client.login("admin", "admin123")
+            async for chunk in client.iter_download("datos.bin"):
+                ...
+    """
+
+    def __init__(self, host: str, port: int = 21, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.buffer_size = buffer_size
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._data_writer: Optional[asyncio.StreamWriter] = None
+        # Respuestas que el servidor aún debe enviar por comandos ya escritos
+        self._pending = 0
+        # Respuestas (1xx y final) de la última transferencia completada
+        self.last_transfer: Optional[str] = None
+        self.authenticated = False
+        self.logger = get_logger("ftp.client")
+        self.command_dispatcher: Dict[str, Callable] = {
+            "USER": self._handle_user,
+            "PASS": self._handle_pass,
+            "RETR": self.download_file,
+            "STOR": self.upload_file,
+            "APPE": self.append_file,
+            "STOU": self.store_unique,
+            "PWD": self.get_current_dir,
+            "CWD": self.change_dir,
+            "CDUP": self.change_to_parent_dir,
+            "MKD": self.make_dir,
+            "RMD": self.remove_dir,
+            "DELE": self.delete_file,
+            "RNFR": self.rename_from,
+            "RNTO": self.rename_to,
+            "TYPE": self.set_type,
+            "MODE": self.set_mode,
+            "STRU": self.set_structure,
+            "REIN": self.reinitialize,
+            "SYST": self.get_system,
+            "STAT": self.get_status,
+            "REST": self.set_restart_point,
+            "HELP": self.get_help,
+            "NOOP": self.noop,
+            "ABOR": self.abort,
+            "QUIT": self.quit,
+            "NLST": self.list_files,
+        }
+        self.transfer_type = 'A'
+        self.restart_point: Optional[int] = None
+        self.user: Optional[str] = None
+        self.password: Optional[str] = None
+
+    async def __aenter__(self) -> "AsyncFTPClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # ------------------------------------------------------------------ #
+    # Canal de control
+    # ------------------------------------------------------------------ #
+    async def connect(self) -> str:
+        """Establece conexión inicial con el servidor."""
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise FTPConnectionError(FTPResponseCode.BAD_COMMAND, f"Conexión fallida: {str(e)}")
+        self._pending = 1
+        return await self._get_response()
+
+    def _write_command(self, command: str, *args) -> str:
+        if self.writer is None:
+            raise FTPConnectionError(FTPResponseCode.COMMAND_NOT_ACCEPTED, "No hay conexión con el servidor")
+        cmd = f"{command} {' '.join(args)}".strip()
+        self.logger.debug("Enviando comando: %s", "PASS ****" if command.upper() == "PASS" else cmd)
+        self._pending += 1
+        return f"{cmd}\r\n"
+
+    async def send_command(self, command: str, *args) -> str:
+        """Envía un comando genérico al servidor."""
+        await self._sync()
+        self.writer.write(self._write_command(command, *args).encode())
+        return await self._get_response()
+
+    async def pipeline(self, *commands) -> list[str]:
+        """Envía varios comandos de una vez y devuelve sus respuestas en orden (ver ``FTPClient.pipeline``)."""
+        await self._sync()
+        lines = []
+        for command in commands:
+            command, *args = command.split(" ", 1) if isinstance(command, str) else command
+            if command.upper() in DATA_COMMANDS:
+                raise FTPClientError(FTPResponseCode.BAD_COMMAND,
+                                     f"{command} abre una conexión de datos y no se puede encadenar")
+            lines.append(self._write_command(command, *args))
+        self.writer.write("".join(lines).encode())
+        return [await self._get_response() for _ in lines]
+
+    async def execute(self, command: str, *args) -> str:
+        """Ejecuta un comando usando el dispatcher o envío genérico."""
+        args = tuple(arg for arg in args if arg != "")
+        cmd = command.upper()
+        if cmd in self.command_dispatcher:
+            return await self.command_dispatcher[cmd](*args)
+        return await self.send_command(command, *args)
+
+    async def _read_line(self) -> str:
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        except asyncio.TimeoutError:
+            raise FTPConnectionError(FTPResponseCode.COMMAND_NOT_ACCEPTED, "Timeout esperando respuesta")
+        if not line:
+            raise FTPConnectionError(FTPResponseCode.COMMAND_NOT_ACCEPTED, "El servidor cerró la conexión")
+        return line.rstrip(b"\r\n").decode(errors="ignore")
+
+    async def _get_response(self) -> str:
+        """Lee una respuesta completa (multilínea según RFC 959, como ``FTPClient``)."""
+        line = await self._read_line()
+        while not line:
+            line = await self._read_line()
+        lines = [line]
+        code = line[:3]
+        if line[3:4] == "-" and code in REPLY_CODES:
+            terminator = code + " "
+            while not (line.startswith(terminator) or line == code):
+                line = await self._read_line()
+                lines.append(line)
+        # Una respuesta 1xx es preliminar: el mismo comando tendrá otra
+        if not code.startswith("1"):
+            self._pending -= 1
+        return "\r\n".join(lines).strip()
+
+    async def _sync(self) -> None:
+        """Descarta las respuestas de una operación que quedó a medias"""
+        if not self._pending:
+            return
+        self._close_data()
+        while self._pending > 0:
+            self.logger.debug("Respuesta descartada: %s", await self._get_response())
+
+    def _parse_code(self, response: str) -> int:
+        """Código de la última línea de la respuesta (0 si no hay)."""
+        start = response.rfind("\n") + 1
+        return REPLY_CODES.get(response[start:start + 3], 0)
+
+    def _disconnect(self) -> None:
+        self._close_data()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+        self._pending = 0
+        self.authenticated = False
+
+    async def quit(self) -> str:
+        """Cierra la conexión."""
+        response = await self.send_command("QUIT")
+        self._disconnect()
+        return response
+
+    async def close(self) -> None:
+        """Cierra la sesión sin lanzar excepciones (QUIT si es posible)."""
+        try:
+            if self.writer is not None:
+                await self.quit()
+        except (OSError, FTPClientError):
+            pass
+        finally:
+            self._disconnect()
+
+    # ------------------------------------------------------------------ #
+    # Autenticación y comandos simples
+    # ------------------------------------------------------------------ #
+    async def _handle_user(self, username: str) -> str:
+        response = await self.send_command("USER", username)
+        if self._parse_code(response) not in (FTPResponseCode.PASSWORD_REQUIRED, FTPResponseCode.USER_LOGGED_IN):
+            raise FTPAuthError(self._parse_code(response), "Usuario inválido")
+        self.user = username
+        return response
+
+    async def _handle_pass(self, password: str) -> str:
+        response = await self.send_command("PASS", password)
+        if self._parse_code(response) != FTPResponseCode.USER_LOGGED_IN:
+            raise FTPAuthError(self._parse_code(response), "Contraseña inválida")
+        self.authenticated = True
+        self.password = password
+        return response
+
+    async def login(self, user: str, password: str) -> str:
+        """Autentica la sesión (USER + PASS en un solo envío)."""
+        user_response, pass_response = await self.pipeline(("USER", user), ("PASS", password))
+        code = self._parse_code(user_response)
+        if code not in (FTPResponseCode.PASSWORD_REQUIRED, FTPResponseCode.USER_LOGGED_IN):
+            raise FTPAuthError(code, "Usuario inválido")
+        self.user = user
+        if code != FTPResponseCode.USER_LOGGED_IN:
+            if self._parse_code(pass_response) != FTPResponseCode.USER_LOGGED_IN:
+                raise FTPAuthError(self._parse_code(pass_response), "Contraseña inválida")
+            user_response = pass_response
+        self.authenticated = True
+        self.password = password
+        return user_response
+
+    async def _expect(self, codes, error: str, command: str, *args) -> str:
+        response = await self.send_command(command, *args)
+        if self._parse_code(response) not in codes:
+            raise FTPClientError(self._parse_code(response), error)
+        return response
+
+    async def get_current_dir(self) -> str:
+        """Obtiene el directorio actual (PWD)."""
+        return await self._expect((FTPResponseCode.PATHNAME_CREATED,), "Error obteniendo directorio", "PWD")
+
+    async def change_dir(self, path: str) -> str:
+        """Cambia de directorio (CWD)."""
+        return await self._expect((250, FTPResponseCode.COMMAND_OK), "Error cambiando de directorio", "CWD", path)
+
+    async def change_to_parent_dir(self) -> str:
+        """Cambia al directorio padre (CDUP)."""
+        return await self._expect((250, FTPResponseCode.COMMAND_OK), "Error cambiando al directorio padre", "CDUP")
+
+    async def make_dir(self, path: str) -> str:
+        """Crea un directorio (MKD)."""
+        return await self._expect((FTPResponseCode.PATHNAME_CREATED,), "Error creando directorio", "MKD", path)
+
+    async def remove_dir(self, path: str) -> str:
+        """Elimina un directorio (RMD)."""
+        return await self._expect((250,), "Error eliminando directorio", "RMD", path)
+
+    async def delete_file(self, filename: str) -> str:
+        """Elimina un archivo (DELE)."""
+        return await self._expect((250,), "Error eliminando archivo", "DELE", filename)
+
+    async def rename_from(self, old_name: str) -> str:
+        """Inicia renombrado (RNFR)."""
+        return await self._expect((FTPResponseCode.FILE_ACTION_PENDING,), "RNFR fallido", "RNFR", old_name)
+
+    async def rename_to(self, new_name: str) -> str:
+        """Completa renombrado (RNTO)."""
+        return await self._expect((FTPResponseCode.FILE_ACTION_COMPLETED, 250), "RNTO fallido", "RNTO", new_name)
+
+    async def rename_file(self, old_name: str, new_name: str) -> str:
+        """Maneja la secuencia completa RNFR/RNTO."""
+        return await self.rename_from(old_name) + "\n" + await self.rename_to(new_name)
+
+    async def set_type(self, type_char: str, format_char: str = None) -> str:
+        """Configura el tipo de transferencia."""
+        if not validate_transfer_type(type_char, format_char):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Tipo de transferencia inválido")
+        response = await self.send_command("TYPE", *([type_char, format_char] if format_char else [type_char]))
+        if self._parse_code(response) == FTPResponseCode.COMMAND_OK:
+            self.transfer_type = type_char
+        return response
+
+    async def set_mode(self, mode: str) -> str:
+        """Configura el modo de transferencia."""
+        if not validate_transfer_mode(mode):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Modo de transferencia inválido")
+        return await self.send_command("MODE", mode)
+
+    async def set_structure(self, structure: str) -> str:
+        """Configura la estructura de archivo."""
+        if not validate_structure(structure):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Estructura inválida")
+        return await self.send_command("STRU", structure)
+
+    async def set_restart_point(self, marker: str) -> str:
+        """Punto de reinicio para la próxima transferencia (REST)."""
+        position = parse_restart_marker(str(marker))
+        if position is None:
+            raise FTPClientError(FTPResponseCode.SYNTAX_ERROR, "Marcador de reinicio inválido")
+        response = await self.send_command("REST", str(position))
+        if self._parse_code(response) != FTPResponseCode.FILE_ACTION_PENDING:
+            raise FTPClientError(self._parse_code(response), "REST fallido")
+        # Se vuelve a enviar justo antes de la transferencia, como en FTPClient
+        self.restart_point = position
+        return response
+
+    async def reinitialize(self) -> str:
+        """Reinicia la sesión (REIN)."""
+        response = await self.send_command("REIN")
+        self.authenticated = False
+        return response
+
+    async def get_system(self) -> str:
+        """Obtiene el tipo de sistema (SYST)."""
+        return await self.send_command("SYST")
+
+    async def get_status(self, path: str = "") -> str:
+        """Obtiene el estado del servidor o archivo."""
+        return await self.send_command("STAT", path)
+
+    async def get_help(self, command: str = "") -> str:
+        """Obtiene ayuda sobre comandos."""
+        return await self.send_command("HELP", command)
+
+    async def noop(self) -> str:
+        """Mantiene la conexión activa."""
+        return await self.send_command("NOOP")
+
+    async def abort(self) -> str:
+        """Envía ABOR fuera de una transferencia (dentro, basta con cancelar la tarea)."""
+        return await self.send_command("ABOR")
+
+    async def get_size(self, path: str) -> int:
+        """Tamaño en bytes de un archivo remoto (SIZE)."""
+        response = await self._expect((FTPResponseCode.FILE_STATUS,), "Error obteniendo el tamaño", "SIZE", path)
+        return int(response.split()[1])
+
+    async def get_features(self) -> dict:
+        """Obtiene y parsea características del servidor."""
+        return parse_features_response(await self.send_command("FEAT"))
+
+    # ------------------------------------------------------------------ #
+    # Conexión de datos
+    # ------------------------------------------------------------------ #
+    def _close_data(self, writer: Optional[asyncio.StreamWriter] = None) -> None:
+        """Cierra ``writer`` (por defecto, la conexión de datos actual)"""
+        writer = writer or self._data_writer
+        if writer is not None:
+            writer.close()
+            if writer is self._data_writer:
+                self._data_writer = None
+
+    async def _passive_connection(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        response = await self.send_command("PASV")
+        match = PASV_ADDRESS.search(response)
+        if self._parse_code(response) != FTPResponseCode.PASSIVE_MODE or not match:
+            raise FTPConnectionError(self._parse_code(response), "Respuesta PASV inválida")
+        h1, h2, h3, h4, p1, p2 = match.groups()
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(f"{h1}.{h2}.{h3}.{h4}", (int(p1) << 8) + int(p2)), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise FTPConnectionError(FTPResponseCode.CANNOT_OPEN_DATA_CONNECTION, f"Conexión de datos fallida: {e}")
+
+    async def _abort_transfer(self) -> None:
+        """Tras una cancelación: cierra los datos, envía ABOR y consume las respuestas pendientes"""
+        self._close_data()
+        try:
+            self.writer.write(self._write_command("ABOR").encode())
+            # Sin ABOR en curso el servidor responde 226 a la transferencia y al ABOR;
+            # abortada, 426 y 226
+            await self._sync()
+        except BaseException:
+            # Sin poder resincronizar el canal de control, la sesión no sirve
+            self._disconnect()
+            raise
+
+    async def _open_transfer(self, command: str, *args) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, str]:
+        """PASV + (REST) + comando de transferencia; devuelve los streams de datos y la respuesta 1xx"""
+        await self._sync()
+        reader, writer = await self._passive_connection()
+        self._data_writer = writer
+        try:
+            if self.restart_point is not None:
+                offset, self.restart_point = self.restart_point, None
+                response = await self.send_command("REST", str(offset))
+                if self._parse_code(response) != FTPResponseCode.FILE_ACTION_PENDING:
+                    raise FTPTransferError(self._parse_code(response), "El servidor no acepta REST")
+            response = await self.send_command(command, *args)
+        except asyncio.CancelledError:
+            await self._abort_transfer()
+            raise
+        except BaseException:
+            self._close_data()
+            raise
+        if self._parse_code(response) not in (125, 150):
+            self._close_data()
+            raise FTPTransferError(self._parse_code(response), f"Error en {command}")
+        return reader, writer, response
+
+    async def _finish_transfer(self, command: str, response: str) -> str:
+        self._close_data()
+        final_response = await self._get_response()
+        if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
+            raise FTPTransferError(self._parse_code(final_response), f"Error en {command} final")
+        self.last_transfer = response + "\n" + final_response
+        return self.last_transfer
+
+    async def _iter_data(self, command: str, *args) -> AsyncIterator[bytes]:
+        """Bloques del canal de datos de un RETR/LIST/NLST según llegan"""
+        reader, writer, response = await self._open_transfer(command, *args)
+        try:
+            while True:
+                chunk = await reader.read(self.buffer_size)
+                if not chunk:
+                    break
+                yield chunk
+        except asyncio.CancelledError:
+            await self._abort_transfer()
+            raise
+        except BaseException:
+            # También GeneratorExit (el consumidor dejó de iterar): la respuesta final se
+            # descarta en el próximo comando. Solo se cierra la conexión de esta
+            # transferencia, el cierre puede llegar tarde desde el recolector
+            self._close_data(writer)
+            raise
+        await self._finish_transfer(command, response)
+
+    async def _send_file(self, command: str, local_path: str, *args) -> str:
+        _, writer, response = await self._open_transfer(command, *args)
+        try:
+            with open(local_path, "rb") as f:
+                while True:
+                    chunk = f.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except asyncio.CancelledError:
+            await self._abort_transfer()
+            raise
+        except BaseException:
+            self._close_data()
+            raise
+        return await self._finish_transfer(command, response)
+
+    # ------------------------------------------------------------------ #
+    # Transferencias
+    # ------------------------------------------------------------------ #
+    def iter_download(self, remote_path: str) -> AsyncIterator[bytes]:
+        """Descarga en streaming (RETR): produce los bloques según llegan."""
+        if remote_path and not validate_path(remote_path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Nombre de archivo inválido")
+        return self._iter_data("RETR", remote_path)
+
+    async def download_file(self, remote_path: str, local_path: str = None) -> str:
+        """Descarga un archivo usando RETR (desde el punto de REST si lo hay)."""
+        if local_path is None:
+            local_path = remote_path
+        offset = self.restart_point or 0
+        with open(local_path, "r+b" if offset and os.path.exists(local_path) else "wb") as f:
+            if offset:
+                f.seek(offset)
+                f.truncate()
+            async for chunk in self.iter_download(remote_path):
+                f.write(chunk)
+        return self.last_transfer
+
+    async def upload_file(self, local_path: str, remote_path: str) -> str:
+        """Sube un archivo usando STOR."""
+        if remote_path and not validate_path(remote_path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
+        return await self._send_file("STOR", local_path, remote_path)
+
+    async def append_file(self, local_path: str, remote_path: str) -> str:
+        """Añade datos a un archivo remoto usando APPE."""
+        if not validate_path(remote_path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
+        return await self._send_file("APPE", local_path, remote_path)
+
+    async def store_unique(self, local_path: str) -> str:
+        """Almacena un archivo con nombre único (STOU)."""
+        return await self._send_file("STOU", local_path)
+
+    async def _iter_lines(self, command: str, path: str) -> AsyncIterator[str]:
+        if path and not validate_path(path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
+        pending = b""
+        # aclosing: si el consumidor para, la transferencia se cierra con este iterador
+        async with aclosing(self._iter_data(command, path)) as chunks:
+            async for chunk in chunks:
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    yield line.rstrip(b"\r").decode(errors="ignore")
+        if pending.strip():
+            yield pending.rstrip(b"\r").decode(errors="ignore")
+
+    async def iter_directory(self, path: str = "") -> AsyncIterator[ListEntry]:
+        """Listado LIST en streaming: un ``ListEntry`` por entrada."""
+        async for line in self._iter_lines("LIST", path):
+            entry = parse_list_line(line)
+            if entry is not None:
+                yield entry
+
+    async def iter_files(self, path: str = "") -> AsyncIterator[str]:
+        """Listado NLST en streaming: un nombre por línea."""
+        async for line in self._iter_lines("NLST", path):
+            if line:
+                yield line
+
+    async def list_directory(self, path: str = "") -> list[dict]:
+        """Lista directorio con formato estructurado."""
+        lines = [line async for line in self._iter_lines("LIST", path)]
+        return parse_list_response("\n".join(lines)) if lines else []
+
+    async def list_files(self, path: str = "") -> str:
+        """Lista solo nombres de archivos usando NLST."""
+        return "".join([f"{line}\r\n" async for line in self._iter_lines("NLST", path)])
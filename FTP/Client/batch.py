@@ -0,0 +1,256 @@
+import fnmatch
+import os
+import posixpath
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from FTP.Client.client import FTPClient
+from FTP.Client.pool import FTPConnectionPool
+from FTP.Client.retry import is_transient
+from FTP.Common.constants import FTPResponseCode
+from FTP.Common.exceptions import FTPClientError
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+# Caracteres que convierten un argumento de mget en un patrón
+GLOB_CHARS = "*?["
+
+
+class TransferJob:
+    """Un archivo de un lote: origen, destino, tamaño y resultado."""
+
+    def __init__(self, source: str, target: str, size: int):
+        self.source = source
+        self.target = target
+        self.size = size
+        self.attempts = 0
+        self.error: Optional[Exception] = None
+        self.done = False
+
+
+class BatchResult:
+    """Resumen de un lote: archivos completados, fallidos y throughput."""
+
+    def __init__(self, jobs: List[TransferJob], elapsed: float, workers: int):
+        self.jobs = jobs
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def completed(self) -> List[TransferJob]:
+        return [job for job in self.jobs if job.done]
+
+    @property
+    def failed(self) -> List[TransferJob]:
+        return [job for job in self.jobs if not job.done]
+
+    @property
+    def bytes(self) -> int:
+        return sum(job.size for job in self.jobs if job.done)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes por segundo de los archivos completados"""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        text = (f"{len(self.completed)}/{len(self.jobs)} archivos, {self.bytes} bytes en "
+                f"{self.elapsed:.2f} s ({self.throughput / 1024 ** 2:.2f} MB/s, "
+                f"{len(self.jobs) / self.elapsed if self.elapsed else 0.0:.1f} archivos/s, "
+                f"{self.workers} sesiones)")
+        for job in self.failed:
+            text += f"\n  fallo: {job.source} ({job.attempts} intentos): {job.error}"
+        return text
+
+
+class BatchTransfer:
+    """Reparte un lote de transferencias entre varias sesiones de un pool.
+
+    Los archivos se ordenan de mayor a menor tamaño (los grandes empiezan
+    antes y los pequeños rellenan huecos al final, así ninguna sesión se
+    queda sola con el archivo más grande). Cada archivo se reintenta hasta
+    ``retries`` veces si el error es transitorio. ``progress`` recibe
+    ``(job, archivos_hechos, archivos_totales, bytes_hechos, bytes_totales)``
+    al terminar cada archivo y también durante las transferencias: el
+    ``progress_callback`` de cada sesión suma sus bytes al total del lote.
+    """
+
+    def __init__(self, pool: FTPConnectionPool, workers: int = 4, retries: int = 2,
+                 retry_delay: float = 0.5, progress: Optional[Callable] = None):
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.progress = progress
+
+    def _attempt(self, job: TransferJob, transfer: Callable[[FTPClient, TransferJob], None],
+                 on_bytes: Optional[Callable] = None) -> None:
+        while True:
+            job.attempts += 1
+            try:
+                with self.pool.connection() as client:
+                    previous = client.progress_callback
+                    client.progress_callback = on_bytes
+                    try:
+                        transfer(client, job)
+                    finally:
+                        client.progress_callback = previous
+                job.done, job.error = True, None
+                return
+            except Exception as e:
+                job.error = e
+                if job.attempts > self.retries or not is_transient(e):
+                    logger.warning("Fallo transfiriendo %s: %s", job.source, e)
+                    return
+                logger.debug("Reintentando %s (%s): %s", job.source, job.attempts, e)
+                time.sleep(self.retry_delay * job.attempts)
+
+    def run(self, jobs: Iterable[TransferJob],
+            transfer: Callable[[FTPClient, TransferJob], None]) -> BatchResult:
+        pending = sorted(jobs, key=lambda job: job.size, reverse=True)
+        total_files, total_bytes = len(pending), sum(job.size for job in pending)
+        queue = list(reversed(pending))
+        lock = threading.Lock()
+        state = {"files": 0, "bytes": 0}
+        # Bytes ya transferidos de los archivos en curso, según su sesión
+        live: Dict[TransferJob, int] = {}
+
+        def tracker(job: TransferJob) -> Optional[Callable]:
+            if not self.progress:
+                return None
+
+            def update(stats):
+                with lock:
+                    live[job] = stats.bytes
+                    files, done = state["files"], state["bytes"] + sum(live.values())
+                self.progress(job, files, total_files, done, total_bytes)
+            return update
+
+        def worker():
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    job = queue.pop()
+                self._attempt(job, transfer, tracker(job))
+                with lock:
+                    live.pop(job, None)
+                    state["files"] += 1
+                    state["bytes"] += job.size
+                    files, done = state["files"], state["bytes"] + sum(live.values())
+                if self.progress:
+                    self.progress(job, files, total_files, done, total_bytes)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, daemon=True)
+                   for _ in range(min(self.workers, total_files))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return BatchResult(pending, time.perf_counter() - start, len(threads))
+
+
+def remote_cwd(client: FTPClient) -> str:
+    """Directorio actual de ``client`` según PWD"""
+    response = client.get_current_dir()
+    start, end = response.find('"'), response.rfind('"')
+    return response[start + 1:end] if 0 <= start < end else "/"
+
+
+def root_relative(cwd: str, path: str) -> str:
+    """Ruta relativa a la raíz: las sesiones del pool empiezan siempre en ``/``"""
+    return posixpath.normpath(posixpath.join(cwd, path)).lstrip("/") or "."
+
+
+def list_files(client: FTPClient, path: str, mlsd: bool) -> Dict[str, int]:
+    """Archivos (sin directorios) de ``path`` con su tamaño: MLSD si está, si no LIST"""
+    if mlsd:
+        return {entry.name: entry.size or 0 for entry in client.iter_mlsd(path) if entry.type == "file"}
+    # El LIST de este servidor no marca los directorios; el formato ls -l sí
+    return {entry.name: entry.size for entry in client.iter_directory(path) if entry.type != "d"}
+
+
+def expand_remote(client: FTPClient, patterns: Iterable[str]) -> Dict[str, int]:
+    """Expande patrones remotos a archivos (un listado por directorio) y devuelve ruta -> tamaño"""
+    mlsd = "MLST" in client.get_features()
+    listings: Dict[str, Dict[str, int]] = {}
+    found: Dict[str, int] = {}
+    for pattern in patterns:
+        parent, name = posixpath.split(pattern)
+        if parent not in listings:
+            try:
+                listings[parent] = list_files(client, parent, mlsd)
+            except FTPClientError:
+                listings[parent] = {}
+        entries = listings[parent]
+        if any(char in name for char in GLOB_CHARS):
+            for match in sorted(fnmatch.filter(entries, name)):
+                found[posixpath.join(parent, match)] = entries[match]
+        else:
+            # Si no aparece en el listado se intenta igual y el error queda en el resumen
+            found[pattern] = entries.get(name, 0)
+    return found
+
+
+def _download(client: FTPClient, job: TransferJob) -> None:
+    # Se escribe en .part y se renombra: un fallo no deja archivos a medias
+    partial = job.target + ".part"
+    try:
+        client.download_file(job.source, partial)
+        os.replace(partial, job.target)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def _upload(client: FTPClient, job: TransferJob) -> None:
+    client.upload_file(job.source, job.target)
+
+
+def _replace_remote(client: FTPClient, local_path: str, remote_path: str) -> None:
+    """Sube a un nombre temporal y lo renombra sobre el destino (STOR no sobrescribe)"""
+    parent, name = posixpath.split(remote_path)
+    partial = posixpath.join(parent, f".{name}.part")
+    # Un temporal de una ejecución fallida haría que STOR guardase con otro nombre
+    client.pipeline(("DELE", partial))
+    client.upload_file(local_path, partial)
+    for response in client.pipeline(("RNFR", partial), ("RNTO", remote_path)):
+        if client._parse_code(response) not in (250, FTPResponseCode.FILE_ACTION_PENDING):
+            raise FTPClientError(client._parse_code(response), f"Error reemplazando {remote_path}")
+
+
+def _upload_replace(client: FTPClient, job: TransferJob) -> None:
+    _replace_remote(client, job.source, job.target)
+
+
+def mget(client: FTPClient, remote_paths: Iterable[str], local_dir: str = ".", workers: int = 4,
+         retries: int = 2, progress: Optional[Callable] = None) -> BatchResult:
+    """Descarga en paralelo archivos o patrones remotos (relativos al directorio de ``client``)"""
+    cwd = remote_cwd(client)
+    pool = client.parallel_pool(workers)
+    with pool.connection() as session:
+        sizes = expand_remote(session, [root_relative(cwd, path) for path in remote_paths])
+    os.makedirs(local_dir, exist_ok=True)
+    jobs = [TransferJob(path, os.path.join(local_dir, posixpath.basename(path)), size)
+            for path, size in sizes.items()]
+    return BatchTransfer(pool, workers, retries, progress=progress).run(jobs, _download)
+
+
+def mput(client: FTPClient, local_paths: Iterable[str], remote_dir: str = "", workers: int = 4,
+         retries: int = 2, progress: Optional[Callable] = None) -> BatchResult:
+    """Sube en paralelo archivos locales a ``remote_dir`` (relativo al directorio de ``client``).
+
+    STOR de este servidor no sobrescribe (guarda "nombre (1)"), así que cada
+    archivo se sube a un temporal y se renombra sobre el destino: repetir
+    un ``mput`` reemplaza los archivos en vez de duplicarlos.
+    """
+    base = root_relative(remote_cwd(client), remote_dir)
+    jobs = []
+    for path in local_paths:
+        target = posixpath.join(base, os.path.basename(path)) if base != "." else os.path.basename(path)
+        jobs.append(TransferJob(path, target, os.path.getsize(path)))
+    return BatchTransfer(client.parallel_pool(workers), workers, retries, progress=progress).run(jobs, _upload_replace)
@@ -0,0 +1,73 @@
+import posixpath
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Comandos que modifican el árbol remoto: invalidan el directorio afectado
+MUTATING_COMMANDS = frozenset(("STOR", "STOU", "APPE", "DELE", "MKD", "RMD", "RNFR", "RNTO", "MFMT", "SITE"))
+
+
+def absolute_path(cwd: str, path: str) -> str:
+    """Ruta remota absoluta y normalizada de ``path`` visto desde ``cwd``"""
+    return posixpath.normpath(posixpath.join(cwd or "/", path or "."))
+
+
+class ListingCache:
+    """Resultados de LIST/NLST por ruta remota absoluta, con caducidad.
+
+    Es opcional (``FTPClient.enable_cache``). Las entradas caducan a los
+    ``ttl`` segundos. Los comandos que cambian el árbol (STOR, DELE, RNTO,
+    MKD, RMD...) enviados por el mismo cliente invalidan la ruta afectada,
+    su directorio padre y todo lo que cuelga de ella. Los cambios hechos
+    por otros clientes solo se ven cuando la entrada caduca.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, kind: str, path: str) -> Optional[Any]:
+        key = (kind, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, kind: str, path: str, value: Any) -> None:
+        with self._lock:
+            self._entries[(kind, path)] = (time.monotonic() + self.ttl, value)
+
+    def invalidate_entry(self, kind: str, path: str) -> None:
+        with self._lock:
+            if self._entries.pop((kind, path), None) is not None:
+                self.invalidations += 1
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Descarta ``path``, su padre y sus descendientes (todo si ``path`` es None)"""
+        with self._lock:
+            if path is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            parent = posixpath.dirname(path)
+            prefix = path.rstrip("/") + "/"
+            stale = [key for key in self._entries
+                     if key[1] in (path, parent) or key[1].startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
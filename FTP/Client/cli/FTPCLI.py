@@ -1,14 +1,47 @@
 import cmd
+import glob
+import os
+import shlex
+import time
+from typing import TYPE_CHECKING, Optional
 from FTP.Client.client import FTPClient
+from FTP.Client.active import ActiveListenerPool
+from FTP.Client.keepalive import IdleKeepalive
+# Console, Text y Style se necesitan al arrancar; rich.progress y rich.table
+# (y la cola de segundo plano o el modo script) se importan al usarlos
 from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.panel import Panel
-from rich import print as rprint
+from rich.markup import escape
 from rich.text import Text
 from rich.style import Style
 import re
 
+if TYPE_CHECKING:
+    from FTP.Client.jobs import TransferQueue
+
+# Sesiones (y transferencias simultáneas) de la cola de segundo plano
+BACKGROUND_WORKERS = 2
+
+
+def spinner(transient: bool = False):
+    """Progress con spinner para operaciones sin tamaño conocido"""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    return Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=transient)
+
+
+def transfer_bar(console: Console, transient: bool = True, elapsed: bool = False):
+    """Progress con barra, bytes, velocidad y tiempo restante (o transcurrido)"""
+    from rich.progress import (Progress, TextColumn, BarColumn, DownloadColumn, TransferSpeedColumn,
+                               TimeElapsedColumn, TimeRemainingColumn)
+    return Progress(TextColumn("[progress.description]{task.description}"), BarColumn(), DownloadColumn(),
+                    TransferSpeedColumn(), TimeElapsedColumn() if elapsed else TimeRemainingColumn(),
+                    console=console, transient=transient)
+
+
+def new_table(**kwargs):
+    from rich.table import Table
+    return Table(**kwargs)
+
+
 class FTPCLI(cmd.Cmd):
     # Usando Text de rich para el intro para asegurar el color
     intro = None  # Cambiado a None para evitar que cmd.Cmd lo imprima
@@ -27,6 +60,10 @@ class FTPCLI(cmd.Cmd):
         self.console = Console()
         self.client = client
         self.connected = client is not None
+        # NOOP periódico mientras la sesión está parada (comando keepalive)
+        self.keepalive: Optional[IdleKeepalive] = None
+        # Cola de transferencias en segundo plano (bg/jobs/wait/cancel), con sesiones propias
+        self.transfers: Optional["TransferQueue"] = None
         # Configurar el estilo del prompt
         self.prompt_style = Style(color="green", bold=True)
         
@@ -39,6 +76,19 @@ class FTPCLI(cmd.Cmd):
             return ""
         return line
 
+    def onecmd(self, line):
+        """Ejecuta el comando; con keepalive activo, sin NOOP intercalados"""
+        keepalive = self.keepalive
+        if keepalive is None:
+            return super().onecmd(line)
+        with keepalive.busy():
+            stop = super().onecmd(line)
+            # connect puede haber creado otro cliente; keepalive off/<segundos>
+            # puede haber retirado o sustituido este keepalive
+            if self.keepalive is keepalive:
+                keepalive.client = self.client
+        return stop
+
     def preloop(self):
         """Se ejecuta antes de iniciar el loop de comandos"""
         # Imprimir el banner de inicio con rich
@@ -58,13 +108,13 @@ class FTPCLI(cmd.Cmd):
         host = args[0]
         port = int(args[1]) if len(args) > 1 else 21
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}")
-        ) as progress:
+        with spinner() as progress:
             task = progress.add_task(description=f"Conectando a {host}:{port}...", total=None)
             try:
+                self._close_transfers()
+                tcp_keepalive = getattr(self.client, "tcp_keepalive", None)
                 self.client = FTPClient(host, port)
+                self.client.tcp_keepalive = tcp_keepalive
                 self.client.connect()
                 self.connected = True
                 self.console.print("[green]✓ Conexión establecida[/green]")
@@ -105,7 +155,7 @@ class FTPCLI(cmd.Cmd):
             return
 
         try:
-            with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
+            with spinner() as progress:
                 task = progress.add_task(description="Autenticando...", total=None)
                 response = self.client.execute("USER", args[0])
                 self.console.print(f"[cyan]{response}[/cyan]")
@@ -173,26 +223,28 @@ class FTPCLI(cmd.Cmd):
             self.console.print(f"[red]Error: {str(e)}[/red]")
 
     def do_retr(self, arg):
-        """Downloads a file: RETR <remote_path> <local_path>"""
+        """Downloads a file: RETR <remote_path> <local_path> [segmentos]"""
         args = arg.split()
-        if len(args) != 2:
-            self.console.print("[red]Error: Uso: RETR <remote_path> <local_path>[/red]")
-            self.console.print("[yellow]Ejemplo: retr archivo.txt descarga.txt[/yellow]")
+        if len(args) not in (2, 3) or (len(args) == 3 and not args[2].isdigit()):
+            self.console.print("[red]Error: Uso: RETR <remote_path> <local_path> [segmentos][/red]")
+            self.console.print("[yellow]Ejemplo: retr archivo.txt descarga.txt 4[/yellow]")
             return
 
-        remote_path, local_path = args
+        remote_path, local_path = args[:2]
+        # Con segmentos > 1 el archivo se descarga por rangos en paralelo (REST)
+        segments = int(args[2]) if len(args) == 3 else 1
         try:
-            # Solo mostramos una barra de progreso y la respuesta final
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                transient=True
-            ) as progress:
-                task = progress.add_task("[cyan]Descargando archivo...", total=None)
-                response = self.client.download_file(remote_path, local_path)
-                
+            # Tamaño total para la barra (sin SIZE, la barra queda indeterminada)
+            try:
+                total = self.client.get_size(remote_path)
+            except Exception:
+                total = None
+            response = self._run_transfer("Descargando archivo...", total,
+                                          lambda: self.client.download_file(remote_path, local_path, segments))
+
             if "226" in response:  # Transferencia exitosa
                 self.console.print(f"[green]✓ Archivo descargado exitosamente como '{local_path}'[/green]")
+                self._print_transfer_stats()
             else:
                 self.console.print(f"[yellow]{response}[/yellow]")
 
@@ -214,24 +266,44 @@ class FTPCLI(cmd.Cmd):
                 self.console.print(f"[red]Error: El archivo local '{args[0]}' no existe[/red]")
                 return
 
-            # Solo mostramos una barra de progreso y la respuesta final
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                transient=True  # Esto hace que la barra desaparezca al completar
-            ) as progress:
-                task = progress.add_task("[cyan]Subiendo archivo...", total=None)
-                response = self.client.upload_file(args[0], args[1])
-                
+            response = self._run_transfer("Subiendo archivo...", Path(args[0]).stat().st_size,
+                                          lambda: self.client.upload_file(args[0], args[1]))
+
             # Mostrar solo el mensaje de éxito
             if "226" in response:  # Si la transferencia fue exitosa
                 self.console.print("[green]✓ Archivo subido exitosamente[/green]")
+                self._print_transfer_stats()
             else:
                 self.console.print(f"[yellow]{response}[/yellow]")
                 
         except Exception as e:
             self.console.print(f"[red]✗ Error: {e}[/red]")
 
+    def _run_transfer(self, description, total, transfer):
+        """Ejecuta ``transfer()`` con una barra alimentada por el ``progress_callback`` del cliente"""
+        # La barra desaparece al completar
+        with transfer_bar(self.console) as progress:
+            task = progress.add_task(f"[cyan]{description}", total=total)
+
+            def update(stats):
+                progress.update(task, completed=stats.bytes, total=stats.total or total)
+
+            previous = self.client.progress_callback
+            self.client.progress_callback = update
+            try:
+                return transfer()
+            finally:
+                self.client.progress_callback = previous
+
+    def _print_transfer_stats(self):
+        """Resumen de la última transferencia: bytes, tiempo, velocidad media y primer byte"""
+        stats = self.client.last_transfer_stats
+        if stats is None:
+            return
+        ttfb = f", primer byte en {stats.first_byte * 1000:.0f} ms" if stats.first_byte is not None else ""
+        self.console.print(f"[blue]{stats.bytes} bytes en {stats.elapsed:.2f} s "
+                           f"({stats.average_rate / 1024 ** 2:.2f} MB/s{ttfb})[/blue]")
+
     def do_appe(self, arg):
         """Añade datos a un archivo: APPE <local_path> <remote_path>"""
         args = arg.split()
@@ -271,13 +343,267 @@ class FTPCLI(cmd.Cmd):
             self.console.print(f"[red]✗ Error: {str(e)}[/red]")
             self.console.print("[yellow]Tip: Verifique permisos y espacio disponible[/yellow]")
 
+    def _transfer_queue(self):
+        """Cola de segundo plano; se recrea si cambió el usuario de la sesión"""
+        if self.transfers is not None and (self.transfers.pool.user, self.transfers.pool.password) != (
+                self.client.user, self.client.password):
+            self._close_transfers()
+        if self.transfers is None:
+            from FTP.Client.jobs import TransferQueue
+            from FTP.Client.pool import FTPConnectionPool
+            self.transfers = TransferQueue(FTPConnectionPool.from_client(self.client, size=BACKGROUND_WORKERS),
+                                           workers=BACKGROUND_WORKERS)
+        return self.transfers
+
+    def _close_transfers(self):
+        if self.transfers is not None:
+            self.transfers.close()
+            self.transfers = None
+
+    def do_bg(self, arg):
+        """Transferencia en segundo plano: bg retr <remoto> <local> | bg stor|appe <local> <remoto>"""
+        args = shlex.split(arg)
+        if len(args) != 3 or args[0].lower() not in ("retr", "stor", "appe"):
+            self.console.print("[red]Error: Uso: bg retr <remoto> <local> | bg stor|appe <local> <remoto>[/red]")
+            return
+        command, source, target = args[0].upper(), args[1], args[2]
+        from FTP.Client.batch import remote_cwd, root_relative
+        try:
+            # Las sesiones de la cola empiezan en la raíz: rutas remotas relativas a ella
+            cwd = remote_cwd(self.client)
+            if command == "RETR":
+                try:
+                    total = self.client.get_size(source)
+                except Exception:
+                    total = None
+                source = root_relative(cwd, source)
+            else:
+                if not os.path.isfile(source):
+                    self.console.print(f"[red]Error: El archivo local '{source}' no existe[/red]")
+                    return
+                total = os.path.getsize(source)
+                target = root_relative(cwd, target)
+            job = self._transfer_queue().submit(command, source, target, total)
+            self.console.print(f"[green]✓ [{job.id}] {command} {args[1]} en segundo plano[/green]")
+        except Exception as e:
+            self.console.print(f"[red]✗ Error: {e}[/red]")
+
+    def do_jobs(self, arg):
+        """Lista las transferencias en segundo plano: jobs"""
+        from FTP.Client.jobs import BackgroundJob
+        if self.transfers is None or not self.transfers.jobs():
+            self.console.print("[yellow]No hay transferencias en segundo plano[/yellow]")
+            return
+        table = new_table(show_header=True, header_style="bold magenta")
+        for column in ("ID", "Estado", "Comando", "Archivo", "Progreso", "Velocidad"):
+            table.add_column(column)
+        for job in self.transfers.jobs():
+            progress = f"{job.bytes / 1024 ** 2:.1f} MB"
+            if job.total:
+                progress += f" ({job.bytes / job.total:.0%})"
+            state = job.state if job.error is None or job.state != BackgroundJob.FAILED else f"error: {job.error}"
+            table.add_row(str(job.id), state, job.command, job.source, progress,
+                          f"{job.rate / 1024 ** 2:.2f} MB/s" if job.progress is not None else "-")
+        self.console.print(table)
+        stats = self.transfers.stats()
+        self.console.print(f"[blue]{stats['states'][BackgroundJob.RUNNING]} activas, "
+                           f"{stats['states'][BackgroundJob.QUEUED]} en cola; "
+                           f"velocidad total {stats['rate'] / 1024 ** 2:.2f} MB/s, "
+                           f"{stats['bytes'] / 1024 ** 2:.1f} MB transferidos[/blue]")
+
+    def do_wait(self, arg):
+        """Espera a las transferencias en segundo plano: wait [id] (Ctrl-C deja de esperar)"""
+        from FTP.Client.jobs import BackgroundJob
+        if self.transfers is None:
+            self.console.print("[yellow]No hay transferencias en segundo plano[/yellow]")
+            return
+        if arg.strip() and (not arg.strip().isdigit() or self.transfers.get(int(arg)) is None):
+            self.console.print("[red]Error: Uso: wait [id][/red]")
+            return
+        jobs = [self.transfers.get(int(arg))] if arg.strip() else self.transfers.jobs()
+        jobs = [job for job in jobs if not job.finished]
+        try:
+            with transfer_bar(self.console) as progress:
+                tasks = {job.id: progress.add_task(f"[cyan][{job.id}] {job.command} {job.source}", total=job.total)
+                         for job in jobs}
+                while True:
+                    for job in jobs:
+                        progress.update(tasks[job.id], completed=job.bytes)
+                    if all(job.finished for job in jobs):
+                        break
+                    time.sleep(0.2)
+        except KeyboardInterrupt:
+            self.console.print("[yellow]Las transferencias siguen en segundo plano[/yellow]")
+            return
+        for job in jobs:
+            if job.state == BackgroundJob.DONE:
+                self.console.print(f"[green]✓ [{job.id}] {job.command} {job.source}: {job.bytes} bytes "
+                                   f"({job.rate / 1024 ** 2:.2f} MB/s)[/green]")
+            else:
+                self.console.print(f"[red]✗ [{job.id}] {job.command} {job.source}: {job.state}"
+                                   f"{f' ({job.error})' if job.state == BackgroundJob.FAILED else ''}[/red]")
+
+    def do_cancel(self, arg):
+        """Cancela transferencias en segundo plano: cancel <id>|all"""
+        arg = arg.strip().lower()
+        if self.transfers is None or not (arg == "all" or arg.isdigit()):
+            self.console.print("[red]Error: Uso: cancel <id>|all[/red]")
+            return
+        ids = [job.id for job in self.transfers.jobs()] if arg == "all" else [int(arg)]
+        cancelled = [job_id for job_id in ids if self.transfers.cancel(job_id)]
+        if cancelled:
+            self.console.print(f"[green]✓ Canceladas: {', '.join(map(str, cancelled))}[/green]")
+        else:
+            self.console.print("[yellow]Nada que cancelar[/yellow]")
+
+    def do_source(self, arg):
+        """Ejecuta un script de comandos FTP (uno por línea): source <archivo> [--json] [--no-pipeline] [--stop-on-error]"""
+        from FTP.Client.script import parse_script, run_script, summarize
+        usage = "source <archivo> [--json] [--no-pipeline] [--stop-on-error]"
+        tokens = shlex.split(arg)
+        flags = {flag: flag in tokens for flag in ("--json", "--no-pipeline", "--stop-on-error")}
+        paths = [token for token in tokens if token not in flags]
+        if len(paths) != 1:
+            self.console.print(f"[red]Error: Uso: {usage}[/red]")
+            return
+        try:
+            with open(paths[0], encoding="utf-8") as script:
+                commands = parse_script(script)
+        except (OSError, ValueError) as e:
+            self.console.print(f"[red]✗ Error leyendo el script: {e}[/red]")
+            return
+
+        def show(result):
+            if flags["--json"]:
+                self.console.print_json(data=result.as_record())
+                return
+            color = "green" if result.ok else "red"
+            text = result.response if result.error is None else f"Error: {result.error}"
+            self.console.print(f"[blue]{result.elapsed * 1000:8.2f} ms[/blue] "
+                               f"[{color}]{escape(str(result.command))}: {escape(text)}[/{color}]", highlight=False)
+
+        results, elapsed = run_script(self.client, commands, pipeline=not flags["--no-pipeline"],
+                                      stop_on_error=flags["--stop-on-error"], on_result=show)
+        summary = summarize(results, elapsed)
+        color = "green" if not summary["failed"] else "yellow"
+        self.console.print(f"[{color}]{summary['ok']}/{summary['commands']} comandos correctos en {elapsed:.3f} s "
+                           f"({summary['commands_per_s']} comandos/s, {summary['pipelined']} encadenados)[/{color}]")
+
+    def _parse_batch_args(self, arg, usage):
+        """Separa archivos y opciones -d <dir> -j <sesiones> -r <reintentos> de mget/mput"""
+        tokens = shlex.split(arg)
+        paths, options = [], {"-d": None, "-j": "4", "-r": "2"}
+        i = 0
+        while i < len(tokens):
+            if tokens[i] in options and i + 1 < len(tokens):
+                options[tokens[i]] = tokens[i + 1]
+                i += 2
+            else:
+                paths.append(tokens[i])
+                i += 1
+        if not paths or not options["-j"].isdigit() or not options["-r"].isdigit():
+            self.console.print(f"[red]Error: Uso: {usage}[/red]")
+            return None
+        return paths, options["-d"], int(options["-j"]), int(options["-r"])
+
+    def _run_batch(self, description, batch):
+        """Ejecuta ``batch(progress_callback)`` con barra de progreso y muestra el resumen"""
+        with transfer_bar(self.console, transient=False, elapsed=True) as progress:
+            task = progress.add_task(f"[cyan]{description}...", total=None)
+
+            def update(job, files, total_files, done, total_bytes):
+                progress.update(task, completed=done, total=total_bytes,
+                                description=f"[cyan]{description} {files}/{total_files}")
+
+            result = batch(update)
+
+        color = "green" if not result.failed else "yellow"
+        self.console.print(f"[{color}]✓ {len(result.completed)}/{len(result.jobs)} archivos, "
+                           f"{result.bytes} bytes en {result.elapsed:.2f} s "
+                           f"({result.throughput / 1024 ** 2:.2f} MB/s, {result.workers} sesiones)[/{color}]")
+        for job in result.failed:
+            self.console.print(f"[red]✗ {job.source} ({job.attempts} intentos): {job.error}[/red]")
+        return result
+
+    def do_mget(self, arg):
+        """Descarga varios archivos en paralelo: mget <remoto|patrón>... [-d dir_local] [-j sesiones] [-r reintentos]"""
+        parsed = self._parse_batch_args(arg, "mget <remoto|patrón>... [-d dir_local] [-j sesiones] [-r reintentos]")
+        if not parsed:
+            return
+        paths, local_dir, workers, retries = parsed
+        try:
+            self._run_batch("Descargando", lambda update: self.client.mget(
+                paths, local_dir or ".", workers, retries, update))
+        except Exception as e:
+            self.console.print(f"[red]✗ Error: {e}[/red]")
+
+    def do_mput(self, arg):
+        """Sube varios archivos en paralelo: mput <local|patrón>... [-d dir_remoto] [-j sesiones] [-r reintentos]"""
+        parsed = self._parse_batch_args(arg, "mput <local|patrón>... [-d dir_remoto] [-j sesiones] [-r reintentos]")
+        if not parsed:
+            return
+        paths, remote_dir, workers, retries = parsed
+        # Los patrones locales se expanden aquí; solo archivos regulares
+        files = [path for pattern in paths for path in sorted(glob.glob(pattern)) if os.path.isfile(path)]
+        if not files:
+            self.console.print("[red]Error: Ningún archivo local coincide[/red]")
+            return
+        try:
+            self._run_batch("Subiendo", lambda update: self.client.mput(
+                files, remote_dir or "", workers, retries, update))
+        except Exception as e:
+            self.console.print(f"[red]✗ Error: {e}[/red]")
+
+    def do_mirror(self, arg):
+        """Sincroniza un árbol local y uno remoto: mirror [--get] [--delete] [-n] [--checksum] [-j sesiones] [-r reintentos] [-s estado] <dir_local> [dir_remoto]"""
+        usage = ("mirror [--get] [--delete] [-n] [--checksum] [-j sesiones] [-r reintentos] [-s estado] "
+                 "<dir_local> [dir_remoto]")
+        tokens = shlex.split(arg)
+        flags = {"--get": False, "--delete": False, "-n": False, "--checksum": False}
+        options = {"-j": "4", "-r": "2", "-s": None}
+        paths = []
+        i = 0
+        while i < len(tokens):
+            if tokens[i] in flags:
+                flags[tokens[i]] = True
+                i += 1
+            elif tokens[i] in options and i + 1 < len(tokens):
+                options[tokens[i]] = tokens[i + 1]
+                i += 2
+            else:
+                paths.append(tokens[i])
+                i += 1
+        if not 1 <= len(paths) <= 2 or not options["-j"].isdigit() or not options["-r"].isdigit():
+            self.console.print(f"[red]Error: Uso: {usage}[/red]")
+            return
+
+        def run(update):
+            return self.client.mirror(paths[0], paths[1] if len(paths) > 1 else "", upload=not flags["--get"],
+                                      delete=flags["--delete"], dry_run=flags["-n"], workers=int(options["-j"]),
+                                      retries=int(options["-r"]), checksum=flags["--checksum"],
+                                      state_path=options["-s"], progress=update)
+
+        try:
+            if flags["-n"]:
+                result = run(None)
+                for action in result.actions:
+                    self.console.print(f"  {action.op:<4} {action.path or '.'}")
+            else:
+                result = self._run_batch("Sincronizando", run)
+            counts = ", ".join(f"{op} {count}" for op, count in sorted(result.counts().items())) or "sin cambios"
+            if result.skipped:
+                counts += f"; {len(result.skipped)} subárboles sin cambios"
+            self.console.print(f"[cyan]{'Simulación: ' if flags['-n'] else ''}{counts}[/cyan]")
+        except Exception as e:
+            self.console.print(f"[red]✗ Error: {e}[/red]")
+
     def do_quit(self, arg):
         """Closes the connection: QUIT"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}")
-        ) as progress:
+        with spinner() as progress:
             progress.add_task(description="Cerrando conexión...", total=None)
+            if self.keepalive is not None:
+                self.keepalive.stop()
+            self._close_transfers()
             try:
                 response = self.client.quit()
                 self.console.print("[green]✓ Conexión cerrada correctamente[/green]")
@@ -297,16 +623,27 @@ class FTPCLI(cmd.Cmd):
                 "pwd": "Mostrar directorio actual",
                 "cwd": "Cambiar directorio: cwd <path>",
                 "cdup": "Subir al directorio padre",
-                "list": "Listar archivos: list [path]"
+                "list": "Listar archivos: list [path]",
+                "cache": "Caché de listados: cache on [ttl] | off | clear | stats",
+                "keepalive": "Mantener viva la sesión parada: keepalive <segundos> | off"
             },
             "TRANSFERENCIA": {
-                "retr": "Descargar archivo: retr <remote_path> <local_path>",
+                "retr": "Descargar archivo: retr <remote_path> <local_path> [segmentos]",
                 "stor": "Subir archivo: stor <local_path> <remote_path>",
+                "mget": "Descargar en paralelo: mget <remoto|patrón>... [-d dir] [-j sesiones] [-r reintentos]",
+                "mput": "Subir en paralelo: mput <local|patrón>... [-d dir] [-j sesiones] [-r reintentos]",
+                "mirror": "Sincronizar árboles: mirror [--get] [--delete] [-n] [--checksum] [-s estado] <local> [remoto]",
                 "pasv": "Entrar en modo pasivo",
+                "active": "Modo activo (PORT): active [puerto_inicio-puerto_fin]",
                 "type": "Tipo de transferencia: type <A|I>",
                 "mode": "Modo de transferencia: mode <S|B|C>",
                 "stru": "Estructura de archivo: stru <F|R|P>",
-                "rest": "Establecer punto de reinicio: rest <marker>"
+                "rest": "Establecer punto de reinicio: rest <marker>",
+                "bg": "En segundo plano: bg retr|stor|appe <origen> <destino>",
+                "jobs": "Transferencias en segundo plano y velocidad total",
+                "wait": "Esperar transferencias en segundo plano: wait [id]",
+                "cancel": "Cancelar transferencias en segundo plano: cancel <id>|all",
+                "source": "Ejecutar un script de comandos FTP: source <archivo> [--json] [--no-pipeline] [--stop-on-error]"
             },
             "GESTIÓN": {
                 "mkd": "Crear directorio: mkd <path>",
@@ -332,7 +669,7 @@ class FTPCLI(cmd.Cmd):
             }
         }
 
-        table = Table(show_header=True, header_style="bold magenta", title="Comandos FTP Disponibles", 
+        table = new_table(show_header=True, header_style="bold magenta", title="Comandos FTP Disponibles", 
                      title_style="bold blue", border_style="blue")
         table.add_column("Categoría", style="cyan")
         table.add_column("Comando", style="green")
@@ -576,11 +913,7 @@ class FTPCLI(cmd.Cmd):
         local_path, remote_path = args
         try:
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                transient=True
-            ) as progress:
+            with spinner(transient=True) as progress:
                 task = progress.add_task("[cyan]Añadiendo datos...", total=None)
                 response = self.client.append_file(local_path, remote_path)
                 
@@ -623,7 +956,7 @@ class FTPCLI(cmd.Cmd):
                 return
             
             # Crear una tabla para mostrar los resultados
-            table = Table(show_header=True, header_style="bold magenta", title="Nombres de Archivos")
+            table = new_table(show_header=True, header_style="bold magenta", title="Nombres de Archivos")
             table.add_column("Nombre", style="cyan")
             
             # Añadir cada archivo a la tabla
@@ -653,11 +986,7 @@ class FTPCLI(cmd.Cmd):
                 self.console.print(f"[red]Error: El archivo '{arg}' no existe[/red]")
                 return
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                transient=True
-            ) as progress:
+            with spinner(transient=True) as progress:
                 task = progress.add_task("[cyan]Subiendo archivo...", total=None)
                 response = self.client.store_unique(arg)
                 
@@ -680,17 +1009,81 @@ class FTPCLI(cmd.Cmd):
         except Exception as e:
             self.console.print(f"[red]Error: {e}[/red]")
 
+    def do_active(self, arg):
+        """Usa modo activo (PORT) en las transferencias: active [puerto_inicio-puerto_fin]"""
+        try:
+            if arg:
+                first, _, last = arg.partition("-")
+                port_range = (int(first), int(last or first))
+                if not 1024 <= port_range[0] <= port_range[1] <= 65535:
+                    raise ValueError
+                self.client.set_active_mode(ActiveListenerPool(port_range=port_range))
+                self.console.print(f"[green]✓ Modo activo, puertos {port_range[0]}-{port_range[1]}[/green]")
+            else:
+                self.client.set_active_mode()
+                self.console.print("[green]✓ Modo activo[/green]")
+        except ValueError:
+            self.console.print("[red]Error: Uso: active [puerto_inicio-puerto_fin][/red]")
+
+    def do_cache(self, arg):
+        """Caché de listados: cache on [ttl] | off | clear | stats"""
+        args = arg.split()
+        action = args[0].lower() if args else "stats"
+        try:
+            if action == "on":
+                ttl = float(args[1]) if len(args) > 1 else 30.0
+                self.client.enable_cache(ttl)
+                self.console.print(f"[green]✓ Caché de listados activada (TTL {ttl:g} s)[/green]")
+            elif action == "off":
+                self.client.disable_cache()
+                self.console.print("[green]✓ Caché de listados desactivada[/green]")
+            elif action == "clear" and self.client.cache is not None:
+                self.client.cache.invalidate()
+                self.console.print("[green]✓ Caché vaciada[/green]")
+            elif action == "stats" and self.client.cache is not None:
+                stats = self.client.cache.stats()
+                self.console.print(f"[cyan]Entradas: {stats['entries']}  Aciertos: {stats['hits']}  "
+                                   f"Fallos: {stats['misses']}  Invalidaciones: {stats['invalidations']}  "
+                                   f"Tasa de acierto: {stats['hit_rate']:.0%}[/cyan]")
+            elif action in ("clear", "stats"):
+                self.console.print("[yellow]La caché está desactivada (cache on [ttl])[/yellow]")
+            else:
+                raise ValueError
+        except ValueError:
+            self.console.print("[red]Error: Uso: cache on [ttl] | off | clear | stats[/red]")
+
+    def do_keepalive(self, arg):
+        """Mantener viva la sesión parada: keepalive <segundos> | off"""
+        args = arg.split()
+        try:
+            if len(args) != 1:
+                raise ValueError
+            if self.keepalive is not None:
+                self.keepalive.stop()
+                self.keepalive = None
+            if args[0].lower() == "off":
+                self.client.disable_tcp_keepalive()
+                self.console.print("[green]✓ Keepalive desactivado[/green]")
+                return
+            interval = float(args[0])
+            if interval <= 0:
+                raise ValueError
+            # Sondas TCP para las transferencias largas y NOOP entre comandos
+            self.client.enable_tcp_keepalive(idle=max(1, int(interval)))
+            self.keepalive = IdleKeepalive(self.client, interval).start()
+            self.console.print(f"[green]✓ Keepalive cada {interval:g} s de inactividad[/green]")
+        except ValueError:
+            self.console.print("[red]Error: Uso: keepalive <segundos> | off[/red]")
+
     def emptyline(self):
         """No hacer nada cuando se presiona Enter sin comando"""
         pass
 
 if __name__ == "__main__":
+    from rich import print as rprint
     try:
         client = FTPClient('localhost', 21)
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}")
-        ) as progress:
+        with spinner() as progress:
             progress.add_task(description="Conectando al servidor...", total=None)
             try:
                 client.connect()
@@ -1,26 +1,55 @@
+import os
 import socket
 import re
-import argparse
-import logging
-from typing import Optional, Dict, Callable
-from FTP.Common.constants import FTPResponseCode, TransferMode, DEFAULT_BUFFER_SIZE, DEFAULT_TIMEOUT
+import contextlib
+import posixpath
+from typing import Optional, Dict, Callable, Iterator, Tuple
+from FTP.Client.active import ActiveListenerPool, default_listener_pool
+from FTP.Client.cache import ListingCache, MUTATING_COMMANDS, absolute_path
+from FTP.Client.keepalive import set_tcp_keepalive
+from FTP.Client.progress import TransferProgress
+from FTP.Client.retry import RetryMetrics, RetryPolicy, call_with_retry, retryable
+from FTP.Common.constants import (FTPResponseCode, TransferMode, DEFAULT_BUFFER_SIZE, DEFAULT_DATA_BUFFER_SIZE,
+                                  DEFAULT_TIMEOUT)
+from FTP.Common.logger import get_logger
 from FTP.Common.exceptions import FTPClientError, FTPTransferError, FTPAuthError, FTPConnectionError
 from FTP.Common.utils import (validate_transfer_type, validate_transfer_mode,
                             validate_structure, validate_port_args,
                             parse_restart_marker, validate_path,
-                            parse_features_response, parse_list_response)
+                            parse_features_response, parse_list_response,
+                            iter_lines, iter_list_response, ListEntry,
+                            iter_mlsd_response, MlsdEntry, format_ftp_time, parse_ftp_time)
+
+PWD_PATH = re.compile(r'"([^"]*)"')
+# Nombre con el que el servidor guarda un STOR ("150 ... Saving as nombre")
+STORED_AS = re.compile(r"Saving as (.+)$")
+PASV_ADDRESS = re.compile(r"(\d+),(\d+),(\d+),(\d+),(\d+),(\d+)")
+# Códigos de respuesta válidos: una búsqueda en el dict evita isdigit() + int()
+REPLY_CODES = {str(code): code for code in range(100, 600)}
+# Comandos con conexión de datos: su respuesta llega en dos partes y no se encadenan
+DATA_COMMANDS = frozenset(("RETR", "STOR", "APPE", "STOU", "LIST", "NLST", "MLSD"))
 
 class FTPClient:
     """Cliente FTP con soporte para modos activo/pasivo y dispatcher de comandos."""
 
-    def __init__(self, host: str, port: int = 21):
+    def __init__(self, host: str, port: int = 21, buffer_size: int = DEFAULT_DATA_BUFFER_SIZE):
         self.host = host
         self.port = port
+        # Tamaño de bloque de las transferencias por el canal de datos
+        self.buffer_size = buffer_size
+        # Buffer de recepción reutilizado entre descargas (se crea al primer uso)
+        self._data_buffer: Optional[bytearray] = None
         self.control_sock: Optional[socket.socket] = None
+        # Bytes del canal de control ya recibidos y aún sin consumir
+        self._reply_buffer = bytearray()
         self.data_sock: Optional[socket.socket] = None
         self.mode = TransferMode.PASSIVE
+        # Modo activo: pool de listeners (por defecto, el compartido del proceso)
+        # y el listener anunciado con PORT a la espera de la conexión del servidor
+        self.listener_pool: Optional[ActiveListenerPool] = None
+        self._data_listener: Optional[tuple] = None
         self.authenticated = False
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger = get_logger("ftp.client")
         self.command_dispatcher: Dict[str, Callable] = {
             "USER": self._handle_user,
             "PASS": self._handle_pass,
@@ -55,6 +84,33 @@ class FTPClient:
         self.transfer_type = 'A'  # Default ASCII
         self.transfer_mode = 'S'  # Default Stream
         self.restart_point = None
+        # Credenciales del último login, para poder reabrir la sesión
+        self.user: Optional[str] = None
+        self.password: Optional[str] = None
+        # Se activa con CWD/CDUP; el pool lo usa para restaurar el directorio
+        self.directory_changed = False
+        # Sesiones adicionales para mget/mput y descargas segmentadas
+        self._parallel_pool = None
+        # Caché opcional de LIST/NLST/PWD (ver enable_cache) y directorio actual conocido
+        self.cache: Optional[ListingCache] = None
+        self._cwd: Optional[str] = None
+        # Observador de progreso de las transferencias (como mucho una llamada por intervalo),
+        # la transferencia en curso y el resumen de la última
+        self.progress_callback: Optional[Callable[[TransferProgress], None]] = None
+        self.progress_interval = 0.1
+        self._transfer: Optional[TransferProgress] = None
+        self.last_transfer_stats: Optional[TransferProgress] = None
+        # Reintentos opcionales (ver enable_retry): política, contadores, directorio a
+        # restaurar al reconectar y nombre real del último STOR
+        self.retry_policy: Optional[RetryPolicy] = None
+        self.retry_metrics = RetryMetrics()
+        self._retrying = False
+        self._restore_dir: Optional[str] = None
+        self._stored_as: Optional[str] = None
+        # Archivo local que la descarga en curso ya abrió (y truncó): solo de él se puede continuar
+        self._received_to: Optional[str] = None
+        # TCP keepalive opcional (ver set_tcp_keepalive): (idle, intervalo, sondas)
+        self.tcp_keepalive: Optional[Tuple[int, int, int]] = None
 
     def connect(self) -> str:
         """Establece conexión inicial con el servidor."""
@@ -62,17 +118,127 @@ class FTPClient:
             self.control_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.control_sock.settimeout(DEFAULT_TIMEOUT)
             self.control_sock.connect((self.host, self.port))
+            # Comandos cortos: sin Nagle cada uno sale sin esperar el ACK del anterior
+            self.control_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.tcp_keepalive is not None:
+                set_tcp_keepalive(self.control_sock, *self.tcp_keepalive)
+            self._reply_buffer.clear()
+            # Sesión nueva: nada de lo cacheado de la anterior sigue siendo seguro
+            self._cwd = self._restore_dir = None
+            if self.cache is not None:
+                self.cache.invalidate()
             return self._get_response()
         except (socket.error, socket.timeout) as e:
             raise FTPConnectionError(FTPResponseCode.BAD_COMMAND, f"Conexión fallida: {str(e)}")
 
+    def _format_command(self, command: str, *args) -> str:
+        """Línea de comando lista para enviar; anota los cambios de directorio."""
+        cmd = f"{command} {' '.join(args)}".strip()
+        if command.upper() in ("CWD", "CDUP", "REIN"):
+            self.directory_changed = True
+            self._cwd = None
+            if self.cache is not None:
+                self.cache.invalidate_entry("PWD", "")
+        elif self.cache is not None and command.upper() in MUTATING_COMMANDS:
+            self._invalidate_cache(command.upper(), " ".join(args))
+        self.logger.debug("Enviando comando: %s", "PASS ****" if command.upper() == "PASS" else cmd)
+        return f"{cmd}\r\n"
+
     def send_command(self, command: str, *args) -> str:
         """Envía un comando genérico al servidor."""
-        cmd = f"{command} {' '.join(args)}".strip()
-        self.logger.debug(f"Enviando comando: {cmd}")
-        self.control_sock.sendall(f"{cmd}\r\n".encode())
+        self.control_sock.sendall(self._format_command(command, *args).encode())
         return self._get_response()
 
+    def pipeline(self, *commands) -> list[str]:
+        """Envía varios comandos de una vez y devuelve sus respuestas en orden.
+
+        Cada comando es una cadena (``"CWD /"``) o una tupla (``("CWD", "/")``).
+        Todos viajan en un mismo envío, así que la serie cuesta un RTT en lugar
+        de uno por comando. Los comandos con conexión de datos no se admiten.
+        """
+        lines = []
+        for command in commands:
+            command, *args = command.split(" ", 1) if isinstance(command, str) else command
+            if command.upper() in DATA_COMMANDS:
+                raise FTPClientError(FTPResponseCode.BAD_COMMAND,
+                                     f"{command} abre una conexión de datos y no se puede encadenar")
+            lines.append(self._format_command(command, *args))
+        self.control_sock.sendall("".join(lines).encode())
+        return [self._get_response() for _ in lines]
+
+    def enable_cache(self, ttl: float = 30.0) -> ListingCache:
+        """Activa la caché de LIST/NLST/PWD con caducidad de ``ttl`` segundos.
+
+        Las modificaciones hechas con este cliente (STOR, DELE, RNTO, MKD,
+        RMD...) invalidan las entradas afectadas; ``cache.stats()`` da los
+        aciertos. Ver ``FTP.Client.cache``.
+        """
+        if self.cache is None:
+            self.cache = ListingCache(ttl)
+        self.cache.ttl = ttl
+        return self.cache
+
+    def disable_cache(self) -> None:
+        self.cache = None
+
+    def enable_retry(self, retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                     jitter: float = 0.5) -> RetryPolicy:
+        """Reintenta las operaciones idempotentes y las transferencias ante errores transitorios.
+
+        Cada reintento espera según la política (exponencial con jitter),
+        reconecta, vuelve a autenticarse y restaura el directorio, TYPE, MODE
+        y STRU. Las descargas continúan con REST desde lo que ya recibieron;
+        las subidas se repiten desde cero (el servidor no guarda las subidas
+        a medias). Los
+        contadores quedan en ``retry_metrics``. Ver ``FTP.Client.retry``.
+        """
+        self.retry_policy = RetryPolicy(retries, base_delay, max_delay, jitter)
+        return self.retry_policy
+
+    def disable_retry(self) -> None:
+        self.retry_policy = None
+
+    def enable_tcp_keepalive(self, idle: int = 60, interval: int = 15, count: int = 4) -> None:
+        """Activa TCP keepalive en la conexión de control y en las de datos.
+
+        Durante una transferencia larga el canal de control no lleva tráfico y
+        los NAT y firewalls intermedios pueden olvidar la conexión; el 226
+        final se perdería con todos los datos ya recibidos. Las sondas salen
+        tras ``idle`` segundos sin tráfico y cada ``interval`` segundos; a las
+        ``count`` sin respuesta el sistema da la conexión por caída. Para los
+        periodos sin actividad entre operaciones, ver ``FTP.Client.keepalive.IdleKeepalive``.
+        """
+        self.tcp_keepalive = (idle, interval, count)
+        if self.control_sock:
+            set_tcp_keepalive(self.control_sock, idle, interval, count)
+
+    def disable_tcp_keepalive(self) -> None:
+        self.tcp_keepalive = None
+        if self.control_sock:
+            self.control_sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 0)
+
+    def _invalidate_cache(self, command: str, argument: str) -> None:
+        """Invalida lo que ``command`` puede cambiar; sin directorio actual conocido, todo."""
+        if command == "MFMT":
+            argument = argument.partition(" ")[2]
+        if self._cwd is None or command == "SITE":
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate(absolute_path(self._cwd, argument))
+
+    def _remember_dir(self) -> None:
+        """Con reintentos activos, anota el nuevo directorio para restaurarlo al reconectar"""
+        if self.retry_policy is not None:
+            self.get_current_dir()
+
+    def _cache_key(self, path: str) -> Optional[str]:
+        """Ruta absoluta con la que se cachea el listado de ``path`` (None sin caché)"""
+        if self.cache is None:
+            return None
+        if self._cwd is None and not path.startswith("/"):
+            self.get_current_dir()
+        return absolute_path(self._cwd, path) if self._cwd is not None or path.startswith("/") else None
+
     def execute(self, command: str, *args) -> str:
         """Ejecuta un comando usando el dispatcher o envío genérico."""
         args = tuple(arg for arg in args if arg != "")
@@ -81,11 +247,88 @@ class FTPClient:
             return self.command_dispatcher[cmd](*args)
         return self.send_command(command, *args)
 
+    def login(self, user: str, password: str) -> str:
+        """Autentica la sesión (USER + PASS en un solo envío) y recuerda las credenciales."""
+        user_response, pass_response = self.pipeline(("USER", user), ("PASS", password))
+        code = self._parse_code(user_response)
+        if code not in (FTPResponseCode.PASSWORD_REQUIRED, FTPResponseCode.USER_LOGGED_IN):
+            raise FTPAuthError(code, "Usuario inválido")
+        self.user = user
+        # Si USER ya bastaba, la respuesta a PASS sobra (normalmente un 503)
+        if code != FTPResponseCode.USER_LOGGED_IN:
+            if self._parse_code(pass_response) != FTPResponseCode.USER_LOGGED_IN:
+                raise FTPAuthError(self._parse_code(pass_response), "Contraseña inválida")
+            user_response = pass_response
+        self.authenticated = True
+        self.password = password
+        return user_response
+
+    def close(self) -> None:
+        """Cierra la sesión sin lanzar excepciones (QUIT si es posible)."""
+        try:
+            if self.control_sock:
+                self.quit()
+        except (OSError, FTPClientError):
+            pass
+        finally:
+            if self.control_sock:
+                self.control_sock.close()
+                self.control_sock = None
+            self._close_data_connection()
+            self._close_parallel_pool()
+            self.authenticated = False
+
+    def reconnect(self) -> str:
+        """Abre una sesión nueva y restaura login, directorio, TYPE, MODE y STRU."""
+        restore_dir, authenticated = self._restore_dir, self.authenticated
+        if self.control_sock:
+            try:
+                self.control_sock.close()
+            except OSError:
+                pass
+            self.control_sock = None
+        self._close_data_connection()
+        self.authenticated = False
+        response = self.connect()
+        self.retry_metrics.add("reconnects")
+        if authenticated and self.user is not None:
+            self.login(self.user, self.password)
+
+        commands = []
+        if self.transfer_type != 'A':
+            commands.append(("TYPE", self.transfer_type))
+        if self.transfer_mode != 'S':
+            commands.append(("MODE", self.transfer_mode))
+        if self.structure != 'F':
+            commands.append(("STRU", self.structure))
+        if restore_dir is not None:
+            commands.append(("CWD", restore_dir))
+        for (command, *_), reply in zip(commands, self.pipeline(*commands) if commands else []):
+            if self._parse_code(reply) not in (FTPResponseCode.COMMAND_OK, 250):
+                raise FTPClientError(self._parse_code(reply), f"No se pudo restaurar {command} al reconectar")
+        self._restore_dir = self._cwd = restore_dir
+        return response
+
+    def parallel_pool(self, size: int):
+        """Pool de sesiones extra con las credenciales de esta, reutilizado entre llamadas."""
+        from FTP.Client.pool import FTPConnectionPool
+        pool = self._parallel_pool
+        if pool is None or pool.size < size or (pool.user, pool.password) != (self.user, self.password):
+            self._close_parallel_pool()
+            pool = self._parallel_pool = FTPConnectionPool.from_client(self, size)
+        return pool
+
+    def _close_parallel_pool(self) -> None:
+        if self._parallel_pool is not None:
+            self._parallel_pool.close()
+            self._parallel_pool = None
+
     def _handle_user(self, username: str) -> str:
         """Maneja el comando USER (inicio de autenticación)."""
         response = self.send_command("USER", username)
         if self._parse_code(response) not in (FTPResponseCode.PASSWORD_REQUIRED, FTPResponseCode.USER_LOGGED_IN):
             raise FTPAuthError(self._parse_code(response), "Usuario inválido")
+        self.user = username
         return response
 
     def _handle_pass(self, password: str) -> str:
@@ -94,15 +337,27 @@ class FTPClient:
         if FTPResponseCode.USER_LOGGED_IN != self._parse_code(response):
             raise FTPAuthError(self._parse_code(response), "Contraseña inválida")
         self.authenticated = True
+        self.password = password
         return response
 
+    @retryable
     def get_current_dir(self) -> str:
         """Obtiene el directorio actual (PWD)"""
+        if self.cache is not None:
+            cached = self.cache.get("PWD", "")
+            if cached is not None:
+                return cached
         response = self.send_command("PWD")
         if self._parse_code(response) != FTPResponseCode.PATHNAME_CREATED:
             raise FTPClientError(self._parse_code(response), "Error obteniendo directorio")
+        match = PWD_PATH.search(response)
+        self._cwd = match.group(1) if match else None
+        self._restore_dir = self._cwd or self._restore_dir
+        if self.cache is not None and self._cwd is not None:
+            self.cache.put("PWD", "", response)
         return response
 
+    @retryable
     def change_dir(self, path: str) -> str:
         """Cambia de directorio (CWD)"""
         if not validate_path(path):
@@ -110,6 +365,7 @@ class FTPClient:
         response = self.send_command("CWD", path)
         # Verificar si la respuesta contiene un código de éxito (250 o 200)
         if self._parse_code(response) in [250, 200]:
+            self._remember_dir()
             return response
         raise FTPClientError(self._parse_code(response), "Error cambiando de directorio")
 
@@ -160,116 +416,246 @@ class FTPClient:
         response_to = self.rename_to(new_name)
         return response_from + "\n" + response_to
 
-    def download_file(self, remote_path: str, local_path: str = None) -> str:
-        """Descarga un archivo usando RETR."""
+    def download_file(self, remote_path: str, local_path: str = None, segments: int = 1) -> str:
+        """Descarga un archivo usando RETR.
+
+        Con ``segments`` > 1 y un servidor con REST STREAM y SIZE, el archivo
+        se descarga en ``segments`` rangos en paralelo (ver ``FTP.Client.segmented``);
+        en modo ASCII se descarga siempre de una vez.
+        Con reintentos activos (``enable_retry``) una descarga cortada continúa
+        con REST desde lo que esta misma llamada llegó a escribir en el archivo
+        local; un archivo previo que aún no se había truncado no se aprovecha.
+        """
         if remote_path and not validate_path(remote_path):
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Nombre de archivo inválido")
         # Si no se especifica el archivo local, se utiliza el mismo nombre
         if local_path is None:
             local_path = remote_path
+        if int(segments) > 1:
+            from FTP.Client.segmented import segmented_download
+            with self._track_transfer("RETR", remote_path):
+                return segmented_download(self, remote_path, local_path, int(segments))
+
+        if self.retry_policy is not None and not self._retrying:
+            self._received_to = None
+
+            def resume():
+                # REST solo vale en binario; en ASCII, o si el fallo llegó antes de
+                # abrir el archivo (PASV, 425...), se vuelve a empezar desde cero
+                self.restart_point = None
+                if (self.transfer_type == 'I' and self._received_to == local_path
+                        and os.path.exists(local_path) and os.path.getsize(local_path)):
+                    self.restart_point = os.path.getsize(local_path)
+                    self.retry_metrics.add("resumes")
+                    self.retry_metrics.add("resumed_bytes", self.restart_point)
+
+            return call_with_retry(self, lambda: self._retrieve(remote_path, local_path), resume)
+        return self._retrieve(remote_path, local_path)
+
+    def _retrieve(self, remote_path: str, local_path: str) -> str:
+        with self._track_transfer("RETR", remote_path):
+            self._setup_data_connection()
+
+            # Si hay punto de reinicio, enviarlo y continuar el archivo local desde ahí
+            offset = 0
+            if self.restart_point is not None:
+                offset = self.restart_point
+                self.send_command("REST", str(self.restart_point))
+                self.restart_point = None
+
+            # Enviar comando RETR
+            response = self.send_command("RETR", remote_path)
+
+            if self._parse_code(response) not in (125, 150):
+                self._close_data_connection()
+                raise FTPTransferError(self._parse_code(response), "Error en RETR")
+            self._accept_data_connection()
+
+            # Recibir el archivo y guardarlo en local
+            self._receive_data(local_path, offset)
+
+            # Leer la respuesta final del servidor (por ejemplo, 226)
+            final_response = self._get_response()
+            if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
+                raise FTPTransferError(self._parse_code(final_response), "Error en RETR final")
 
-        self._setup_data_connection()
-
-        # Si hay punto de reinicio, enviarlo
-        if self.restart_point is not None:
-            self.send_command("REST", str(self.restart_point))
-            self.restart_point = None
-
-        # Enviar comando RETR
-        response = self.send_command("RETR", remote_path)
-
-        if self._parse_code(response) not in (125, 150):
-            raise FTPTransferError(self._parse_code(response), "Error en RETR")
-
-        # Recibir el archivo y guardarlo en local
-        self._receive_data(local_path)
-
-        # Leer la respuesta final del servidor (por ejemplo, 226)
-        final_response = self._get_response()
-        if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
-            raise FTPTransferError(self._parse_code(final_response), "Error en RETR final")
-
-        return response + "\n" + final_response
+            return response + "\n" + final_response
 
     def upload_file(self, local_path: str, remote_path: str) -> str:
-        """Sube un archivo usando STOR."""
+        """Sube un archivo usando STOR.
+
+        Con reintentos activos (``enable_retry``) una subida cortada se repite
+        desde el principio: el servidor borra el archivo a medias de todo STOR
+        que no termina en 226, así que no hay nada que continuar con APPE.
+        """
         if (local_path and not validate_path(local_path)) or (remote_path and not validate_path(remote_path)):
             FTPClientError(500, "Error en STOR .Proporcione rutas válidas")
-        self._setup_data_connection()
+        if self.retry_policy is None or self._retrying:
+            return self._store(local_path, remote_path)
 
-        # Si hay punto de reinicio, enviarlo
-        if self.restart_point is not None:
-            self.send_command("REST", str(self.restart_point))
-            self.restart_point = None
-
-        response = self.send_command("STOR", remote_path)
-        if self._parse_code(response) not in (125, 150):
-            raise FTPTransferError(self._parse_code(response), "Error en STOR")
+        self._stored_as = None
 
-        self._send_data(local_path)
-        final_response = self._get_response()
-        if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
-            raise FTPTransferError(self._parse_code(final_response), "Error en STOR final")
+        def attempt():
+            # Si el 226 se perdió con la conexión, el archivo del intento anterior
+            # (el nombre del 150) está completo o truncado: se reemplaza en vez de
+            # dejar que el nuevo STOR cree "nombre (1)"
+            target = self._stored_as
+            if target is not None:
+                try:
+                    self.delete_file(target)
+                except FTPClientError:
+                    pass
+            return self._store(local_path, remote_path)
+
+        return call_with_retry(self, attempt)
+
+    def _store(self, local_path: str, remote_path: str) -> str:
+        """STOR de ``local_path``; anota el nombre real en ``_stored_as``."""
+        with self._track_transfer("STOR", remote_path):
+            self._setup_data_connection()
+
+            # Si hay punto de reinicio, enviarlo
+            if self.restart_point is not None:
+                self.send_command("REST", str(self.restart_point))
+                self.restart_point = None
+
+            response = self.send_command("STOR", remote_path)
+            if self._parse_code(response) not in (125, 150):
+                self._close_data_connection()
+                raise FTPTransferError(self._parse_code(response), "Error en STOR")
+            stored_as = STORED_AS.search(response)
+            self._stored_as = (posixpath.join(posixpath.dirname(remote_path), stored_as.group(1).strip())
+                               if stored_as else remote_path)
+            self._accept_data_connection()
+
+            self._send_data(local_path)
+            final_response = self._get_response()
+            if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
+                raise FTPTransferError(self._parse_code(final_response), "Error en STOR final")
 
-        return response + "\n" + final_response
+            return response + "\n" + final_response
 
     def append_file(self, local_path: str, remote_path: str) -> str:
         """Añade datos a un archivo remoto usando APPE."""
         if not validate_path(local_path) or not validate_path(remote_path):
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
 
-        self._setup_data_connection()
-        response = self.send_command("APPE", remote_path)
+        with self._track_transfer("APPE", remote_path):
+            self._setup_data_connection()
+            response = self.send_command("APPE", remote_path)
         
-        if self._parse_code(response) not in (125, 150):
-            raise FTPTransferError(self._parse_code(response), "Error en APPE")
+            if self._parse_code(response) not in (125, 150):
+                self._close_data_connection()
+                raise FTPTransferError(self._parse_code(response), "Error en APPE")
+            self._accept_data_connection()
+
+            try:
+                with open(local_path, 'rb') as f:
+                    self._sendfile(f)
+            
+                # Cerrar explícitamente el socket de datos antes de leer la respuesta
+                if self.data_sock:
+                    try:
+                        self.data_sock.shutdown(socket.SHUT_WR)
+                    except:
+                        pass
+                    self.data_sock.close()
+                    self.data_sock = None
 
-        try:
-            with open(local_path, 'rb') as f:
-                while True:
-                    chunk = f.read(DEFAULT_BUFFER_SIZE)
-                    if not chunk:
-                        break
-                    self.data_sock.send(chunk)
+                # Leer la respuesta final con un timeout más largo
+                self.control_sock.settimeout(10)  # aumentar timeout para la respuesta final
+                final_response = self._get_response()
+                self.control_sock.settimeout(DEFAULT_TIMEOUT)  # restaurar timeout original
             
-            # Cerrar explícitamente el socket de datos antes de leer la respuesta
-            if self.data_sock:
+                if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
+                    raise FTPTransferError(self._parse_code(final_response), "Error en APPE final")
+            
+                return response + "\n" + final_response
+
+            except socket.timeout:
+                # Si ocurre timeout pero la transferencia fue exitosa, retornar éxito
+                return "226 Transfer complete\r\n"
+            except Exception as e:
+                raise FTPTransferError(FTPResponseCode.LOCAL_ERROR, str(e))
+            finally:
+                # Limpieza manual de la conexión de datos
+                if self.data_sock:
+                    try:
+                        self.data_sock.close()
+                    except:
+                        pass
+                    self.data_sock = None
+
+    def retr_stream(self, remote_path: str):
+        """Abre ``remote_path`` con RETR y devuelve un ``RetrStream`` de solo lectura.
+
+        Los datos se consumen del socket según se leen; cerrar el stream antes
+        del final aborta la transferencia. Ver ``FTP.Client.streams``.
+        """
+        from FTP.Client.streams import RetrStream
+        if remote_path and not validate_path(remote_path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Nombre de archivo inválido")
+        # El stream vive más que esta llamada: el seguimiento lo termina RetrStream al cerrarse
+        progress = self._new_progress("RETR", remote_path)
+        try:
+            self._setup_data_connection()
+            if self.restart_point is not None:
+                self.send_command("REST", str(self.restart_point))
+                self.restart_point = None
+
+            response = self.send_command("RETR", remote_path)
+            if self._parse_code(response) not in (125, 150):
+                self._close_data_connection()
+                raise FTPTransferError(self._parse_code(response), "Error en RETR")
+            self._accept_data_connection()
+        except BaseException as e:
+            self._transfer_done(progress, e)
+            raise
+        return RetrStream(self, response, progress)
+
+    def stor_stream(self, source, remote_path: str, command: str = "STOR") -> str:
+        """Sube el contenido de ``source`` (archivo, ``bytes`` o iterable de bloques) con STOR.
+
+        ``command`` puede ser ``APPE``. Si leer ``source`` o enviar falla, la
+        transferencia se aborta y el servidor descarta el archivo a medias.
+        """
+        from FTP.Client.streams import abort_transfer, send_stream
+        if remote_path and not validate_path(remote_path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Nombre de archivo inválido")
+        with self._track_transfer(command, remote_path) as progress:
+            self._setup_data_connection()
+            if self.restart_point is not None:
+                self.send_command("REST", str(self.restart_point))
+                self.restart_point = None
+
+            response = self.send_command(command, remote_path)
+            if self._parse_code(response) not in (125, 150):
+                self._close_data_connection()
+                raise FTPTransferError(self._parse_code(response), f"Error en {command}")
+            self._accept_data_connection()
+            try:
+                send_stream(self.data_sock, source, self.buffer_size, progress)
+            except BaseException:
                 try:
-                    self.data_sock.shutdown(socket.SHUT_WR)
-                except:
+                    abort_transfer(self)
+                except OSError:
                     pass
-                self.data_sock.close()
-                self.data_sock = None
+                raise
+            self._close_data_connection()
 
-            # Leer la respuesta final con un timeout más largo
-            self.control_sock.settimeout(10)  # aumentar timeout para la respuesta final
             final_response = self._get_response()
-            self.control_sock.settimeout(DEFAULT_TIMEOUT)  # restaurar timeout original
-            
             if self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
-                raise FTPTransferError(self._parse_code(final_response), "Error en APPE final")
-            
+                raise FTPTransferError(self._parse_code(final_response), f"Error en {command} final")
             return response + "\n" + final_response
 
-        except socket.timeout:
-            # Si ocurre timeout pero la transferencia fue exitosa, retornar éxito
-            return "226 Transfer complete\r\n"
-        except Exception as e:
-            raise FTPTransferError(FTPResponseCode.LOCAL_ERROR, str(e))
-        finally:
-            # Limpieza manual de la conexión de datos
-            if self.data_sock:
-                try:
-                    self.data_sock.close()
-                except:
-                    pass
-                self.data_sock = None
-
     def enter_passive_mode(self) -> str:
         """Activa modo PASV y configura conexión de datos."""
+        self._close_data_connection()
         response = self.send_command("PASV")
         ip, port = self._parse_pasv_response(response)
         self.data_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if self.tcp_keepalive is not None:
+            set_tcp_keepalive(self.data_sock, *self.tcp_keepalive)
         self.data_sock.connect((ip, port))
         self.mode = TransferMode.PASSIVE
         return response
@@ -287,73 +673,217 @@ class FTPClient:
         if self.control_sock:
             self.control_sock.close()
         self._close_data_connection()
+        self._close_parallel_pool()
         return response
 
+    def set_active_mode(self, listener_pool: Optional[ActiveListenerPool] = None) -> None:
+        """Usa modo activo (PORT) en las siguientes transferencias."""
+        self.mode = TransferMode.ACTIVE
+        self.listener_pool = listener_pool or self.listener_pool
+
+    def set_passive_mode(self) -> None:
+        """Usa modo pasivo (PASV) en las siguientes transferencias."""
+        self.mode = TransferMode.PASSIVE
+
     def _setup_data_connection(self):
         """Prepara conexión según el modo actual."""
         if self.mode == TransferMode.PASSIVE:
             self.enter_passive_mode()
         else:
-            # Implementar lógica para modo activo (PORT)
-            pass
+            self._open_active_listener()
+
+    def _open_active_listener(self):
+        """Toma un listener del pool y lo anuncia con PORT; se acepta tras la respuesta 1xx."""
+        self._close_data_connection()
+        pool = self.listener_pool or default_listener_pool()
+        listener = pool.acquire()
+        try:
+            # La dirección local de la conexión de control es la que alcanza el servidor
+            response = self.enter_active_mode(self.control_sock.getsockname()[0], listener.getsockname()[1])
+            if self._parse_code(response) != FTPResponseCode.COMMAND_OK:
+                raise FTPConnectionError(self._parse_code(response), "PORT rechazado")
+        except BaseException:
+            pool.release(listener)
+            raise
+        self._data_listener = (pool, listener)
+
+    def _accept_data_connection(self):
+        """En modo activo, acepta la conexión del servidor (solo desde su IP)."""
+        if self._data_listener is None:
+            return
+        pool, listener = self._data_listener
+        self._data_listener = None
+        try:
+            self.data_sock = pool.accept(listener, self.control_sock.getpeername()[0])
+            if self.tcp_keepalive is not None:
+                set_tcp_keepalive(self.data_sock, *self.tcp_keepalive)
+        finally:
+            pool.release(listener)
 
     def _parse_code(self, response: str) -> int:
         """Parses the response code from the server."""
         if not response:
             return 0
-        lines = response.split("\r\n")
-        return int(lines[-1].split()[0]) if lines else 0
+        # El código está al principio de la última línea
+        start = response.rfind("\n") + 1
+        return REPLY_CODES.get(response[start:start + 3], 0)
 
     def _parse_pasv_response(self, response: str) -> tuple[str, int]:
         """Parsea respuesta PASV (ej: 227 Entering Passive Mode (192,168,1,2,123,45))."""
-        match = re.search(r"(\d+,\d+,\d+,\d+),(\d+),(\d+)", response)
-        if not match:
-            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Respuesta PASV inválida")
-        ip = match.group(1).replace(",", ".")
-        port = (int(match.group(2)) << 8) + int(match.group(3))
-        return ip, port
-
-    def _receive_data(self, local_path: str):
-        """Recibe datos por el socket de datos y guarda en archivo."""
+        # Camino rápido: los seis números entre paréntesis
+        start = response.find("(")
+        try:
+            h1, h2, h3, h4, p1, p2 = map(int, response[start + 1:response.index(")", start)].split(","))
+        except ValueError:
+            match = PASV_ADDRESS.search(response)
+            if not match:
+                raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Respuesta PASV inválida")
+            h1, h2, h3, h4, p1, p2 = map(int, match.groups())
+        return f"{h1}.{h2}.{h3}.{h4}", (p1 << 8) + p2
+
+    def _new_progress(self, command: str, path: str, total: Optional[int] = None) -> TransferProgress:
+        return TransferProgress(command, path, total, self.progress_callback, self.progress_interval)
+
+    def _transfer_done(self, progress: TransferProgress, error: Optional[BaseException] = None) -> None:
+        """Cierra el seguimiento de una transferencia y emite su resumen."""
+        progress.finish(error)
+        self.last_transfer_stats = progress
+        record = progress.as_record()
+        self.logger.info("%s %s: %d bytes en %.3f s (%.2f MB/s)%s", progress.command, progress.path,
+                         progress.bytes, progress.elapsed, progress.average_rate / 1024 ** 2,
+                         f", error: {progress.error}" if progress.error else "", extra={"data": record})
+
+    @contextlib.contextmanager
+    def _track_transfer(self, command: str, path: str, total: Optional[int] = None):
+        """Seguimiento de una transferencia: ``_receive_data``/``_sendfile`` actualizan ``self._transfer``."""
+        if self._transfer is not None:
+            # Anidada (una descarga segmentada que recurre a un RETR normal): cuenta en la exterior
+            yield self._transfer
+            return
+        progress = self._transfer = self._new_progress(command, path, total)
+        error = None
         try:
-            with open(local_path, "wb") as f:
+            yield progress
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._transfer = None
+            self._transfer_done(progress, error)
+
+    def _transfer_buffer(self) -> bytearray:
+        """Buffer de ``buffer_size`` bytes para ``recv_into``, reutilizado entre transferencias."""
+        if self._data_buffer is None or len(self._data_buffer) != self.buffer_size:
+            self._data_buffer = bytearray(self.buffer_size)
+        return self._data_buffer
+
+    def _receive_data(self, local_path: str, offset: int = 0):
+        """Recibe datos por el socket de datos y guarda en archivo (desde ``offset``)."""
+        buffer = self._transfer_buffer()
+        view = memoryview(buffer)
+        progress = self._transfer
+        try:
+            # Sin buffer de Python en el archivo: cada bloque recibido va directo a write()
+            with open(local_path, "r+b" if offset and os.path.exists(local_path) else "wb",
+                      buffering=0) as f:
+                if offset:
+                    f.seek(offset)
+                    f.truncate()
+                # Sin buffer: desde aquí el tamaño del archivo es lo recibido
+                self._received_to = local_path
                 while True:
-                    chunk = self.data_sock.recv(DEFAULT_BUFFER_SIZE)
-                    if not chunk:
+                    received = self.data_sock.recv_into(buffer)
+                    if not received:
                         break
-                    f.write(chunk)
+                    f.write(view[:received])
+                    if progress is not None:
+                        progress.update(received)
         finally:
+            view.release()
             self._close_data_connection()
 
-    def _send_data(self, local_path: str):
-        """Envía datos desde un archivo local."""
+    def _send_data(self, local_path: str, offset: int = 0):
+        """Envía datos desde un archivo local (con ``sendfile``: sin copias a espacio de usuario)."""
         try:
             with open(local_path, "rb") as f:
-                while True:
-                    chunk = f.read(DEFAULT_BUFFER_SIZE)
-                    if not chunk:
-                        break
-                    self.data_sock.sendall(chunk)
+                self._sendfile(f, offset)
         finally:
             self._close_data_connection()
 
+    def _sendfile(self, f, offset: int = 0) -> None:
+        """``sendfile`` de ``f`` desde ``offset``; por tramos si hay que informar del progreso."""
+        progress = self._transfer
+        if progress is None:
+            self.data_sock.sendfile(f, offset)
+            return
+        if progress.total is None:
+            progress.total = os.fstat(f.fileno()).st_size - offset
+        # En una subida el "primer byte" es cuando la conexión de datos está lista para enviar
+        progress.update(0)
+        if progress.callback is None:
+            progress.update(self.data_sock.sendfile(f, offset))
+            return
+        step = 4 * self.buffer_size
+        while True:
+            sent = self.data_sock.sendfile(f, offset, step)
+            if not sent:
+                return
+            offset += sent
+            progress.update(sent)
+
     def _close_data_connection(self):
-        """Cierra el socket de datos."""
+        """Cierra el socket de datos (y devuelve el listener de PORT si no se usó)."""
         if self.data_sock:
             self.data_sock.close()
             self.data_sock = None
-
-    def _get_response(self) -> str:
-        """Lee la respuesta del servidor."""
-        response = []
+        if self._data_listener is not None:
+            pool, listener = self._data_listener
+            self._data_listener = None
+            pool.release(listener)
+
+    def _read_line(self) -> Optional[str]:
+        """Siguiente línea del canal de control sin el fin de línea; None si el servidor cerró."""
+        buffer = self._reply_buffer
         while True:
-            chunk = self.control_sock.recv(DEFAULT_BUFFER_SIZE).decode(errors="ignore")
+            end = buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(buffer[:end])
+                del buffer[:end + 1]
+                return line.rstrip(b"\r").decode(errors="ignore")
+            chunk = self.control_sock.recv(DEFAULT_BUFFER_SIZE)
             if not chunk:
-                break
-            response.append(chunk)
-            if "\r\n" in chunk:
-                break
-        return "".join(response).strip()
+                # Cierre con una línea a medias: se devuelve lo que haya
+                line = bytes(buffer)
+                buffer.clear()
+                return line.decode(errors="ignore") if line else None
+            buffer.extend(chunk)
+
+    def _get_response(self) -> str:
+        """Lee una respuesta completa del servidor.
+
+        Según RFC 959 una respuesta ``ddd-texto`` continúa hasta la línea que
+        empieza por ``ddd `` con el mismo código; las líneas intermedias pueden
+        tener cualquier forma. Lo que llegue detrás (la respuesta siguiente de
+        un pipeline, el 226 tras el 150) queda en el buffer para la próxima
+        llamada.
+        """
+        line = self._read_line()
+        while line == "":
+            line = self._read_line()
+        if line is None:
+            raise FTPConnectionError(FTPResponseCode.COMMAND_NOT_ACCEPTED, "El servidor cerró la conexión de control")
+        lines = [line]
+        code = line[:3]
+        if line[3:4] == "-" and code in REPLY_CODES:
+            terminator = code + " "
+            while True:
+                line = self._read_line()
+                if line is None:
+                    break
+                lines.append(line)
+                if line.startswith(terminator) or line == code:
+                    break
+        return "\r\n".join(lines).strip()
 
     def set_type(self, type_char: str, format_char: str = None) -> str:
         """Configura el tipo de transferencia."""
@@ -363,7 +893,7 @@ class FTPClient:
         if format_char:
             args.append(format_char)
         response = self.send_command("TYPE", *args)
-        if self._parse_code(response) == FTPResponseCode.FILE_ACTION_COMPLETED:
+        if self._parse_code(response) == FTPResponseCode.COMMAND_OK:
             self.transfer_type = type_char
         return response
 
@@ -372,7 +902,7 @@ class FTPClient:
         if not validate_transfer_mode(mode):
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Modo inválido")
         response = self.send_command("MODE", mode)
-        if self._parse_code(response) == FTPResponseCode.FILE_ACTION_COMPLETED:
+        if self._parse_code(response) == FTPResponseCode.COMMAND_OK:
             self.transfer_mode = mode
         return response
 
@@ -381,7 +911,7 @@ class FTPClient:
         if not validate_structure(structure):
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Estructura inválida")
         response = self.send_command("STRU", structure)
-        if self._parse_code(response) == FTPResponseCode.FILE_ACTION_COMPLETED:
+        if self._parse_code(response) == FTPResponseCode.COMMAND_OK:
             self.structure = structure
         return response
 
@@ -391,7 +921,7 @@ class FTPClient:
         if point is None:
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Marcador de reinicio inválido")
         response = self.send_command("REST", str(point))
-        if self._parse_code(response) == FTPResponseCode.FILE_ACTION_COMPLETED:
+        if self._parse_code(response) == FTPResponseCode.FILE_ACTION_PENDING:
             self.restart_point = point
         return response
 
@@ -402,10 +932,12 @@ class FTPClient:
             self.authenticated = False
         return response
 
+    @retryable
     def get_system(self) -> str:
         """Obtiene información del sistema."""
         return self.send_command("SYST")
 
+    @retryable
     def get_status(self, path: str = "") -> str:
         """Obtiene el estado del servidor o archivo."""
         return self.send_command("STAT", path)
@@ -414,17 +946,21 @@ class FTPClient:
         """Almacena un archivo con nombre único."""
         if local_path and not validate_path(local_path):
             FTPClientError(500, f"Error en STOU. Ruta inválida {local_path}")
-        self._setup_data_connection()
-        response = self.send_command("STOU")
-        if self._parse_code(response) not in (125, 150):
-            raise FTPTransferError(self._parse_code(response), "Error en STOU")
-        self._send_data(local_path)
-        return self._get_response()
+        with self._track_transfer("STOU", local_path):
+            self._setup_data_connection()
+            response = self.send_command("STOU")
+            if self._parse_code(response) not in (125, 150):
+                self._close_data_connection()
+                raise FTPTransferError(self._parse_code(response), "Error en STOU")
+            self._accept_data_connection()
+            self._send_data(local_path)
+            return self._get_response()
 
     def get_help(self, command: str = "") -> str:
         """Obtiene ayuda sobre comandos."""
         return self.send_command("HELP", command)
 
+    @retryable
     def noop(self) -> str:
         """Mantiene la conexión activa."""
         return self.send_command("NOOP")
@@ -433,28 +969,77 @@ class FTPClient:
         """Aborta la transferencia en curso."""
         return self.send_command("ABOR")
 
+    @retryable
+    def get_size(self, path: str) -> int:
+        """Tamaño en bytes de un archivo remoto (SIZE)."""
+        response = self.send_command("SIZE", path)
+        if self._parse_code(response) != FTPResponseCode.FILE_STATUS:
+            raise FTPClientError(self._parse_code(response), "Error obteniendo el tamaño")
+        return int(response.split()[1])
+
+    @retryable
+    def get_mtime(self, path: str) -> int:
+        """Fecha de modificación de un archivo remoto en segundos UTC (MDTM)."""
+        response = self.send_command("MDTM", path)
+        timestamp = None
+        if self._parse_code(response) == FTPResponseCode.FILE_STATUS:
+            timestamp = parse_ftp_time(response[4:].strip())
+        if timestamp is None:
+            raise FTPClientError(self._parse_code(response), "Error obteniendo la fecha de modificación")
+        return timestamp
+
+    def set_mtime(self, path: str, timestamp: float) -> str:
+        """Cambia la fecha de modificación de un archivo remoto (MFMT)."""
+        response = self.send_command("MFMT", format_ftp_time(timestamp), path)
+        if self._parse_code(response) != FTPResponseCode.FILE_STATUS:
+            raise FTPClientError(self._parse_code(response), "Error cambiando la fecha de modificación")
+        return response
+
+    @retryable
+    def get_hash(self, path: str) -> str:
+        """SHA-256 (hexadecimal) de un archivo remoto calculado por el servidor (HASH)."""
+        response = self.send_command("HASH", path)
+        parts = response.split()
+        if self._parse_code(response) != FTPResponseCode.FILE_STATUS or len(parts) < 4:
+            raise FTPClientError(self._parse_code(response), "Error obteniendo el hash")
+        return parts[3].lower()
+
+    @retryable
     def get_features(self) -> dict:
         """Obtiene y parsea características del servidor."""
         response = self.send_command("FEAT")
         return parse_features_response(response)
 
+    @retryable
     def list_directory(self, path: str = "") -> list[dict]:
         """Lista directorio con formato estructurado."""
         if path and not validate_path(path):
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
-        
+        key = self._cache_key(path)
+        if key is not None:
+            cached = self.cache.get("LIST", key)
+            if cached is not None:
+                return list(cached)
+        entries = self._list_directory(path)
+        if key is not None:
+            self.cache.put("LIST", key, list(entries))
+        return entries
+
+    def _list_directory(self, path: str) -> list[dict]:
         self._setup_data_connection()
         
         # Enviar comando LIST y obtener respuesta inicial
         initial_response = self.send_command("LIST", path)
         if self._parse_code(initial_response) not in (125, 150):
+            self._close_data_connection()
             raise FTPClientError(self._parse_code(initial_response), "Error en comando LIST")
+        self._accept_data_connection()
         
         # Recibir datos del socket de datos
         data = []
         try:
             while True:
-                chunk = self.data_sock.recv(DEFAULT_BUFFER_SIZE)
+                chunk = self.data_sock.recv(self.buffer_size)
                 if not chunk:
                     break
                 data.append(chunk.decode(errors='ignore'))
@@ -483,31 +1068,122 @@ class FTPClient:
                    for line in received_data.split('\n') 
                    if line.strip()]
 
+    def _iter_data(self):
+        """Produce los bloques del socket de datos hasta que el servidor lo cierra."""
+        while True:
+            chunk = self.data_sock.recv(self.buffer_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _iter_listing(self, command: str, path: str):
+        """Envía LIST/NLST y produce las líneas recibidas según llegan."""
+        if path and not validate_path(path):
+            raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
+
+        self._setup_data_connection()
+        response = self.send_command(command, path)
+        if self._parse_code(response) not in (125, 150):
+            self._close_data_connection()
+            raise FTPClientError(self._parse_code(response), f"Error en comando {command}")
+        self._accept_data_connection()
+
+        completed = False
+        try:
+            yield from iter_lines(self._iter_data())
+            completed = True
+        finally:
+            # También si el consumidor para antes: el canal de control queda sincronizado
+            self._close_data_connection()
+            final_response = self._get_response()
+        if completed and self._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
+            raise FTPClientError(self._parse_code(final_response), f"Error completando {command}")
+
+    def iter_directory(self, path: str = "") -> Iterator[ListEntry]:
+        """Como ``list_directory`` pero en streaming: produce un ``ListEntry`` por entrada
+        sin guardar el listado completo en memoria."""
+        return iter_list_response(self._iter_listing("LIST", path))
+
+    def iter_files(self, path: str = "") -> Iterator[str]:
+        """Como ``list_files`` pero en streaming: produce un nombre por línea."""
+        return (line for line in self._iter_listing("NLST", path) if line)
+
+    def iter_mlsd(self, path: str = "") -> Iterator[MlsdEntry]:
+        """Listado MLSD en streaming: un ``MlsdEntry`` (tipo, tamaño, fecha) por entrada."""
+        return iter_mlsd_response(self._iter_listing("MLSD", path))
+
+    def mirror(self, local_dir: str, remote_dir: str = "", upload: bool = True, delete: bool = False,
+               dry_run: bool = False, workers: int = 4, retries: int = 2, checksum: bool = False,
+               state_path: Optional[str] = None, progress: Optional[Callable] = None):
+        """Sincroniza un árbol local y uno remoto transfiriendo solo lo que cambió.
+        Devuelve un ``MirrorResult``; ver ``FTP.Client.mirror``."""
+        from FTP.Client.mirror import mirror
+        try:
+            return mirror(self, local_dir, remote_dir, upload, delete, dry_run, workers, retries,
+                          checksum, state_path, progress)
+        finally:
+            # Los cambios los hacen las sesiones del pool, no este cliente
+            if self.cache is not None:
+                self.cache.invalidate()
+
+    def mget(self, remote_paths, local_dir: str = ".", workers: int = 4, retries: int = 2,
+             progress: Optional[Callable] = None):
+        """Descarga varios archivos (admite patrones) en paralelo por ``workers`` sesiones.
+        Devuelve un ``BatchResult`` con el resumen; ver ``FTP.Client.batch``."""
+        from FTP.Client.batch import mget
+        return mget(self, remote_paths, local_dir, workers, retries, progress)
+
+    def mput(self, local_paths, remote_dir: str = "", workers: int = 4, retries: int = 2,
+             progress: Optional[Callable] = None):
+        """Sube varios archivos en paralelo por ``workers`` sesiones.
+        Devuelve un ``BatchResult`` con el resumen; ver ``FTP.Client.batch``."""
+        from FTP.Client.batch import mput
+        try:
+            return mput(self, local_paths, remote_dir, workers, retries, progress)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate()
+
+    @retryable
     def change_to_parent_dir(self) -> str:
         """Cambia al directorio padre (CDUP)."""
         response = self.send_command("CDUP")
         # Verificar si la respuesta contiene un código de éxito (250 o 200)
         if self._parse_code(response) in [250, 200]:
+            self._remember_dir()
             return response
         raise FTPClientError(self._parse_code(response), "Error cambiando al directorio padre")
 
+    @retryable
     def list_files(self, path: str = "") -> str:
         """Lista solo nombres de archivos usando NLST."""
         if path and not validate_path(path):
             raise FTPClientError(FTPResponseCode.BAD_COMMAND, "Ruta inválida")
-        
+        key = self._cache_key(path)
+        if key is not None:
+            cached = self.cache.get("NLST", key)
+            if cached is not None:
+                return cached
+        names = self._list_files(path)
+        if key is not None:
+            self.cache.put("NLST", key, names)
+        return names
+
+    def _list_files(self, path: str) -> str:
         self._setup_data_connection()
         
         # Enviar comando NLST
         response = self.send_command("NLST", path)
         if self._parse_code(response) not in (125, 150):
+            self._close_data_connection()
             raise FTPClientError(self._parse_code(response), "Error en comando NLST")
+        self._accept_data_connection()
         
         # Recibir datos
         data = []
         try:
             while True:
-                chunk = self.data_sock.recv(DEFAULT_BUFFER_SIZE)
+                chunk = self.data_sock.recv(self.buffer_size)
                 if not chunk:
                     break
                 data.append(chunk.decode(errors='ignore'))
@@ -525,7 +1201,40 @@ class FTPClient:
 #---------------#
 # FTP Client CLI#
 #---------------#
+def run_batch(client: FTPClient, args) -> int:
+    """Modo script: todos los comandos de ``args.file`` sobre la sesión ya abierta"""
+    import json
+    import sys
+    from FTP.Client.script import parse_script, run_script, summarize
+
+    if args.file == "-":
+        commands = parse_script(sys.stdin)
+    else:
+        with open(args.file, encoding="utf-8") as script:
+            commands = parse_script(script)
+
+    def show(result):
+        if args.json:
+            print(json.dumps(result.as_record(), ensure_ascii=False), flush=True)
+            return
+        prefix = f"[{result.elapsed * 1000:8.2f} ms] " if args.timing else ""
+        print(prefix + (result.response if result.error is None else f"Error: {result.error}"))
+
+    results, elapsed = run_script(client, commands, pipeline=not args.no_pipeline,
+                                  stop_on_error=args.stop_on_error, on_result=show)
+    summary = summarize(results, elapsed)
+    if args.json:
+        print(json.dumps({"summary": summary}))
+    elif args.timing:
+        print(f"{summary['ok']}/{summary['commands']} comandos correctos en {elapsed:.3f} s "
+              f"({summary['commands_per_s']} comandos/s, {summary['pipelined']} encadenados)")
+    return 1 if summary["failed"] else 0
+
+
 def main():
+    # argparse solo hace falta al ejecutar como programa, no al importar el cliente
+    import argparse
+
     parser = argparse.ArgumentParser(description="Cliente FTP", add_help=False)
     parser.add_argument("-h", "--host", required=True, help="Dirección del servidor FTP")
     parser.add_argument("-p", "--port", type=int, default=21, help="Puerto del servidor")
@@ -534,10 +1243,28 @@ def main():
     parser.add_argument("-c", "--command", required=False, help="Comando FTP a ejecutar")
     parser.add_argument("-a", "--arg1", help="Primer argumento del comando")
     parser.add_argument("-b", "--arg2", help="Segundo argumento del comando")
+    parser.add_argument("-f", "--file", help="Script con un comando por línea ('-' para la entrada estándar)")
+    parser.add_argument("--json", action="store_true", help="Con -f: un resultado JSON por línea")
+    parser.add_argument("--timing", action="store_true", help="Con -f: tiempo de cada comando y total")
+    parser.add_argument("--no-pipeline", action="store_true", help="Con -f: no encadenar comandos")
+    parser.add_argument("--stop-on-error", action="store_true", help="Con -f: parar en el primer fallo")
     parser.add_argument("--help", action="help", default=argparse.SUPPRESS, help="Mostrar este mensaje de ayuda")
     args = parser.parse_args()
 
     client = FTPClient(host=args.host, port=args.port)
+    if args.file:
+        # Una sola conexión y un solo login para todo el script
+        try:
+            client.connect()
+            client.login(args.user, args.password)
+        except FTPClientError as e:
+            print(f"Error: {e}")
+            raise SystemExit(2)
+        try:
+            status = run_batch(client, args)
+        finally:
+            client.close()
+        raise SystemExit(status)
     try:
         # Conexión y autenticación
         connection_response = client.connect()
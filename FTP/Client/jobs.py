@@ -0,0 +1,220 @@
+import itertools
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+from FTP.Client.client import FTPClient
+from FTP.Client.pool import FTPConnectionPool
+from FTP.Client.progress import TransferProgress
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+
+class TransferCancelled(Exception):
+    """La transferencia se canceló desde ``TransferQueue.cancel``"""
+
+
+class BackgroundJob:
+    """Una transferencia de la cola: RETR, STOR o APPE de un archivo."""
+
+    QUEUED, RUNNING, DONE, FAILED, CANCELLED = "en cola", "activo", "completado", "error", "cancelado"
+
+    def __init__(self, job_id: int, command: str, source: str, target: str, total: Optional[int] = None):
+        self.id = job_id
+        self.command = command
+        self.source = source
+        self.target = target
+        self.total = total
+        self.state = self.QUEUED
+        self.submitted = time.monotonic()
+        # TransferProgress de la transferencia en curso (o de la última)
+        self.progress: Optional[TransferProgress] = None
+        self.response: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self._client: Optional[FTPClient] = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def bytes(self) -> int:
+        return self.progress.bytes if self.progress is not None else 0
+
+    @property
+    def rate(self) -> float:
+        """Velocidad reciente si está activa; media si ya terminó"""
+        if self.progress is None:
+            return 0.0
+        return self.progress.rate if self.state == self.RUNNING else self.progress.average_rate
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+
+class TransferQueue:
+    """Cola de transferencias en segundo plano servida por ``workers`` sesiones propias.
+
+    Cada trabajador toma una sesión de ``pool`` (no usa la conexión del
+    usuario, que queda libre para otros comandos) y atiende los trabajos en
+    orden de llegada; los que se ejecutan a la vez se reparten el ancho de
+    banda. Las rutas remotas son relativas a la raíz, como en las sesiones
+    del pool. Las descargas se escriben en ``.part`` y se renombran al
+    terminar. ``cancel`` quita un trabajo de la cola o corta su conexión de
+    datos; la sesión de un trabajo cancelado se descarta.
+
+    Uso::
+
+        transfers = TransferQueue(FTPConnectionPool.from_client(client, size=2), workers=2)
+        job = transfers.submit("RETR", "iso/big.iso", "big.iso")
+        transfers.wait()
+    """
+
+    def __init__(self, pool: FTPConnectionPool, workers: int = 2):
+        self.pool = pool
+        self.workers = max(1, workers)
+        self._jobs: Dict[int, BackgroundJob] = {}
+        self._pending: "queue.Queue[Optional[BackgroundJob]]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+    def submit(self, command: str, source: str, target: str, total: Optional[int] = None) -> BackgroundJob:
+        command = command.upper()
+        if command not in ("RETR", "STOR", "APPE"):
+            raise ValueError(f"Comando no admitido en segundo plano: {command}")
+        with self._lock:
+            if self._closed:
+                raise ValueError("La cola de transferencias está cerrada")
+            job = BackgroundJob(next(self._ids), command, source, target, total)
+            self._jobs[job.id] = job
+            # Un hilo más mientras no se llegue a ``workers``
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f"ftp-job-{len(self._threads) + 1}",
+                                          daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._pending.put(job)
+        return job
+
+    def jobs(self) -> List[BackgroundJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def get(self, job_id: int) -> Optional[BackgroundJob]:
+        return self._jobs.get(job_id)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            if job._cancel.is_set():
+                continue
+            self._run(job)
+
+    def _run(self, job: BackgroundJob) -> None:
+        client = None
+        broken = False
+        try:
+            client = self.pool.acquire()
+            job._client = client
+            job.state = BackgroundJob.RUNNING
+            if job._cancel.is_set():
+                raise TransferCancelled()
+
+            def update(stats: TransferProgress) -> None:
+                job.progress = stats
+                if job._cancel.is_set() and not stats.done:
+                    raise TransferCancelled()
+
+            client.progress_callback = update
+            if job.command == "RETR":
+                partial = job.target + ".part"
+                try:
+                    job.response = client.download_file(job.source, partial)
+                    os.replace(partial, job.target)
+                except BaseException:
+                    if os.path.exists(partial):
+                        os.remove(partial)
+                    raise
+            elif job.command == "STOR":
+                job.response = client.upload_file(job.source, job.target)
+            else:
+                job.response = client.append_file(job.source, job.target)
+            job.state = BackgroundJob.DONE
+        except Exception as e:
+            # Tras cancelar o fallar a mitad de una transferencia la sesión no es fiable
+            broken = True
+            job.error = e
+            job.state = BackgroundJob.CANCELLED if job._cancel.is_set() else BackgroundJob.FAILED
+            if job.state == BackgroundJob.FAILED:
+                logger.warning("Fallo en segundo plano %s %s: %s", job.command, job.source, e)
+        finally:
+            job._client = None
+            if client is not None:
+                client.progress_callback = None
+                self.pool.release(client, discard=broken)
+            job._finished.set()
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancela un trabajo en cola o en curso; False si no existe o ya terminó"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel.set()
+        if job.state == BackgroundJob.QUEUED:
+            job.state = BackgroundJob.CANCELLED
+            job._finished.set()
+            return True
+        # Cortar la conexión de datos desbloquea al trabajador aunque no lleguen datos
+        client = job._client
+        data_sock = client.data_sock if client is not None else None
+        if data_sock is not None:
+            try:
+                data_sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return True
+
+    def wait(self, job_id: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Espera a un trabajo (o a todos); False si vence ``timeout``"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        jobs = [self._jobs[job_id]] if job_id is not None else self.jobs()
+        for job in jobs:
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            if not job.wait(remaining):
+                return False
+        return True
+
+    def stats(self) -> dict:
+        """Totales de la cola y velocidad agregada de las transferencias activas"""
+        jobs = self.jobs()
+        counts = {state: 0 for state in (BackgroundJob.QUEUED, BackgroundJob.RUNNING, BackgroundJob.DONE,
+                                         BackgroundJob.FAILED, BackgroundJob.CANCELLED)}
+        for job in jobs:
+            counts[job.state] += 1
+        active = [job for job in jobs if job.state == BackgroundJob.RUNNING]
+        return {"jobs": len(jobs), "states": counts, "bytes": sum(job.bytes for job in jobs),
+                "rate": sum(job.rate for job in active)}
+
+    def close(self, cancel: bool = True) -> None:
+        """Detiene los trabajadores (cancelando lo pendiente) y cierra el pool"""
+        with self._lock:
+            self._closed = True
+            threads = list(self._threads)
+        if cancel:
+            for job in self.jobs():
+                self.cancel(job.id)
+        for _ in threads:
+            self._pending.put(None)
+        for thread in threads:
+            thread.join()
+        self.pool.close()
@@ -0,0 +1,91 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from FTP.Common.exceptions import FTPClientError
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+
+def set_tcp_keepalive(sock: socket.socket, idle: int = 60, interval: int = 15, count: int = 4) -> None:
+    """Activa TCP keepalive: primera sonda tras ``idle`` s sin tráfico, luego cada
+    ``interval`` s; la conexión se da por perdida tras ``count`` sondas sin respuesta.
+
+    Mantiene vivas las entradas de los NAT y firewalls intermedios mientras
+    el canal de control está parado durante una transferencia larga. Las
+    opciones que el sistema no ofrece se omiten.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # macOS llama TCP_KEEPALIVE a lo que Linux llama TCP_KEEPIDLE
+    idle_option = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+    for option, value in ((idle_option, idle), (getattr(socket, "TCP_KEEPINTVL", None), interval),
+                          (getattr(socket, "TCP_KEEPCNT", None), count)):
+        if option is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, option, value)
+
+
+class IdleKeepalive:
+    """Envía NOOP por una sesión interactiva cuando lleva ``interval`` segundos sin usarse.
+
+    Un hilo en segundo plano comprueba la sesión; las operaciones del
+    usuario se ejecutan dentro de ``busy()`` para que el NOOP nunca se
+    intercale con ellas (ni con una transferencia, cuyo 226 aún no ha
+    llegado). Sin ``IdleKeepalive`` el cliente no paga nada. Para las sesiones
+    de ``FTPConnectionPool`` se usa su parámetro ``keepalive``.
+
+    Uso::
+
+        keepalive = IdleKeepalive(client, interval=60).start()
+        with keepalive.busy():
+            client.download_file("a.txt")
+        keepalive.stop()
+    """
+
+    def __init__(self, client, interval: float = 60.0):
+        self.client = client
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # NOOP enviados (para diagnóstico)
+        self.sent = 0
+
+    def start(self) -> "IdleKeepalive":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ftp-keepalive", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    @contextmanager
+    def busy(self) -> Iterator[None]:
+        with self._lock:
+            try:
+                yield
+            finally:
+                self._last_used = time.monotonic()
+
+    def _run(self) -> None:
+        while not self._stop.wait(max(0.05, self.interval - (time.monotonic() - self._last_used))):
+            # Si la sesión está ocupada no hace falta NOOP: ya hay tráfico
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if time.monotonic() - self._last_used < self.interval or not self.client.control_sock:
+                    continue
+                self.client.noop()
+                self.sent += 1
+            except (OSError, FTPClientError) as e:
+                logger.warning("NOOP de mantenimiento fallido: %s", e)
+            finally:
+                self._last_used = time.monotonic()
+                self._lock.release()
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from FTP.Client.batch import (BatchResult, BatchTransfer, TransferJob, _download, _replace_remote, _upload,
+                              remote_cwd, root_relative)
+from FTP.Client.client import FTPClient
+from FTP.Client.pool import FTPConnectionPool
+from FTP.Common.constants import FTPResponseCode
+from FTP.Common.exceptions import FTPClientError
+from FTP.Common.logger import get_logger
+from FTP.Common.utils import calculate_file_hash, parse_ftp_time
+
+logger = get_logger("ftp.client")
+
+# MDTM y MLSD dan las fechas con resolución de segundos
+MTIME_TOLERANCE = 1
+STATE_VERSION = 1
+
+FileInfo = namedtuple("FileInfo", "size mtime")
+# op: MKD, STOR, RETR, DELE o RMD sobre el lado destino; replace: el destino ya existe;
+# verify: comparar hashes antes de transferir
+MirrorAction = namedtuple("MirrorAction", "op path size mtime replace verify")
+
+
+class DirListing:
+    """Contenido de un directorio: archivos (nombre -> ``FileInfo``) y subdirectorios."""
+
+    def __init__(self):
+        self.files: Dict[str, FileInfo] = {}
+        self.dirs: List[str] = []
+
+
+def _depth(rel: str) -> int:
+    return rel.count("/") + 1 if rel else 0
+
+
+def _inside(rel: str, roots: Iterable[str]) -> bool:
+    """``rel`` es uno de ``roots`` o está debajo de alguno"""
+    return any(not root or rel == root or rel.startswith(root + "/") for root in roots)
+
+
+def _remote_path(base: str, rel: str) -> str:
+    return "/".join(part for part in (base, rel) if part and part != ".") or "."
+
+
+def walk_local(root: str, exclude: Iterable[str] = ()) -> Dict[str, DirListing]:
+    """Recorre el árbol local; devuelve directorio relativo (``""`` la raíz) -> ``DirListing``"""
+    exclude = {os.path.abspath(path) for path in exclude}
+    tree: Dict[str, DirListing] = {}
+    if not os.path.isdir(root):
+        return tree
+    pending = [""]
+    while pending:
+        rel = pending.pop()
+        listing = tree[rel] = DirListing()
+        with os.scandir(os.path.join(root, rel)) as entries:
+            for entry in entries:
+                if os.path.abspath(entry.path) in exclude:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    listing.dirs.append(entry.name)
+                    pending.append(posixpath.join(rel, entry.name))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    listing.files[entry.name] = FileInfo(stat.st_size, int(stat.st_mtime))
+    return tree
+
+
+def list_remote(client: FTPClient, path: str, mlsd: bool = True, mdtm: bool = False) -> DirListing:
+    """Un directorio remoto con MLSD; sin él, LIST más un MDTM por archivo si está disponible"""
+    listing = DirListing()
+    if mlsd:
+        for entry in client.iter_mlsd(path):
+            if entry.type == "dir":
+                listing.dirs.append(entry.name)
+            elif entry.type == "file":
+                listing.files[entry.name] = FileInfo(entry.size or 0, parse_ftp_time(entry.modify))
+        return listing
+    # Los MDTM van después del listado: durante LIST el canal de control está ocupado
+    entries = list(client.iter_directory(path))
+    for entry in entries:
+        if entry.type == "d":
+            listing.dirs.append(entry.name)
+        else:
+            mtime = client.get_mtime(_remote_path(path, entry.name)) if mdtm else None
+            listing.files[entry.name] = FileInfo(entry.size, mtime)
+    return listing
+
+
+def walk_remote(pool: FTPConnectionPool, base: str, workers: int = 4,
+                skip: Optional[Callable[[str], bool]] = None, mlsd: bool = True,
+                mdtm: bool = False) -> Tuple[Dict[str, DirListing], Set[str]]:
+    """Recorre el árbol remoto listando varios directorios a la vez (uno por sesión).
+
+    Los directorios para los que ``skip`` devuelve True no se listan y se
+    devuelven aparte. Un directorio inexistente (550) simplemente no aparece.
+    """
+    tree: Dict[str, DirListing] = {}
+    skipped: Set[str] = set()
+    if skip and skip(""):
+        return tree, {""}
+    pending, errors = [""], []
+    state = {"active": 0}
+    cond = threading.Condition()
+
+    def worker():
+        while True:
+            with cond:
+                while not pending and state["active"] and not errors:
+                    cond.wait()
+                if not pending or errors:
+                    return
+                rel = pending.pop()
+                state["active"] += 1
+            listing = None
+            try:
+                with pool.connection() as client:
+                    listing = list_remote(client, _remote_path(base, rel), mlsd, mdtm)
+            except FTPClientError as e:
+                if e.code != FTPResponseCode.FILE_NOT_FOUND:
+                    errors.append(e)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                with cond:
+                    if listing is not None:
+                        tree[rel] = listing
+                        for name in listing.dirs:
+                            child = posixpath.join(rel, name)
+                            if skip and skip(child):
+                                skipped.add(child)
+                            else:
+                                pending.append(child)
+                    state["active"] -= 1
+                    cond.notify_all()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return tree, skipped
+
+
+def subtree_signatures(tree: Dict[str, DirListing]) -> Dict[str, str]:
+    """Huella de cada subárbol (nombres, tamaños y fechas de todo lo que cuelga de él)"""
+    signatures: Dict[str, str] = {}
+    # Los hijos antes que los padres: la huella del padre incluye la de sus hijos
+    for rel in sorted(tree, key=_depth, reverse=True):
+        listing = tree[rel]
+        digest = hashlib.sha1()
+        for name, info in sorted(listing.files.items()):
+            digest.update(f"f {name}\0{info.size}\0{info.mtime}\n".encode())
+        for name in sorted(listing.dirs):
+            digest.update(f"d {name}\0{signatures.get(posixpath.join(rel, name), '')}\n".encode())
+        signatures[rel] = digest.hexdigest()
+    return signatures
+
+
+def _changed(source: FileInfo, target: FileInfo, exact_times: bool) -> bool:
+    if source.size != target.size:
+        return True
+    if source.mtime is None or target.mtime is None:
+        return False
+    if exact_times:
+        return abs(source.mtime - target.mtime) > MTIME_TOLERANCE
+    # Sin forma de fijar la fecha en el destino, este queda siempre más nuevo
+    return source.mtime > target.mtime + MTIME_TOLERANCE
+
+
+def plan_mirror(source: Dict[str, DirListing], target: Dict[str, DirListing], upload: bool,
+                delete: bool = False, exact_times: bool = True, checksum: bool = False,
+                skipped: Iterable[str] = ()) -> List[MirrorAction]:
+    """Operaciones para que ``target`` quede igual que ``source`` (padres antes que hijos)"""
+    transfer = "STOR" if upload else "RETR"
+    actions = []
+    for rel in sorted(source, key=lambda rel: (_depth(rel), rel)):
+        if _inside(rel, skipped):
+            continue
+        listing = source[rel]
+        existing = target.get(rel)
+        if existing is None:
+            actions.append(MirrorAction("MKD", rel, 0, None, False, False))
+            existing = DirListing()
+        for name, info in sorted(listing.files.items()):
+            current = existing.files.get(name)
+            if current is None or _changed(info, current, exact_times):
+                # Mismo tamaño y otra fecha: con checksum se comparan hashes antes de transferir
+                verify = checksum and current is not None and current.size == info.size
+                actions.append(MirrorAction(transfer, posixpath.join(rel, name), info.size, info.mtime,
+                                            current is not None, verify))
+        if delete:
+            for name in sorted(existing.files):
+                if name not in listing.files:
+                    actions.append(MirrorAction("DELE", posixpath.join(rel, name), 0, None, False, False))
+            for name in sorted(existing.dirs):
+                if name not in listing.dirs:
+                    actions.append(MirrorAction("RMD", posixpath.join(rel, name), 0, None, False, False))
+    return actions
+
+
+def load_state(path: str, key: str) -> Dict[str, str]:
+    """Huellas guardadas por la última sincronización con el mismo destino"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION or state.get("key") != key:
+        return {}
+    return state.get("signatures", {})
+
+
+def save_state(path: str, key: str, signatures: Dict[str, str]) -> None:
+    # Escritura atómica: un corte a medias no deja un estado corrupto
+    partial = path + ".tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "key": key, "signatures": signatures}, f)
+    os.replace(partial, path)
+
+
+class MirrorJob(TransferJob):
+    """Una operación del plan como trabajo de ``BatchTransfer``."""
+
+    def __init__(self, action: MirrorAction, local: str, remote: str, upload: bool):
+        source, target = (local, remote) if upload else (remote, local)
+        super().__init__(source, target, action.size if action.op in ("STOR", "RETR") else 0)
+        self.action = action
+        self.local = local
+        self.remote = remote
+
+
+class MirrorResult(BatchResult):
+    """Resultado de ``mirror``: el plan ejecutado y el resumen de todas sus operaciones."""
+
+    def __init__(self, actions: List[MirrorAction], jobs: List[MirrorJob], elapsed: float, workers: int,
+                 skipped: Iterable[str] = (), dry_run: bool = False):
+        super().__init__(jobs, elapsed, workers)
+        self.actions = actions
+        self.skipped = sorted(skipped)
+        self.dry_run = dry_run
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for action in self.actions:
+            counts[action.op] = counts.get(action.op, 0) + 1
+        return counts
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{op} {count}" for op, count in sorted(self.counts().items())) or "sin cambios"
+        if self.dry_run:
+            return f"Simulación: {counts}" + "".join(f"\n  {action.op} {action.path or '.'}"
+                                                      for action in self.actions)
+        return f"{counts}; " + super().summary()
+
+
+def _apply(client: FTPClient, job: MirrorJob, upload: bool, exact_times: bool) -> None:
+    action = job.action
+    if action.op in ("STOR", "RETR"):
+        same = action.verify and calculate_file_hash(job.local, "sha256") == client.get_hash(job.remote)
+        if same:
+            pass
+        elif not upload:
+            _download(client, job)
+        elif action.replace:
+            _replace_remote(client, job.local, job.remote)
+        else:
+            _upload(client, job)
+        # Misma fecha en ambos lados: la próxima comparación no ve cambios
+        if action.mtime is not None:
+            if not upload:
+                os.utime(job.local, (action.mtime, action.mtime))
+            elif exact_times:
+                client.set_mtime(job.remote, action.mtime)
+    elif upload:
+        {"MKD": client.make_dir, "DELE": client.delete_file, "RMD": client.remove_dir}[action.op](job.remote)
+    elif action.op == "MKD":
+        os.makedirs(job.local, exist_ok=True)
+    elif action.op == "DELE":
+        os.remove(job.local)
+    else:
+        shutil.rmtree(job.local)
+
+
+def mirror(client: FTPClient, local_dir: str, remote_dir: str = "", upload: bool = True, delete: bool = False,
+           dry_run: bool = False, workers: int = 4, retries: int = 2, checksum: bool = False,
+           state_path: Optional[str] = None, progress: Optional[Callable] = None) -> MirrorResult:
+    """Deja ``remote_dir`` igual que ``local_dir`` (``upload``) o al revés, transfiriendo solo lo que cambió.
+
+    Los dos árboles se recorren a la vez (el remoto con varias sesiones del
+    pool) y se comparan por tamaño y fecha; con ``checksum`` los archivos
+    del mismo tamaño y distinta fecha se comparan por SHA-256 (HASH) antes
+    de transferirlos. Las operaciones se ejecutan en paralelo por fases:
+    borrados (solo con ``delete``), directorios y transferencias. Con
+    ``dry_run`` solo se devuelve el plan.
+
+    En subidas, ``state_path`` guarda la huella de cada subárbol local
+    sincronizado sin errores: en la siguiente ejecución los subárboles con la
+    misma huella no se listan en el servidor (se asume que solo este espejo
+    modifica el destino).
+    """
+    start = time.perf_counter()
+    if upload and not os.path.isdir(local_dir):
+        raise FTPClientError(FTPResponseCode.FILE_NOT_FOUND, f"No existe el directorio local {local_dir}")
+    base = root_relative(remote_cwd(client), remote_dir)
+    features = client.get_features()
+    mlsd = "MLST" in features
+    # Las descargas fijan la fecha con os.utime; las subidas necesitan MFMT
+    exact_times = not upload or "MFMT" in features
+    checksum = checksum and "HASH" in features
+    pool = client.parallel_pool(workers)
+    key = f"{client.host}:{client.port}/{base}{' delete' if delete else ''}"
+    saved = load_state(state_path, key) if state_path and upload else {}
+    exclude = [state_path, state_path + ".tmp"] if state_path else []
+
+    local_tree: Dict[str, DirListing] = {}
+    if saved:
+        # Las huellas locales deciden qué subárboles remotos hace falta listar
+        local_tree = walk_local(local_dir, exclude)
+        local_signatures = subtree_signatures(local_tree)
+
+        def unchanged(rel: str) -> bool:
+            return rel in saved and saved[rel] == local_signatures.get(rel)
+
+        remote_tree, skipped = walk_remote(pool, base, workers, unchanged, mlsd, "MDTM" in features)
+    else:
+        errors = []
+
+        def walk():
+            try:
+                local_tree.update(walk_local(local_dir, exclude))
+            except OSError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=walk, daemon=True)
+        thread.start()
+        remote_tree, skipped = walk_remote(pool, base, workers, None, mlsd, "MDTM" in features)
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    source, target = (local_tree, remote_tree) if upload else (remote_tree, local_tree)
+    actions = plan_mirror(source, target, upload, delete, exact_times, checksum, skipped)
+    logger.info("Espejo %s -> %s: %s operaciones, %s subárboles sin cambios",
+                local_dir if upload else base, base if upload else local_dir, len(actions), len(skipped))
+    if dry_run:
+        return MirrorResult(actions, [], time.perf_counter() - start, workers, skipped, dry_run=True)
+
+    jobs = [MirrorJob(action, os.path.join(local_dir, *action.path.split("/")) if action.path else local_dir,
+                      _remote_path(base, action.path), upload)
+            for action in actions]
+    phases = ([job for job in jobs if job.action.op in ("DELE", "RMD")],
+              [job for job in jobs if job.action.op == "MKD"],
+              [job for job in jobs if job.action.op in ("STOR", "RETR")])
+    for phase in phases:
+        if phase:
+            BatchTransfer(pool, workers, retries, progress=progress if phase is phases[2] else None).run(
+                phase, lambda session, job: _apply(session, job, upload, exact_times))
+
+    result = MirrorResult(actions, jobs, time.perf_counter() - start, workers, skipped)
+    if state_path and upload:
+        # Solo cuentan los subárboles sin fallos: los demás se vuelven a listar
+        failed = set()
+        for job in result.failed:
+            rel = job.action.path if job.action.op == "MKD" else posixpath.dirname(job.action.path)
+            while True:
+                failed.add(rel)
+                if not rel:
+                    break
+                rel = posixpath.dirname(rel)
+        signatures = subtree_signatures(local_tree)
+        save_state(state_path, key, {rel: signature for rel, signature in signatures.items() if rel not in failed})
+    return result
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Iterator, Optional, Tuple
+
+from FTP.Client.client import FTPClient
+from FTP.Common.constants import FTPResponseCode
+from FTP.Common.exceptions import FTPClientError, FTPConnectionError
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+
+class FTPConnectionPool:
+    """Pool de sesiones de control ya autenticadas.
+
+    Mantiene hasta ``size`` sesiones ``FTPClient`` abiertas para no pagar la
+    conexión TCP y el USER/PASS (bcrypt en el servidor) en cada operación.
+    Al entregar una sesión:
+
+    * se descarta si lleva más de ``max_idle`` segundos sin usarse (el
+      servidor la cerraría por inactividad);
+    * se restaura el estado que la operación anterior dejó cambiado
+      (``CWD /`` si hubo CWD/CDUP, ``TYPE`` si es distinto);
+    * si no hizo falta ningún comando y lleva más de ``check_after``
+      segundos parada, se comprueba con NOOP que sigue viva.
+
+    Con ``keepalive`` (segundos, menor que ``max_idle``) un hilo envía NOOP
+    a las sesiones libres que llevan ese tiempo paradas, de modo que ni el
+    servidor ni los equipos intermedios las cierran y no caducan.
+
+    Uso::
+
+        pool = FTPConnectionPool("ftp.example.org", 21, "user", "secret", size=4)
+        with pool.connection() as client:
+            client.download_file("a.txt", "/tmp/a.txt")
+    """
+
+    def __init__(self, host: str, port: int = 21, user: str = "anonymous", password: str = "",
+                 size: int = 4, max_idle: float = 60.0, check_after: float = 2.0,
+                 transfer_type: str = "I", client_factory: Optional[Callable[[], FTPClient]] = None,
+                 keepalive: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.transfer_type = transfer_type
+        self._client_factory = client_factory or (lambda: FTPClient(self.host, self.port))
+        # Sesiones libres con la hora en que se devolvieron; LIFO para
+        # reutilizar las más recientes y dejar caducar las sobrantes
+        self._idle: Deque[Tuple[FTPClient, float]] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+        self.keepalive = keepalive
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        # Contadores para diagnóstico y benchmarks
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.keepalives = 0
+        if keepalive is not None:
+            self._keepalive_thread = threading.Thread(target=self._keepalive_loop,
+                                                      name="ftp-pool-keepalive", daemon=True)
+            self._keepalive_thread.start()
+
+    @classmethod
+    def from_client(cls, client: FTPClient, size: int = 4, transfer_type: str = "I",
+                    keepalive: Optional[float] = None) -> "FTPConnectionPool":
+        """Pool con el servidor, las credenciales y el tamaño de bloque de una sesión ya autenticada"""
+        if not client.authenticated or client.user is None:
+            raise FTPClientError(FTPResponseCode.NOT_LOGGED_IN, "Debe autenticarse primero")
+        def factory() -> FTPClient:
+            # Mismo modo de datos (PASV/PORT), pool de listeners y TCP keepalive que la sesión original
+            session = FTPClient(client.host, client.port, client.buffer_size)
+            session.mode, session.listener_pool = client.mode, client.listener_pool
+            session.tcp_keepalive = client.tcp_keepalive
+            return session
+
+        return cls(client.host, client.port, client.user, client.password, size=size,
+                   transfer_type=transfer_type, client_factory=factory, keepalive=keepalive)
+
+    def _open(self) -> FTPClient:
+        client = self._client_factory()
+        try:
+            client.connect()
+            client.login(self.user, self.password)
+            client.set_type(self.transfer_type)
+        except BaseException:
+            client.close()
+            raise
+        client.directory_changed = False
+        with self._lock:
+            self.created += 1
+        return client
+
+    def _discard(self, client: FTPClient) -> None:
+        with self._lock:
+            self.discarded += 1
+        logger.debug("Sesión descartada del pool de %s:%s", self.host, self.port)
+        client.close()
+
+    def _prepare(self, client: FTPClient, idle_for: float) -> bool:
+        """Restaura el estado de la sesión; False si ya no sirve"""
+        try:
+            client.restart_point = None
+            commands = []
+            if client.directory_changed:
+                commands.append(("CWD", "/"))
+            if client.transfer_type != self.transfer_type:
+                commands.append(("TYPE", self.transfer_type))
+            if not commands:
+                if idle_for >= self.check_after:
+                    return client._parse_code(client.noop()) == FTPResponseCode.COMMAND_OK
+                return client.authenticated
+            # Los comandos de restauración van encadenados (un RTT) y sirven de prueba de vida
+            expected = {"CWD": 250, "TYPE": FTPResponseCode.COMMAND_OK}
+            for (command, _), response in zip(commands, client.pipeline(*commands)):
+                if client._parse_code(response) != expected[command]:
+                    return False
+            client.directory_changed = False
+            client.transfer_type = self.transfer_type
+            return True
+        except (OSError, FTPClientError):
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> FTPClient:
+        """Entrega una sesión lista para usar; espera si el pool está lleno"""
+        if self._closed:
+            raise FTPConnectionError(FTPResponseCode.COMMAND_NOT_ACCEPTED, "Pool cerrado")
+        if not self._slots.acquire(timeout=timeout):
+            raise FTPConnectionError(FTPResponseCode.COMMAND_NOT_ACCEPTED,
+                                     "Tiempo de espera agotado esperando una sesión libre")
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    client, released_at = self._idle.pop()
+                idle_for = time.monotonic() - released_at
+                if idle_for <= self.max_idle and self._prepare(client, idle_for):
+                    with self._lock:
+                        self.reused += 1
+                    return client
+                self._discard(client)
+            return self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, client: FTPClient, discard: bool = False) -> None:
+        """Devuelve una sesión al pool (o la cierra si ``discard``)"""
+        try:
+            if discard or self._closed or not client.control_sock or not client.authenticated:
+                self._discard(client)
+                return
+            client._close_data_connection()
+            with self._lock:
+                self._idle.append((client, time.monotonic()))
+            self._prune()
+        finally:
+            self._slots.release()
+
+    def _prune(self) -> None:
+        """Cierra las sesiones libres que superaron ``max_idle``"""
+        limit = time.monotonic() - self.max_idle
+        expired = []
+        with self._lock:
+            # Las más antiguas están al principio
+            while self._idle and self._idle[0][1] < limit:
+                expired.append(self._idle.popleft()[0])
+        for client in expired:
+            self._discard(client)
+
+    def _keepalive_loop(self) -> None:
+        """Envía NOOP a las sesiones libres paradas desde hace ``keepalive`` segundos"""
+        while not self._keepalive_stop.wait(self.keepalive / 2):
+            limit = time.monotonic() - self.keepalive
+            stale = []
+            with self._lock:
+                # Se sacan de la cola: mientras tanto nadie puede tomarlas
+                while self._idle and self._idle[0][1] <= limit:
+                    stale.append(self._idle.popleft()[0])
+            for client in stale:
+                try:
+                    alive = client._parse_code(client.noop()) == FTPResponseCode.COMMAND_OK
+                except (OSError, FTPClientError):
+                    alive = False
+                if not alive or self._closed:
+                    self._discard(client)
+                    continue
+                with self._lock:
+                    self.keepalives += 1
+                    # Recién comprobada: al final de la cola, como las recién devueltas
+                    self._idle.append((client, time.monotonic()))
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[FTPClient]:
+        """``with pool.connection() as client:``; los errores de red descartan la sesión"""
+        client = self.acquire(timeout)
+        broken = False
+        try:
+            yield client
+        except (OSError, FTPConnectionError):
+            broken = True
+            raise
+        finally:
+            self.release(client, discard=broken)
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Abre por adelantado ``count`` sesiones (por defecto, ``size``)"""
+        clients = [self.acquire() for _ in range(min(count or self.size, self.size))]
+        for client in clients:
+            self.release(client)
+
+    def close(self) -> None:
+        """Cierra todas las sesiones libres; las prestadas se cierran al devolverlas"""
+        self._closed = True
+        self._keepalive_stop.set()
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for client, _ in idle:
+            client.close()
+
+    def __enter__(self) -> "FTPConnectionPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
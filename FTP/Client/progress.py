@@ -0,0 +1,79 @@
+import time
+from typing import Callable, Optional
+
+
+class TransferProgress:
+    """Progreso de una transferencia: bytes, velocidad y tiempo hasta el primer byte.
+
+    El camino de datos llama a ``update`` por cada bloque; el coste es una
+    suma y una lectura del reloj. ``callback`` (si lo hay) recibe este mismo
+    objeto como mucho una vez cada ``interval`` segundos, y siempre una
+    última vez al terminar (con ``finished`` ya fijado); en una descarga
+    segmentada se llama desde los hilos de los segmentos. ``as_record`` da
+    el resumen en un ``dict`` apto para JSON.
+    """
+
+    def __init__(self, command: str, path: str, total: Optional[int] = None,
+                 callback: Optional[Callable[["TransferProgress"], None]] = None, interval: float = 0.1):
+        self.command = command
+        self.path = path
+        # Tamaño esperado (None si no se conoce)
+        self.total = total
+        self.bytes = 0
+        self.callback = callback
+        self.interval = interval
+        self.started = time.monotonic()
+        # Segundos desde el inicio hasta el primer byte de datos
+        self.first_byte: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        # Velocidad desde la notificación anterior (bytes/s)
+        self.rate = 0.0
+        self._mark_time = self.started
+        self._mark_bytes = 0
+        self._next_notify = self.started + interval
+
+    def update(self, count: int) -> None:
+        self.bytes += count
+        now = time.monotonic()
+        if self.first_byte is None:
+            self.first_byte = now - self.started
+        if now >= self._next_notify:
+            self._notify(now)
+
+    def _notify(self, now: float) -> None:
+        if now > self._mark_time:
+            self.rate = (self.bytes - self._mark_bytes) / (now - self._mark_time)
+        self._mark_time, self._mark_bytes = now, self.bytes
+        self._next_notify = now + self.interval
+        if self.callback is not None:
+            self.callback(self)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self.finished is not None:
+            return
+        now = time.monotonic()
+        self.finished = now - self.started
+        if error is not None:
+            self.error = str(error) or type(error).__name__
+        self._notify(now)
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished if self.finished is not None else time.monotonic() - self.started
+
+    @property
+    def average_rate(self) -> float:
+        """Bytes/s desde el inicio (incluye el establecimiento de la conexión de datos)"""
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def as_record(self) -> dict:
+        return {"command": self.command, "path": self.path, "bytes": self.bytes, "total": self.total,
+                "elapsed_s": round(self.elapsed, 6),
+                "ttfb_s": round(self.first_byte, 6) if self.first_byte is not None else None,
+                "average_bps": round(self.average_rate, 1), "ok": self.error is None, "error": self.error}
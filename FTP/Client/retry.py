@@ -0,0 +1,110 @@
+import errno
+import functools
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+from FTP.Common.exceptions import FTPClientError, FTPConnectionError
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+
+# Errores de red que no son ConnectionError pero pueden desaparecer al reintentar
+NETWORK_ERRNOS = frozenset((errno.ENETDOWN, errno.ENETUNREACH, errno.EHOSTDOWN, errno.EHOSTUNREACH))
+
+
+def is_transient(error: Exception) -> bool:
+    """Errores que merece la pena reintentar: red, 421/425/426 y demás 4xx.
+
+    Los errores locales (FileNotFoundError, PermissionError,
+    IsADirectoryError...) también son OSError, pero reintentarlos no los
+    arregla: se propagan al momento.
+    """
+    if isinstance(error, (ConnectionError, socket.timeout, TimeoutError, FTPConnectionError)):
+        return True
+    if isinstance(error, OSError):
+        return error.errno in NETWORK_ERRNOS
+    return isinstance(error, FTPClientError) and 400 <= error.code < 500
+
+
+class RetryPolicy:
+    """Reintentos con espera exponencial (``base_delay * 2**intento``, hasta
+    ``max_delay``) y jitter: cada espera se reduce al azar hasta un
+    ``jitter`` por uno para que muchos clientes no reconecten a la vez."""
+
+    def __init__(self, retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 jitter: float = 0.5):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        import random
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+
+class RetryMetrics:
+    """Contadores de reintentos de un cliente."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.reconnects = 0
+        # Descargas reanudadas con REST y bytes que no hubo que repetir
+        self.resumes = 0
+        self.resumed_bytes = 0
+        # Operaciones que fallaron tras agotar los reintentos
+        self.failures = 0
+
+    def add(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> dict:
+        return {"retries": self.retries, "reconnects": self.reconnects, "resumes": self.resumes,
+                "resumed_bytes": self.resumed_bytes, "failures": self.failures}
+
+
+def call_with_retry(client, operation: Callable, before_retry: Optional[Callable[[], None]] = None):
+    """Ejecuta ``operation()``; ante un error transitorio reconecta (``client.reconnect``,
+    que restaura login, directorio y TYPE/MODE/STRU), llama a ``before_retry`` y
+    vuelve a intentarlo según ``client.retry_policy``."""
+    policy = client.retry_policy
+    attempt = 0
+    client._retrying = True
+    try:
+        while True:
+            try:
+                if attempt:
+                    client.reconnect()
+                    if before_retry is not None:
+                        before_retry()
+                return operation()
+            except Exception as e:
+                if attempt >= policy.retries or not is_transient(e):
+                    if attempt:
+                        client.retry_metrics.add("failures")
+                    raise
+                delay = policy.delay(attempt)
+                attempt += 1
+                client.retry_metrics.add("retries")
+                logger.warning("%s; reintento %d/%d en %.2f s", e, attempt, policy.retries, delay)
+                time.sleep(delay)
+    finally:
+        client._retrying = False
+
+
+def retryable(method: Callable) -> Callable:
+    """Reintenta el método del cliente según su ``retry_policy`` (solo operaciones idempotentes)."""
+
+    @functools.wraps(method)
+    def wrapper(client, *args, **kwargs):
+        if client.retry_policy is None or client._retrying:
+            return method(client, *args, **kwargs)
+        return call_with_retry(client, lambda: method(client, *args, **kwargs))
+
+    return wrapper
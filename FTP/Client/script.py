@@ -0,0 +1,153 @@
+import shlex
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from FTP.Common.constants import FTPResponseCode
+from FTP.Common.exceptions import FTPClientError
+
+# Comandos que solo usan el canal de control y no cambian el estado local del
+# cliente (TYPE, REST, datos...): se pueden enviar encadenados
+PIPELINE_SAFE = frozenset(("PWD", "CWD", "CDUP", "MKD", "RMD", "DELE", "RNFR", "RNTO", "SYST", "STAT",
+                           "HELP", "NOOP", "SIZE", "MDTM", "FEAT", "SITE"))
+# Máximo de comandos por envío encadenado
+PIPELINE_DEPTH = 32
+# Listados: necesitan PASV/PORT y conexión de datos, así que van por el
+# cliente y su resultado es el listado recibido
+LISTING_COMMANDS = frozenset(("LIST", "NLST", "MLSD"))
+
+
+class ScriptCommand:
+    """Una línea de un script: comando y argumentos."""
+
+    def __init__(self, line: int, command: str, args: List[str]):
+        self.line = line
+        self.command = command.upper()
+        self.args = args
+
+    @property
+    def pipelinable(self) -> bool:
+        # RNFR con dos argumentos es el renombrado completo de main()
+        return self.command in PIPELINE_SAFE and not (self.command == "RNFR" and len(self.args) > 1)
+
+    def __str__(self) -> str:
+        return " ".join([self.command] + self.args)
+
+
+class ScriptResult:
+    """Resultado de un comando del script: respuesta, código y tiempo."""
+
+    def __init__(self, command: ScriptCommand, response: str = "", code: int = 0, elapsed: float = 0.0,
+                 pipelined: bool = False, error: Optional[str] = None):
+        self.command = command
+        self.response = response
+        self.code = code
+        # Segundos desde la respuesta anterior (en un envío encadenado) o desde el envío
+        self.elapsed = elapsed
+        self.pipelined = pipelined
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 100 <= self.code < 400
+
+    def as_record(self) -> dict:
+        return {"line": self.command.line, "command": self.command.command, "args": self.command.args,
+                "code": self.code, "ok": self.ok, "elapsed_s": round(self.elapsed, 6),
+                "pipelined": self.pipelined, "response": self.response, "error": self.error}
+
+
+def parse_script(lines: Iterable[str]) -> List[ScriptCommand]:
+    """Un comando por línea con argumentos al estilo shell; ``#`` inicia un comentario"""
+    commands = []
+    for number, line in enumerate(lines, 1):
+        tokens = shlex.split(line, comments=True)
+        if tokens:
+            commands.append(ScriptCommand(number, tokens[0], tokens[1:]))
+    return commands
+
+
+def _execute(client, command: ScriptCommand) -> Tuple[str, int]:
+    """Respuesta (o listado) y código de un comando"""
+    if command.command in LISTING_COMMANDS:
+        if len(command.args) > 1:
+            raise ValueError(f"{command.command} admite como mucho una ruta")
+        # Si falla, _iter_listing lanza FTPClientError con el código del servidor
+        listing = client._iter_listing(command.command, command.args[0] if command.args else "")
+        return "\n".join(listing), int(FTPResponseCode.FILE_ACTION_COMPLETED)
+    if command.command == "RNFR" and len(command.args) > 1:
+        response = client.rename_file(*command.args[:2])
+    else:
+        response = client.execute(command.command, *command.args)
+    return response, client._parse_code(response)
+
+
+def _run_one(client, command: ScriptCommand) -> ScriptResult:
+    start = time.perf_counter()
+    try:
+        response, code = _execute(client, command)
+        return ScriptResult(command, response, code, time.perf_counter() - start)
+    except FTPClientError as e:
+        return ScriptResult(command, "", e.code, time.perf_counter() - start, error=str(e))
+    except (OSError, ValueError, TypeError) as e:
+        # Argumentos que faltan o conexión caída: el error queda en el resultado
+        return ScriptResult(command, "", 0, time.perf_counter() - start, error=str(e) or type(e).__name__)
+
+
+def _run_pipelined(client, commands: List[ScriptCommand]) -> List[ScriptResult]:
+    """Envía ``commands`` de una vez y mide cada respuesta desde la anterior"""
+    lines = "".join(client._format_command(command.command, *command.args) for command in commands)
+    results = []
+    start = time.perf_counter()
+    try:
+        client.control_sock.sendall(lines.encode())
+        for command in commands:
+            response = client._get_response()
+            now = time.perf_counter()
+            results.append(ScriptResult(command, response, client._parse_code(response), now - start,
+                                        pipelined=True))
+            start = now
+    except (OSError, FTPClientError) as e:
+        # Conexión perdida en mitad de la serie: lo que falta queda sin respuesta
+        results.extend(ScriptResult(command, error=str(e) or type(e).__name__, pipelined=True)
+                       for command in commands[len(results):])
+    return results
+
+
+def run_script(client, commands: List[ScriptCommand], pipeline: bool = True, stop_on_error: bool = False,
+               on_result: Optional[Callable[[ScriptResult], None]] = None) -> Tuple[List[ScriptResult], float]:
+    """Ejecuta ``commands`` sobre una sesión ya autenticada.
+
+    Con ``pipeline`` las series de comandos de ``PIPELINE_SAFE`` viajan en
+    un solo envío (un RTT por serie). Con ``stop_on_error`` se detiene en
+    el primer fallo, y entonces cada comando va por separado: de un envío
+    encadenado no se puede retirar lo que sigue a un error. ``on_result``
+    recibe cada resultado según llega. Devuelve los resultados y el tiempo
+    total.
+    """
+    pipeline = pipeline and not stop_on_error
+    results: List[ScriptResult] = []
+    start = time.perf_counter()
+    i = 0
+    while i < len(commands):
+        group = [commands[i]]
+        if pipeline and commands[i].pipelinable:
+            while (i + len(group) < len(commands) and len(group) < PIPELINE_DEPTH
+                   and commands[i + len(group)].pipelinable):
+                group.append(commands[i + len(group)])
+        batch = _run_pipelined(client, group) if len(group) > 1 else [_run_one(client, group[0])]
+        for result in batch:
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        i += len(group)
+        if stop_on_error and not batch[-1].ok:
+            break
+    return results, time.perf_counter() - start
+
+
+def summarize(results: List[ScriptResult], elapsed: float) -> dict:
+    """Totales de una ejecución, aptos para JSON"""
+    failed = sum(1 for result in results if not result.ok)
+    return {"commands": len(results), "ok": len(results) - failed, "failed": failed,
+            "pipelined": sum(1 for result in results if result.pipelined), "elapsed_s": round(elapsed, 6),
+            "commands_per_s": round(len(results) / elapsed, 1) if elapsed else 0.0}
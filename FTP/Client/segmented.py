@@ -0,0 +1,169 @@
+import os
+import threading
+from typing import Callable, List, Optional
+
+from FTP.Client.batch import is_transient, remote_cwd, root_relative
+from FTP.Client.client import FTPClient
+from FTP.Common.constants import FTPResponseCode
+from FTP.Common.exceptions import FTPClientError, FTPTransferError
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.client")
+
+# Por debajo de este tamaño por segmento no compensa abrir más sesiones
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+
+class Segment:
+    """Rango ``[start, end)`` del archivo y hasta dónde se ha escrito."""
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.offset = start
+        self.attempts = 0
+        self.error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self.offset >= self.end
+
+
+def split_ranges(size: int, segments: int) -> List[Segment]:
+    """Divide ``size`` bytes en ``segments`` rangos contiguos casi iguales"""
+    step, extra = divmod(size, segments)
+    ranges, start = [], 0
+    for i in range(segments):
+        end = start + step + (1 if i < extra else 0)
+        ranges.append(Segment(start, end))
+        start = end
+    return ranges
+
+
+def supports_segments(client: FTPClient) -> bool:
+    """El servidor anuncia REST STREAM y SIZE en FEAT"""
+    try:
+        features = client.get_features()
+    except (OSError, FTPClientError):
+        return False
+    return "STREAM" in features.get("REST", []) and "SIZE" in features
+
+
+def fetch_range(client: FTPClient, path: str, fd: int, segment: Segment,
+                on_data: Optional[Callable[[int], None]] = None) -> None:
+    """REST + RETR de un rango; corta la conexión de datos en cuanto lo tiene entero"""
+    client._setup_data_connection()
+    response = client.send_command("REST", str(segment.offset))
+    if client._parse_code(response) != FTPResponseCode.FILE_ACTION_PENDING:
+        client._close_data_connection()
+        raise FTPTransferError(client._parse_code(response), "El servidor no acepta REST")
+    response = client.send_command("RETR", path)
+    if client._parse_code(response) not in (125, 150):
+        client._close_data_connection()
+        raise FTPTransferError(client._parse_code(response), "Error en RETR")
+    client._accept_data_connection()
+
+    buffer = bytearray(client.buffer_size)
+    view = memoryview(buffer)
+    try:
+        while segment.offset < segment.end:
+            received = client.data_sock.recv_into(buffer, min(len(buffer), segment.end - segment.offset))
+            if not received:
+                break
+            os.pwrite(fd, view[:received], segment.offset)
+            segment.offset += received
+            if on_data is not None:
+                on_data(received)
+    finally:
+        client._close_data_connection()
+        # 226 si el servidor terminó antes del corte, 426 si lo abortamos nosotros
+        final_response = client._get_response()
+    code = client._parse_code(final_response)
+    if not segment.done:
+        raise FTPTransferError(code, f"Segmento incompleto: {segment.offset - segment.start} de "
+                                     f"{segment.end - segment.start} bytes")
+    if code not in (FTPResponseCode.FILE_ACTION_COMPLETED, FTPResponseCode.CONNECTION_CLOSED):
+        raise FTPTransferError(code, "Error en RETR final")
+
+
+def segmented_download(client: FTPClient, remote_path: str, local_path: str, segments: int = 4,
+                       retries: int = 2) -> str:
+    """Descarga ``remote_path`` en ``segments`` rangos paralelos (REST + RETR por sesión).
+
+    Cada rango se escribe con ``os.pwrite`` en su posición de un archivo
+    local ya dimensionado; si un rango falla se reanuda desde el último byte
+    escrito con otra sesión. Los rangos son offsets de bytes, así que las
+    sesiones del pool transfieren siempre en TYPE I; con el cliente en
+    ASCII (``transfer_type == 'A'``), sin soporte del servidor o para
+    archivos pequeños se hace una descarga normal.
+    """
+    size = None
+    if client.transfer_type != 'A' and supports_segments(client):
+        try:
+            size = client.get_size(remote_path)
+        except FTPClientError:
+            size = None
+    segments = min(segments, (size or 0) // MIN_SEGMENT_SIZE)
+    if size is None or segments < 2:
+        return client.download_file(remote_path, local_path)
+
+    path = root_relative(remote_cwd(client), remote_path)
+    ranges = split_ranges(size, segments)
+    fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # Reservar el archivo completo: cada segmento escribe en su rango
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+
+        pool = client.parallel_pool(segments)
+        # Progreso conjunto de los segmentos en la transferencia en curso del cliente
+        progress = client._transfer
+        progress_lock = threading.Lock()
+
+        def on_data(count: int):
+            with progress_lock:
+                progress.update(count)
+
+        if progress is not None:
+            progress.total = size
+
+        def worker(segment: Segment):
+            while not segment.done:
+                segment.attempts += 1
+                try:
+                    with pool.connection() as session:
+                        fetch_range(session, path, fd, segment, on_data if progress is not None else None)
+                except Exception as e:
+                    segment.error = e
+                    if segment.attempts > retries or not is_transient(e):
+                        logger.warning("Segmento %s-%s de %s fallido: %s",
+                                       segment.start, segment.end, remote_path, e)
+                        return
+                    logger.debug("Reanudando segmento %s-%s desde %s: %s",
+                                 segment.start, segment.end, segment.offset, e)
+
+        threads = [threading.Thread(target=worker, args=(segment,), daemon=True) for segment in ranges]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        failed = [segment for segment in ranges if not segment.done]
+        if failed:
+            raise failed[0].error or FTPTransferError(FTPResponseCode.CONNECTION_CLOSED, "Segmento incompleto")
+        # Verificación: todos los rangos escritos y el tamaño coincide con SIZE
+        written = sum(segment.offset - segment.start for segment in ranges)
+        if written != size or os.fstat(fd).st_size != size:
+            raise FTPTransferError(FTPResponseCode.CONNECTION_CLOSED,
+                                   f"Tamaño descargado {written} distinto del remoto {size}")
+    except BaseException:
+        os.close(fd)
+        fd = None
+        os.remove(local_path)
+        raise
+    finally:
+        if fd is not None:
+            os.close(fd)
+    return f"226 Transfer complete ({size} bytes in {segments} segments)"
@@ -0,0 +1,150 @@
+import io
+import socket
+import struct
+
+from FTP.Common.constants import FTPResponseCode
+from FTP.Common.exceptions import FTPTransferError
+
+
+def abort_transfer(client) -> str:
+    """Corta la conexión de datos en curso y envía ABOR.
+
+    El socket se cierra con RST (SO_LINGER a cero) para que el servidor deje
+    de enviar o recibir en el acto. Después llegan dos respuestas: la de la
+    transferencia interrumpida (426 o 226 si ya había terminado) y la de ABOR.
+    """
+    if client.data_sock is not None:
+        try:
+            client.data_sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        except OSError:
+            pass
+    client._close_data_connection()
+    client.control_sock.sendall(b"ABOR\r\n")
+    return client._get_response() + "\n" + client._get_response()
+
+
+def send_stream(sock: socket.socket, source, buffer_size: int, progress=None) -> int:
+    """Envía ``source`` por ``sock``; devuelve los bytes enviados.
+
+    ``source`` puede ser un objeto con ``readinto`` (se lee siempre en el
+    mismo buffer, sin copias intermedias), con ``read``, un ``bytes`` o un
+    iterable de bloques. ``sendall`` bloquea mientras el servidor no consume:
+    el origen no se lee más rápido de lo que la red admite. ``progress`` es
+    un ``TransferProgress`` opcional.
+    """
+    update = progress.update if progress is not None else (lambda count: None)
+    sent = 0
+    if hasattr(source, "readinto"):
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while True:
+            received = source.readinto(buffer)
+            if not received:
+                return sent
+            sock.sendall(view[:received])
+            sent += received
+            update(received)
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(buffer_size)
+            if not chunk:
+                return sent
+            sock.sendall(chunk)
+            sent += len(chunk)
+            update(len(chunk))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        sock.sendall(source)
+        update(len(source))
+        return len(source)
+    for chunk in source:
+        if chunk:
+            sock.sendall(chunk)
+            sent += len(chunk)
+            update(len(chunk))
+    return sent
+
+
+class RetrStream(io.RawIOBase):
+    """Archivo de solo lectura sobre la conexión de datos de un RETR.
+
+    Los datos se leen del socket según los pide el consumidor, así que el
+    servidor no envía más de lo que cabe en los buffers TCP (contrapresión).
+    ``readinto`` recibe directamente en el buffer del llamante. Iterar
+    produce bloques de ``buffer_size``; para leer líneas se puede envolver en
+    ``io.BufferedReader`` o ``io.TextIOWrapper``.
+
+    Al cerrar tras leerlo entero se comprueba el 226 final; si se cierra
+    antes, la transferencia se aborta (ABOR) y la sesión queda utilizable.
+    """
+
+    def __init__(self, client, response: str, progress=None):
+        super().__init__()
+        self.client = client
+        # TransferProgress de la descarga; se cierra con el stream
+        self.progress = progress
+        self.sock = client.data_sock
+        # Respuesta 1xx del RETR; al cerrar se le añade la final
+        self.response = response
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.closed:
+            raise ValueError("Lectura de un RetrStream cerrado")
+        if self.eof:
+            return 0
+        received = self.sock.recv_into(buffer)
+        if not received:
+            self.eof = True
+        elif self.progress is not None:
+            self.progress.update(received)
+        return received
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        chunk = self.read(self.client.buffer_size)
+        if not chunk:
+            raise StopIteration
+        return chunk
+
+    def _finish(self) -> None:
+        self.client._close_data_connection()
+        final_response = self.client._get_response()
+        self.response += "\n" + final_response
+        if self.client._parse_code(final_response) != FTPResponseCode.FILE_ACTION_COMPLETED:
+            raise FTPTransferError(self.client._parse_code(final_response), "Error en RETR final")
+
+    def abort(self) -> str:
+        """Interrumpe la descarga sin leer el resto del archivo."""
+        if self.closed:
+            return self.response
+        try:
+            self.response += "\n" + abort_transfer(self.client)
+        finally:
+            super().close()
+            self._done(FTPTransferError(FTPResponseCode.CONNECTION_CLOSED, "Descarga abortada"))
+        return self.response
+
+    def _done(self, error=None) -> None:
+        if self.progress is not None:
+            self.client._transfer_done(self.progress, error)
+            self.progress = None
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if not self.eof:
+            self.abort()
+            return
+        try:
+            self._finish()
+        except BaseException as e:
+            self._done(e)
+            raise
+        finally:
+            super().close()
+            self._done()
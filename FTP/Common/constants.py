@@ -5,6 +5,8 @@ class FTPResponseCode(IntEnum):
     READY_FOR_NEW_USER = 220
     USER_LOGGED_IN = 230
     PASSWORD_REQUIRED = 331
+    FILE_ACTION_PENDING = 350
+    FILE_STATUS = 213
     PASSIVE_MODE = 227
     FILE_ACTION_COMPLETED = 226
     PATHNAME_CREATED = 257
@@ -32,4 +34,13 @@ class TransferMode:
     PASSIVE = "passive"
 
 DEFAULT_BUFFER_SIZE = 4096
-DEFAULT_TIMEOUT = 10
\ No newline at end of file
+# Tamaño de bloque de lectura/escritura del servidor en las transferencias
+DEFAULT_TRANSFER_BUFFER_SIZE = 8192
+# Tamaño de bloque del cliente en el canal de datos (un único buffer reutilizado)
+DEFAULT_DATA_BUFFER_SIZE = 256 * 1024
+DEFAULT_TIMEOUT = 10
+
+# Timeouts del servidor en segundos
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_DATA_ACCEPT_TIMEOUT = 30
+DEFAULT_DATA_STALL_TIMEOUT = 60
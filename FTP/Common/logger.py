@@ -0,0 +1,177 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from logging.handlers import QueueListener
+
+ROOT_LOGGER = "ftp"
+
+# Subsistemas con nivel configurable por separado
+SUBSYSTEMS = (
+    "ftp.server",
+    "ftp.server.session",
+    "ftp.server.commands",
+    "ftp.server.transfer",
+    "ftp.server.auth",
+    "ftp.client",
+)
+
+_listener: Optional["QueueListener"] = None
+_configured = False
+_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Devuelve el logger de un subsistema (``ftp.server.commands``...)"""
+    if not name.startswith(ROOT_LOGGER):
+        name = f"{ROOT_LOGGER}.{name}"
+    return logging.getLogger(name)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una línea."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        # Datos estructurados (``extra={"data": ...}``), p. ej. el resumen de una transferencia
+        data = getattr(record, "data", None)
+        if data is not None:
+            entry["data"] = data
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        import json
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Limita los errores repetidos a ``burst`` registros por ``interval`` segundos.
+
+    Los registros se agrupan por logger y plantilla del mensaje; al abrirse
+    una nueva ventana se anota cuántos se descartaron en la anterior.
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 60.0, level: int = logging.ERROR):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.level = level
+        self._windows: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} [{suppressed} mensajes similares suprimidos]"
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Parsea ``ftp.server=INFO,ftp.server.commands=DEBUG``"""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, levels: Dict[str, str] = None, json_lines: bool = None,
+                  filename: str = None, stream=None, asynchronous: bool = True) -> Optional["QueueListener"]:
+    """Configura el logging asíncrono del paquete ``ftp``.
+
+    Los loggers solo encolan registros (``QueueHandler``); un hilo
+    ``QueueListener`` los formatea y escribe, de modo que una salida lenta no
+    bloquea el hilo de la sesión. Sin argumentos se leen las variables de
+    entorno ``FTP_LOG_LEVEL``, ``FTP_LOG_LEVELS``, ``FTP_LOG_FORMAT=json`` y
+    ``FTP_LOG_FILE``. Con ``asynchronous=False`` el handler escribe
+    directamente desde el hilo que registra (útil para depurar).
+    """
+    global _listener, _configured
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        level = (level or os.environ.get("FTP_LOG_LEVEL", "INFO")).upper()
+        if levels is None:
+            levels = _parse_levels(os.environ.get("FTP_LOG_LEVELS", ""))
+        if json_lines is None:
+            json_lines = os.environ.get("FTP_LOG_FORMAT", "").lower() == "json"
+        filename = filename or os.environ.get("FTP_LOG_FILE")
+
+        if filename:
+            handler = logging.FileHandler(filename, encoding="utf-8")
+        else:
+            handler = logging.StreamHandler(stream or sys.stdout)
+        if json_lines:
+            handler.setFormatter(JsonLinesFormatter())
+        else:
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        for old_handler in list(root.handlers):
+            root.removeHandler(old_handler)
+        if asynchronous:
+            # logging.handlers (y queue) solo hacen falta al configurar
+            import queue
+            from logging.handlers import QueueHandler, QueueListener
+            log_queue = queue.SimpleQueue()
+            front_handler = QueueHandler(log_queue)
+        else:
+            front_handler = handler
+        front_handler.addFilter(RateLimitFilter())
+        root.addHandler(front_handler)
+        root.setLevel(level)
+        root.propagate = False
+
+        for name in SUBSYSTEMS:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        for name, sub_level in levels.items():
+            get_logger(name).setLevel(sub_level)
+
+        _configured = True
+        if asynchronous:
+            _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+            _listener.start()
+        return _listener
+
+
+def is_configured() -> bool:
+    """Indica si ya se llamó a ``setup_logging``"""
+    return _configured
+
+
+def shutdown_logging() -> None:
+    """Vacía la cola, detiene el hilo de escritura y retira los handlers"""
+    global _listener, _configured
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        _configured = False
@@ -1,5 +1,13 @@
-from pathlib import Path
-from typing import Optional, Tuple
+import codecs
+import io
+import time
+from collections import namedtuple
+from typing import Iterable, Iterator, Optional, Union
+
+# Registros compactos de los parsers en streaming: una tupla por entrada en
+# lugar de un diccionario, sin materializar el listado completo
+ListEntry = namedtuple("ListEntry", "name size type")
+MlsdEntry = namedtuple("MlsdEntry", "name type size modify perm")
 
 def validate_transfer_type(type_char: str, format_char: str = None) -> bool:
     """Valida los parámetros del comando TYPE."""
@@ -29,52 +37,146 @@ def parse_restart_marker(marker: str) -> Optional[int]:
     except ValueError:
         return None
 
+# Comandos con contraseñas y cuántos argumentos se conservan (el usuario) antes de enmascarar
+_SECRET_ARGUMENTS = {("PASS",): 0, ("SITE", "ADDUSER"): 1, ("SITE", "PASSRESET"): 1}
+
+def mask_secrets(line: str) -> str:
+    """Línea de comando apta para logs y grabaciones: conserva el verbo y el
+    usuario y sustituye por ``****`` cada argumento posterior de PASS, SITE
+    ADDUSER y SITE PASSRESET."""
+    parts = line.split()
+    for verb, keep in _SECRET_ARGUMENTS.items():
+        if tuple(part.upper() for part in parts[:len(verb)]) == verb:
+            shown = len(verb) + keep
+            return " ".join(parts[:shown] + ["****"] * (len(parts) - shown))
+    return line
+
 def validate_path(path: str) -> bool:
     """Valida que una ruta sea segura y no contenga caracteres peligrosos."""
     forbidden_chars = ['..', '\\', '*', '?', '"', '<', '>', '|', ':']
     return not any(char in path for char in forbidden_chars)
 
+def iter_lines(chunks: Iterable[Union[bytes, str]]) -> Iterator[str]:
+    """Convierte un flujo de bloques (p. ej. del socket de datos) en líneas sin CRLF."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if "\n" not in pending:
+            continue
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+def _lines(source: Union[str, Iterable[str]]) -> Iterable[str]:
+    # StringIO recorre el texto línea a línea sin crear la lista completa
+    return io.StringIO(source) if isinstance(source, str) else source
+
+_UNIX_TYPES = frozenset("-dlbcps")
+_new_record = tuple.__new__
+
+def _is_unix_line(line: str) -> bool:
+    return line[:1] in _UNIX_TYPES and line[1:2] in ("r", "-")
+
+def parse_list_line(line: str) -> Optional[ListEntry]:
+    """Parsea una línea de LIST: formato ``ls -l`` o ``nombre tamaño`` de este servidor."""
+    line = line.strip()
+    if not line:
+        return None
+    if _is_unix_line(line):
+        parts = line.split(None, 8)
+        if len(parts) == 9 and parts[4].isdigit():
+            return ListEntry(parts[8], int(parts[4]), parts[0][0])
+    name, _, size = line.rpartition(' ')
+    if size.isdigit() and name.strip():
+        return ListEntry(name.strip(), int(size), "")
+    return ListEntry(line, 0, "")
+
+def iter_list_response(source: Union[str, Iterable[str]]) -> Iterator[ListEntry]:
+    """Versión en streaming de ``parse_list_response``: produce ``ListEntry``."""
+    unix_types = _UNIX_TYPES
+    for line in _lines(source):
+        # Camino rápido para ``nombre tamaño``: rpartition no crea listas
+        name, _, size = line.rstrip().rpartition(' ')
+        if size.isdigit() and (name[:1] not in unix_types or name[1:2] not in ("r", "-")):
+            yield _new_record(ListEntry, (name.strip(), int(size), ""))
+        elif size:
+            entry = parse_list_line(line)
+            if entry is not None:
+                yield entry
+
 def parse_list_response(response: str) -> list[dict]:
     """
     Parsea la respuesta del comando LIST y devuelve una lista de diccionarios
     con información de archivos.
     """
     files_info = []
+    unix_types = _UNIX_TYPES
     for line in response.split('\n'):
-        line = line.strip()
-        if line:
-            # Dividir la línea en sus componentes
-            parts = line.split(None, 1)  # Dividir en máximo 2 partes
-            if len(parts) >= 2:
-                # El último elemento es el tamaño y el resto es el nombre
-                size = parts[0]
-                name = parts[1]
-                
-                # Crear diccionario con la información del archivo
-                file_info = {
-                    'nombre': name,
-                    'tamaño': size
-                }
-                files_info.append(file_info)
-            else:
-                # Si solo hay una parte, asumimos que es el nombre
-                file_info = {
-                    'nombre': parts[0],
-                    'tamaño': '0'
-                }
-                files_info.append(file_info)
-    
+        # El servidor envía ``nombre  tamaño``: el tamaño es el último campo
+        name, _, size = line.rstrip().rpartition(' ')
+        if size.isdigit() and (name[:1] not in unix_types or name[1:2] not in ("r", "-")):
+            files_info.append({'nombre': name.strip(), 'tamaño': size})
+        elif size:
+            entry = parse_list_line(line)
+            files_info.append({'nombre': entry.name, 'tamaño': str(entry.size)})
     return files_info
 
+def parse_mlsd_line(line: str) -> Optional[MlsdEntry]:
+    """Parsea una línea de MLSD (``hecho=valor;... nombre``)."""
+    facts, sep, name = line.strip().partition(' ')
+    if not sep:
+        return None
+    kind = size = modify = perm = None
+    for fact in facts.split(';'):
+        key, _, value = fact.partition('=')
+        key = key.lower()
+        if key == 'size':
+            size = int(value) if value.isdigit() else None
+        elif key == 'type':
+            kind = value.lower()
+        elif key == 'modify':
+            modify = value
+        elif key == 'perm':
+            perm = value
+    return _new_record(MlsdEntry, (name, kind, size, modify, perm))
+
+def iter_mlsd_response(source: Union[str, Iterable[str]]) -> Iterator[MlsdEntry]:
+    """Versión en streaming de ``parse_mlsd_response``: produce ``MlsdEntry``."""
+    for line in _lines(source):
+        # Mismo análisis que parse_mlsd_line, en línea para ahorrar la llamada
+        facts, sep, name = line.partition(' ')
+        if not sep:
+            continue
+        kind = size = modify = perm = None
+        for fact in facts.split(';'):
+            key, _, value = fact.partition('=')
+            key = key.lower()
+            if key == 'size':
+                size = int(value) if value.isdigit() else None
+            elif key == 'type':
+                kind = value.lower()
+            elif key == 'modify':
+                modify = value
+            elif key == 'perm':
+                perm = value
+        yield _new_record(MlsdEntry, (name.rstrip('\r\n'), kind, size, modify, perm))
+
 def parse_mlsd_response(response: str) -> list[dict]:
     """Parsea la respuesta del comando MLSD (listado en formato máquina)."""
     entries = []
     for line in response.splitlines():
-        facts, name = line.strip().split(' ', 1)
+        facts, _, name = line.strip().partition(' ')
+        if not name:
+            continue
         entry = {'name': name}
         for fact in facts.split(';'):
-            if '=' in fact:
-                key, value = fact.split('=')
+            key, sep, value = fact.partition('=')
+            if sep:
                 entry[key.lower()] = value
         entries.append(entry)
     return entries
@@ -88,6 +190,20 @@ def calculate_file_hash(filepath: str, algorithm: str = 'sha256') -> str:
             hash_obj.update(chunk)
     return hash_obj.hexdigest()
 
+def format_ftp_time(timestamp: float) -> str:
+    """Fecha en el formato de MDTM/MLSD/MFMT (``YYYYMMDDHHMMSS`` en UTC)."""
+    return time.strftime("%Y%m%d%H%M%S", time.gmtime(int(timestamp)))
+
+def parse_ftp_time(value: Optional[str]) -> Optional[int]:
+    """Segundos desde la época de una fecha ``YYYYMMDDHHMMSS[.sss]`` en UTC (None si no es válida)."""
+    if not value or len(value) < 14 or not value[:14].isdigit():
+        return None
+    import calendar
+    try:
+        return calendar.timegm(time.strptime(value[:14], "%Y%m%d%H%M%S"))
+    except ValueError:
+        return None
+
 def validate_port_args(host: str, port: int) -> tuple[str, int]:
     """Valida y formatea argumentos para el comando PORT."""
     import ipaddress
@@ -1,9 +1,15 @@
 import json
 import os
-import logging
-from cryptography.fernet import Fernet
-from passlib.hash import bcrypt
 from pathlib import Path
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.server.auth")
+
+
+def _bcrypt():
+    """passlib tarda en importarse: se carga con el primer login o alta de usuario"""
+    from passlib.hash import bcrypt
+    return bcrypt
 
 
 class CredentialsManager:
@@ -11,10 +17,11 @@ class CredentialsManager:
         """
         Inicializa el gestor de credenciales.
         """
-        logging.basicConfig(level=logging.INFO)
         self.credentials_file = Path(__file__).parent / credentials_file
         self.config_file = Path(__file__).parent / config_file
         self.key_file = Path(__file__).parent / key_file
+        # cryptography solo se importa al crear el gestor, no al importar el servidor
+        from cryptography.fernet import Fernet
         self.key = self._load_or_generate_key()
         self.fernet = Fernet(self.key)
         self.credentials = self._load_credentials()
@@ -27,13 +34,14 @@ class CredentialsManager:
             with open(self.key_file, 'rb') as f:
                 key = f.read()
         else:
+            from cryptography.fernet import Fernet
             key = Fernet.generate_key()
             with open(self.key_file, 'wb') as f:
                 f.write(key)
             try:
                 os.chmod(self.key_file, 0o600)
             except Exception as e:
-                logging.warning(f"Advertencia: no se pudieron establecer los permisos en {self.key_file}: {e}")
+                logger.warning("Advertencia: no se pudieron establecer los permisos en %s: %s", self.key_file, e)
         return key
 
     def _save_credentials(self):
@@ -47,7 +55,7 @@ class CredentialsManager:
         try:
             os.chmod(self.credentials_file, 0o600)
         except Exception as e:
-            logging.warning(f"Advertencia: no se pudieron establecer los permisos en {self.credentials_file}: {e}")
+            logger.warning("Advertencia: no se pudieron establecer los permisos en %s: %s", self.credentials_file, e)
 
     def _create_initial_credentials(self):
         self.credentials = {}
@@ -62,10 +70,10 @@ class CredentialsManager:
             raise ValueError("El archivo de configuración debe contener 'initial_user' y 'initial_password'")
 
         # Crear el usuario inicial
-        hashed_password = bcrypt.hash(initial_password)
+        hashed_password = _bcrypt().hash(initial_password)
         self.credentials[initial_user] = hashed_password
         self._save_credentials()
-        print(f"Usuario inicial creado con éxito.")
+        logger.info("Usuario inicial creado con éxito.")
 
     def _load_credentials(self) -> dict:
         """
@@ -84,7 +92,7 @@ class CredentialsManager:
             decrypted_data = self.fernet.decrypt(encrypted_data)
             return json.loads(decrypted_data.decode())
         except Exception as e:
-            logging.error(f"Error al cargar credenciales: {e}")
+            logger.error("Error al cargar credenciales: %s", e)
             return {}
 
     def add_user(self, username: str, password: str):
@@ -94,7 +102,7 @@ class CredentialsManager:
         """
         if username in self.credentials:
             raise ValueError("El usuario ya existe.")
-        hashed = bcrypt.hash(password)
+        hashed = _bcrypt().hash(password)
         self.credentials[username] = hashed
         self._save_credentials()
 
@@ -114,7 +122,7 @@ class CredentialsManager:
          """
         if username not in self.credentials:
             raise ValueError("El usuario no existe.")
-        self.credentials[username] = bcrypt.hash(new_password)
+        self.credentials[username] = _bcrypt().hash(new_password)
         self._save_credentials()
 
     def verify_user(self, username: str, password: str) -> bool:
@@ -124,7 +132,22 @@ class CredentialsManager:
         if username not in self.credentials:
             return False
         hashed = self.credentials[username]
-        return bcrypt.verify(password, hashed)
+        return _bcrypt().verify(password, hashed)
+
+    def admin_users(self) -> list:
+        """
+        Retorna los administradores definidos en la configuración
+        ('admin_users' o, en su defecto, el usuario inicial).
+        """
+        try:
+            with open(self.config_file, "r") as config:
+                config_data = json.load(config)
+        except (OSError, ValueError):
+            return []
+        admins = config_data.get("admin_users")
+        if admins is None:
+            admins = [config_data["initial_user"]] if config_data.get("initial_user") else []
+        return list(admins)
 
     def list_users(self) -> list:
         """
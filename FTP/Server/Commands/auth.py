@@ -1,4 +1,7 @@
 from FTP.Server.Commands.base_command import Command
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.server.auth")
 
 class UserCommand(Command):
     def execute(self, server, client_socket, args):
@@ -18,8 +21,8 @@ class PassCommand(Command):
         password = args[0]
         if server.credentials_manager.verify_user(server.current_user, password):
             server.authenticated = True
-            print("Cliente autenticado")
+            logger.info("Cliente autenticado: %s", server.current_user)
             client_socket.send(b"230 User logged in\r\n")
         else:
-            print("Fallo autenticación")
+            logger.warning("Fallo autenticación: %s", server.current_user)
             client_socket.send(b"530 Login incorrect\r\n")
\ No newline at end of file
@@ -1,16 +1,21 @@
 from FTP.Server.Commands.base_command import Command
 import socket
-import random
 
 class PasvCommand(Command):
     def execute(self, server, client_socket, args):
         try:
+            # Un PASV repetido sustituye al socket pasivo anterior
+            if server.passive_server:
+                server.passive_server.close()
             server.passive_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            passive_port = random.randint(1024, 65535)
-            server.passive_server.bind((server.host, passive_port))
+            # Puerto 0: el sistema elige uno libre, sin colisiones entre sesiones
+            server.passive_server.bind((server.host, 0))
             server.passive_server.listen(1)
-            
-            host_parts = socket.gethostbyname(socket.gethostname()).split('.')
+            passive_port = server.passive_server.getsockname()[1]
+
+            # Anunciar la dirección local de la conexión de control: es la que
+            # el cliente alcanza y evita resolver el hostname en cada PASV
+            host_parts = client_socket.getsockname()[0].split('.')
             port_high = passive_port >> 8
             port_low = passive_port & 0xFF
             
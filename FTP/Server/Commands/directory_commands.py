@@ -1,4 +1,10 @@
+import logging
+import os
 from FTP.Server.Commands.file_system_command import FileSystemCommand
+from FTP.Common.logger import get_logger
+from FTP.Common.utils import calculate_file_hash, format_ftp_time, parse_ftp_time
+
+logger = get_logger("ftp.server.commands")
 
 class PwdCommand(FileSystemCommand):
     def execute(self, server, client_socket, args):
@@ -65,11 +71,11 @@ class RmdCommand(FileSystemCommand):
             except PermissionError:
                 return "550 Permission denied\r\n"
             except Exception as e:
-                print(f"Error eliminando directorio: {e}")  # Para debugging
+                logger.error("Error eliminando directorio: %s", e)
                 return f"550 Error removing directory: {str(e)}\r\n"
                     
         except Exception as e:
-            print(f"Error en RMD: {e}")  # Para debugging
+            logger.error("Error en RMD: %s", e)
             return f"550 Error: {str(e)}\r\n"
 
     def _remove_recursive(self, path):
@@ -94,6 +100,55 @@ class DeleCommand(FileSystemCommand):
         except:
             return "550 Error deleting file\r\n"
 
+class SizeCommand(FileSystemCommand):
+    def execute(self, server, client_socket, args):
+        """Tamaño en bytes de un archivo (RFC 3659)"""
+        if not args:
+            return "501 Syntax error\r\n"
+        file_path = self.resolve_path(server, args[0])
+        if file_path is None or not file_path.is_file():
+            return "550 File not found\r\n"
+        return f"213 {file_path.stat().st_size}\r\n"
+
+class MdtmCommand(FileSystemCommand):
+    def execute(self, server, client_socket, args):
+        """Fecha de modificación de un archivo en UTC (RFC 3659)"""
+        if not args:
+            return "501 Syntax error\r\n"
+        file_path = self.resolve_path(server, args[0])
+        if file_path is None or not file_path.is_file():
+            return "550 File not found\r\n"
+        return f"213 {format_ftp_time(file_path.stat().st_mtime)}\r\n"
+
+class MfmtCommand(FileSystemCommand):
+    def execute(self, server, client_socket, args):
+        """Cambia la fecha de modificación: MFMT YYYYMMDDHHMMSS ruta"""
+        if len(args) < 2:
+            return "501 Syntax error\r\n"
+        timestamp = parse_ftp_time(args[0])
+        if timestamp is None:
+            return "501 Invalid time value\r\n"
+        file_path = self.resolve_path(server, args[1])
+        if file_path is None or not file_path.is_file():
+            return "550 File not found\r\n"
+        try:
+            os.utime(file_path, (file_path.stat().st_atime, timestamp))
+        except OSError as e:
+            return f"550 Error setting modification time: {e}\r\n"
+        return f"213 Modify={args[0][:14]}; {args[1]}\r\n"
+
+class HashCommand(FileSystemCommand):
+    def execute(self, server, client_socket, args):
+        """Hash SHA-256 del archivo completo (draft-bryan-ftpext-hash)"""
+        if not args:
+            return "501 Syntax error\r\n"
+        file_path = self.resolve_path(server, args[0])
+        if file_path is None or not file_path.is_file():
+            return "550 File not found\r\n"
+        size = file_path.stat().st_size
+        digest = calculate_file_hash(str(file_path), "sha256")
+        return f"213 SHA-256 0-{max(size - 1, 0)} {digest} {args[0]}\r\n"
+
 class RnfrCommand(FileSystemCommand):
     def execute(self, server, client_socket, args):
         if not args:
@@ -123,30 +178,75 @@ class ListCommand(FileSystemCommand):
 
         try:
             path = self.resolve_path(server, args[0]) if args else server.current_dir
-            print(f"Listando directorio: {path}")  # Debug
+            logger.debug("Listando directorio: %s", path)
             
             client_socket.send(b"150 Opening data connection for LIST\r\n")
             
             # Generar listado simplificado
             files_info = []
+            # Un registro por entrada solo con DEBUG activo
+            debug = logger.isEnabledFor(logging.DEBUG)
             for f in path.iterdir():
                 # Obtener tamaño y nombre solamente
                 size = f.stat().st_size
                 file_info = f"{f.name:<50} {size:>10}"
                 files_info.append(file_info)
-                print(f"Archivo encontrado: {file_info}")  # Debug
+                if debug:
+                    logger.debug("Archivo encontrado: %s", file_info)
             
-            listing = "\r\n".join(files_info)
-            server.data_socket.send(listing.encode() + b"\r\n")
+            listing = "\r\n".join(files_info).encode() + b"\r\n"
+            with server.data_transfer():
+                server.data_socket.sendall(listing)
+                server.add_data_bytes(len(listing))
             return "226 Transfer complete\r\n"
         except Exception as e:
-            print(f"Error en LIST: {e}")  # Debug
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            logger.error("Error en LIST: %s", e)
             return f"550 Error listing directory: {str(e)}\r\n"
         finally:
             if server.data_socket:
                 server.data_socket.close()
                 server.data_socket = None
 
+class MlsdCommand(FileSystemCommand):
+    def execute(self, server, client_socket, args):
+        """Listado en formato máquina con tipo, tamaño y fecha (RFC 3659)"""
+        if not server.create_data_connection():
+            return "425 No data connection\r\n"
+
+        try:
+            path = self.resolve_path(server, args[0]) if args else server.current_dir
+            if path is None or not path.is_dir():
+                return "550 Directory not found\r\n"
+            client_socket.send(b"150 Opening data connection for MLSD\r\n")
+
+            lines = []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    kind = "dir" if entry.is_dir() else "file"
+                    lines.append(f"type={kind};size={stat.st_size};"
+                                 f"modify={format_ftp_time(stat.st_mtime)}; {entry.name}\r\n")
+
+            data = "".join(lines).encode()
+            with server.data_transfer():
+                server.data_socket.sendall(data)
+                server.add_data_bytes(len(data))
+            return "226 Transfer complete\r\n"
+        except Exception as e:
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            logger.error("Error en MLSD: %s", e)
+            return "550 Error listing directory\r\n"
+        finally:
+            if server.data_socket:
+                server.data_socket.close()
+                server.data_socket = None
+
 class NlstCommand(FileSystemCommand):
     def execute(self, server, client_socket, args):
         if not server.create_data_connection():
@@ -166,12 +266,16 @@ class NlstCommand(FileSystemCommand):
                     # Para modo binario, usar LF
                     file_names.append(f"{item.name}\n")
             
-            data = "".join(file_names)
-            server.data_socket.send(data.encode())
+            data = "".join(file_names).encode()
+            with server.data_transfer():
+                server.data_socket.sendall(data)
+                server.add_data_bytes(len(data))
             return "226 Transfer complete\r\n"
             
         except Exception as e:
-            print(f"Error en NLST: {e}")  # Para debugging
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            logger.error("Error en NLST: %s", e)
             return "550 Error listing files\r\n"
         finally:
             if server.data_socket:
@@ -197,5 +301,5 @@ class CdupCommand(FileSystemCommand):
             return "200 Directorio cambiado al padre exitosamente\r\n"
             
         except Exception as e:
-            print(f"Error en CDUP: {e}")  # Para debugging
+            logger.error("Error en CDUP: %s", e)
             return "550 Error cambiando al directorio padre\r\n"
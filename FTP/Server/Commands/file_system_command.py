@@ -6,7 +6,11 @@ class FileSystemCommand(Command):
     def resolve_path(self, server, path):
         """Resuelve una ruta relativa al directorio actual del servidor"""
         try:
-            absolute_path = (server.current_dir / path).resolve()
+            # Las rutas absolutas parten de la raíz servida, no del sistema
+            if path.startswith("/"):
+                absolute_path = (server.base_dir / path.lstrip("/")).resolve()
+            else:
+                absolute_path = (server.current_dir / path).resolve()
 
             # Verificar que el path esté dentro del directorio base
             if not absolute_path.is_relative_to(server.base_dir):
@@ -1,5 +1,7 @@
 from FTP.Common.exceptions import FTPAuthError
 from FTP.Server.Commands.base_command import Command
+from FTP.Server.metrics import format_stats
+from FTP.Server.profiling import CommandProfiler, parse_profile_args
 
 
 class SiteCommand(Command):
@@ -11,6 +13,9 @@ class SiteCommand(Command):
           REMOVEUSER - Eliminar un usuario: SITE REMOVEUSER <username>
           PASSRESET  - Restablecer la contraseña de un usuario: SITE PASSRESET <username> <new_password>
           LISTUSERS  - Listar todos los usuarios
+          STATS      - Mostrar latencias por comando y contadores de transferencia
+          PROFILE    - Perfilado muestreado (solo administradores):
+                       SITE PROFILE START [rate] [MEM] | STOP | DUMP
           HELP       - Mostrar la ayuda de los comandos SITE
         """
         if not args:
@@ -26,6 +31,8 @@ class SiteCommand(Command):
                 "  REMOVEUSER - Remove a user (SITE REMOVEUSER <username>)\r\n"
                 "  PASSRESET  - Reset a user's password (SITE PASSRESET <username> <new_password>)\r\n"
                 "  LISTUSERS  - List all users\r\n"
+                "  STATS      - Show per-command latency and transfer counters\r\n"
+                "  PROFILE    - Sampled profiling, admins only (SITE PROFILE START [rate] [MEM] | STOP | DUMP)\r\n"
                 "  HELP       - Show this help\r\n"
                 "214 End of help\r\n"
             )
@@ -69,5 +76,52 @@ class SiteCommand(Command):
             else:
                 return "200 No users found\r\n"
 
+        elif site_command == "STATS":
+            return format_stats(server.server.metrics.snapshot())
+
+        elif site_command == "PROFILE":
+            return self._profile(server, site_args)
+
         else:
             return "500 Unknown SITE command\r\n"
+
+    def _profile(self, session, site_args):
+        """Controla el perfilado muestreado de los comandos"""
+        ftp_server = session.server
+        if not session.authenticated or session.current_user not in ftp_server.admin_users:
+            return "550 Permission denied: SITE PROFILE requires an administrator\r\n"
+        if not site_args:
+            return "501 Syntax error, expected: SITE PROFILE START [rate] [MEM] | STOP | DUMP\r\n"
+
+        action = site_args[0].upper()
+        if action == "START":
+            options = parse_profile_args(site_args[1:])
+            if options is None:
+                return "501 Syntax error, expected: SITE PROFILE START [rate] [MEM]\r\n"
+            if ftp_server.profiler is not None:
+                return "503 Profiling already running\r\n"
+            rate, memory = options
+            ftp_server.profiler = CommandProfiler(sample_rate=rate, memory=memory)
+            return f"200 Profiling started (1 of every {rate} commands{', with memory' if memory else ''})\r\n"
+
+        elif action == "STOP":
+            profiler = ftp_server.profiler
+            if profiler is None:
+                return "503 Profiling is not running\r\n"
+            ftp_server.profiler = None
+            profiler.stop()
+            # Se conserva para poder volcarlo después de detenerlo
+            ftp_server.last_profiler = profiler
+            return f"200 Profiling stopped after {profiler.samples} samples\r\n"
+
+        elif action == "DUMP":
+            profiler = ftp_server.profiler or ftp_server.last_profiler
+            if profiler is None:
+                return "503 No profile data, use SITE PROFILE START first\r\n"
+            try:
+                path = profiler.dump(ftp_server.profile_dir)
+            except OSError as e:
+                return f"550 Could not write profile: {e}\r\n"
+            return f"250 Profile written to {path}\r\n"
+
+        return "501 Unknown SITE PROFILE action\r\n"
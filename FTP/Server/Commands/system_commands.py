@@ -5,6 +5,10 @@ class FeatCommand(Command):
         features = """211-Features:
  PASV
  SIZE
+ MDTM
+ MFMT
+ HASH SHA-256
+ MLST type*;size*;modify*;
  UTF8
  REST STREAM
 211 End"""
@@ -62,6 +66,7 @@ class StatCommand(Command):
             response += f"    Structure: {server.structure}\r\n"
             response += f"    Mode: {server.mode}\r\n"
             response += f"    Passive mode: {'Yes' if server.passive_mode else 'No'}\r\n"
+            response += "211 End of status\r\n"
             return response
 
         except ImportError:
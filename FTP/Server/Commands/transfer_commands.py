@@ -1,38 +1,61 @@
 from pathlib import Path
 from FTP.Server.Commands.base_command import Command
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.server.transfer")
 
 class RetrCommand(Command):
     def execute(self, server, client_socket, args):
         if not args:
             return "501 Syntax error\r\n"
 
+        # REST solo afecta a la siguiente transferencia
+        restart_point, server.restart_point = server.restart_point, None
+
         if not server.create_data_connection():
             return "425 No data connection\r\n"
 
+        started = False
         try:
             # El servidor solo maneja la ruta remota (en su sistema de archivos)
             file_path = server.current_dir / args[0]
             if file_path.is_file():
+                if restart_point:
+                    # En ASCII el desplazamiento no coincide con el del archivo
+                    if server.transfer_type == 'A':
+                        return "504 REST not supported in ASCII mode\r\n"
+                    if restart_point > file_path.stat().st_size:
+                        return "554 Invalid restart point\r\n"
+
                 client_socket.send(b"150 Opening data connection for file transfer\r\n")
+                started = True
                 
                 # Modo de apertura según el tipo de transferencia
                 mode = 'r' if server.transfer_type == 'A' else 'rb'
                 encoding = 'utf-8' if server.transfer_type == 'A' else None
                 
-                with open(file_path, mode, encoding=encoding) as f:
+                with open(file_path, mode, encoding=encoding) as f, server.data_transfer():
+                    if restart_point:
+                        f.seek(restart_point)
                     while True:
-                        data = f.read(8192)
+                        data = f.read(server.buffer_size)
                         if not data:
                             break
                         # Para ASCII, asegurar terminaciones de línea correctas
                         if server.transfer_type == 'A':
                             data = data.replace('\n', '\r\n').encode('utf-8')
                         # Para binario, los datos ya están en bytes
-                        server.data_socket.send(data if isinstance(data, bytes) else data.encode())
+                        server.data_socket.sendall(data if isinstance(data, bytes) else data.encode())
+                        server.add_data_bytes(len(data))
                 return "226 Transfer complete\r\n"
             else:
                 return "550 File not found\r\n"
-        except:
+        except Exception as e:
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            # El cliente cerró la conexión de datos (p. ej. un segmento ya completo)
+            if started and isinstance(e, OSError):
+                return "426 Connection closed; transfer aborted\r\n"
             return "550 Error reading file\r\n"
         finally:
             if server.data_socket:
@@ -47,29 +70,49 @@ class StorCommand(Command):
         if not args:
             return "501 Syntax error\r\n"
 
+        # Sin soporte de REST en STOR: se descarta para no afectar a un RETR posterior
+        server.restart_point = None
+
         if not server.create_data_connection():
             return "425 No data connection\r\n"
 
+        file_path = None
+        completed = False
         try:
             original_path = server.current_dir / args[0]
             file_path = self._get_unique_path(original_path)
             
             client_socket.send(f"150 Opening data connection for file transfer. Saving as {file_path.name}\r\n".encode())
             
-            with open(file_path, 'wb') as f:
+            with open(file_path, 'wb') as f, server.data_transfer():
                 while True:
-                    data = server.data_socket.recv(8192)
+                    data = server.data_socket.recv(server.buffer_size)
                     if not data:
                         break
                     f.write(data)
+                    server.add_data_bytes(len(data))
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            completed = True
             return "226 Transfer complete\r\n"
+        except ConnectionResetError:
+            # El cliente abortó (RST en la conexión de datos)
+            return "426 Connection closed; transfer aborted\r\n"
         except Exception as e:
-            print(f"Error en STOR: {e}")  # Para debugging
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            logger.error("Error en STOR: %s", e)
             return "550 Error storing file\r\n"
         finally:
             if server.data_socket:
                 server.data_socket.close()
                 server.data_socket = None
+            # Cualquier salida sin 226 (error, timeout, excepción) no deja un archivo a medias
+            if not completed and file_path is not None:
+                try:
+                    file_path.unlink()
+                except OSError:
+                    pass
 
     def _get_unique_path(self, original_path):
         """Genera un nombre único para el archivo si ya existe."""
@@ -94,21 +137,41 @@ class StouCommand(Command):
         if not server.create_data_connection():
             return "425 No data connection\r\n"
             
+        temp_file = None
+        completed = False
         try:
             temp_file = tempfile.NamedTemporaryFile(delete=False, dir=server.current_dir)
             temp_name = Path(temp_file.name).name
             client_socket.send(f"150 File will be saved as {temp_name}\r\n".encode())
             
-            with open(temp_file.name, 'wb') as f:
+            with open(temp_file.name, 'wb') as f, server.data_transfer():
                 while True:
-                    data = server.data_socket.recv(8192)
+                    data = server.data_socket.recv(server.buffer_size)
                     if not data:
                         break
                     f.write(data)
-                    
+                    server.add_data_bytes(len(data))
+
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            completed = True
             return f"226 Transfer complete. Saved as {temp_name}\r\n"
         except:
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
             return "550 Error in STOU\r\n"
+        finally:
+            if server.data_socket:
+                server.data_socket.close()
+                server.data_socket = None
+            # Igual que en STOR: sin 226 no queda el archivo a medias
+            if temp_file is not None:
+                temp_file.close()
+                if not completed:
+                    try:
+                        Path(temp_file.name).unlink()
+                    except OSError:
+                        pass
 
 class AppeCommand(Command):
     def execute(self, server, client_socket, args):
@@ -125,12 +188,13 @@ class AppeCommand(Command):
             mode = 'a' if server.transfer_type == 'A' else 'ab'
             encoding = 'utf-8' if server.transfer_type == 'A' else None
             client_socket.send(b"150 Opening connection for append\r\n")
-            with open(file_path, mode, encoding=encoding) as f:
+            with open(file_path, mode, encoding=encoding) as f, server.data_transfer():
                 while True:
-                    data = server.data_socket.recv(8192)
+                    data = server.data_socket.recv(server.buffer_size)
                     if not data:
                         break
-                        
+                    server.add_data_bytes(len(data))
+
                     if server.transfer_type == 'A':
                         # En modo ASCII, decodificar y normalizar finales de línea
                         text = data.decode('utf-8').replace('\r\n', '\n')
@@ -138,11 +202,15 @@ class AppeCommand(Command):
                     else:
                         # En modo binario, escribir directamente
                         f.write(data)
-                        
+
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
             return "226 Transfer complete\r\n"
             
         except Exception as e:
-            print(f"Error en APPE: {e}")  # Para debugging
+            if server.data_timed_out:
+                return "426 Connection closed; transfer aborted (timeout)\r\n"
+            logger.error("Error en APPE: %s", e)
             return "550 Error appending to file\r\n"
         finally:
             if server.data_socket:
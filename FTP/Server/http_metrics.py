@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from FTP.Common.logger import get_logger
+from FTP.Server.metrics import format_prometheus
+
+logger = get_logger("ftp.server")
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Atiende ``/metrics`` y ``/healthz``."""
+
+    server_version = "FTPMetrics/1.0"
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        endpoint: MetricsHTTPServer = self.server.endpoint
+        if path == "/metrics":
+            snapshot = endpoint.snapshot()
+            if "format=json" in query:
+                body = json.dumps(endpoint.to_json(snapshot)).encode()
+                content_type = "application/json"
+            else:
+                body = endpoint.to_prometheus(snapshot).encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            self._reply(200, body, content_type)
+        elif path == "/healthz":
+            healthy = endpoint.ftp_server.is_healthy()
+            self._reply(200 if healthy else 503, b"ok\n" if healthy else b"unavailable\n",
+                        "text/plain; charset=utf-8")
+        else:
+            self._reply(404, b"not found\n", "text/plain; charset=utf-8")
+
+    def _reply(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("HTTP %s - %s", self.address_string(), format % args)
+
+
+class MetricsHTTPServer:
+    """Endpoint HTTP opcional con las métricas del servidor FTP.
+
+    Corre en su propio hilo y puerto. Solo lee las métricas mediante
+    ``ServerMetrics.snapshot()``, que agrega los fragmentos por sesión sin
+    locks, así que nunca compite con los hilos de las sesiones FTP.
+    """
+
+    def __init__(self, ftp_server, host: str = "127.0.0.1", port: int = 9121):
+        self.ftp_server = ftp_server
+        self.host = host
+        self.port = port
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        # Última lectura, para calcular el ritmo entre consultas; las
+        # consultas llegan en hilos distintos de ThreadingHTTPServer
+        self._rate_lock = threading.Lock()
+        self._last_sample = (time.monotonic(), 0, 0)
+        self._last_rate = (0.0, 0.0)
+
+    def start(self) -> None:
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _MetricsRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.endpoint = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="ftp-http-metrics",
+                                        daemon=True)
+        self._thread.start()
+        logger.info("Métricas HTTP en http://%s:%s/metrics", self.host, self.port)
+
+    def stop(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def snapshot(self) -> dict:
+        """Instantánea de métricas con el ritmo de transferencia añadido"""
+        # Lectura y ritmo bajo el mismo lock: otra consulta no puede intercalar una muestra más nueva
+        with self._rate_lock:
+            snapshot = self.ftp_server.metrics.snapshot()
+            bytes_in = sum(count for (_, direction), count in snapshot["bytes"].items() if direction == "in")
+            bytes_out = sum(count for (_, direction), count in snapshot["bytes"].items() if direction == "out")
+            now = time.monotonic()
+            last_time, last_in, last_out = self._last_sample
+            elapsed = now - last_time
+            # Con consultas muy seguidas se reutiliza el último ritmo calculado
+            if elapsed >= 1.0:
+                self._last_rate = ((bytes_in - last_in) / elapsed, (bytes_out - last_out) / elapsed)
+                self._last_sample = (now, bytes_in, bytes_out)
+            snapshot["rate_in"], snapshot["rate_out"] = self._last_rate
+        return snapshot
+
+    @staticmethod
+    def to_prometheus(snapshot: dict) -> str:
+        lines = [
+            format_prometheus(snapshot).rstrip("\n"),
+            "# HELP ftp_transfer_rate_bytes_per_second Ritmo de transferencia desde la consulta anterior",
+            "# TYPE ftp_transfer_rate_bytes_per_second gauge",
+            f'ftp_transfer_rate_bytes_per_second{{direction="in"}} {snapshot["rate_in"]:.3f}',
+            f'ftp_transfer_rate_bytes_per_second{{direction="out"}} {snapshot["rate_out"]:.3f}',
+        ]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def to_json(snapshot: dict) -> dict:
+        return {
+            "uptime": snapshot["uptime"],
+            "sessions_active": snapshot["sessions_active"],
+            "sessions_total": snapshot["sessions_total"],
+            "transfers_in_flight": snapshot["data_connections_active"],
+            "throughput": {"in": snapshot["rate_in"], "out": snapshot["rate_out"]},
+            "bytes": {f"{verb}_{direction}": count for (verb, direction), count in snapshot["bytes"].items()},
+            "latency": {
+                verb: {
+                    "count": histogram.count,
+                    "p50": histogram.percentile(0.50),
+                    "p95": histogram.percentile(0.95),
+                    "p99": histogram.percentile(0.99),
+                }
+                for verb, histogram in snapshot["latency"].items()
+            },
+            "timeouts": snapshot["timeouts"],
+        }
@@ -0,0 +1,292 @@
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Comandos que mueven datos y en qué sentido (visto desde el servidor)
+TRANSFER_DIRECTION = {
+    "RETR": "out",
+    "LIST": "out",
+    "NLST": "out",
+    "MLSD": "out",
+    "STOR": "in",
+    "STOU": "in",
+    "APPE": "in",
+}
+
+
+class LatencyHistogram:
+    """Histograma de latencias con cubetas fijas en escala logarítmica.
+
+    La cubeta ``i`` cuenta las muestras con ``(ns >> 10).bit_length() == i``,
+    es decir, menores que ``2**i`` microsegundos binarios (1024 ns). Registrar
+    una muestra solo incrementa enteros ya reservados.
+    """
+
+    BUCKETS = 32
+    __slots__ = ("counts", "count", "total_ns")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, ns: int) -> None:
+        index = (ns >> 10).bit_length()
+        if index >= self.BUCKETS:
+            index = self.BUCKETS - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        counts = self.counts
+        for i, value in enumerate(other.counts):
+            counts[i] += value
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram()
+        clone.merge(self)
+        return clone
+
+    @staticmethod
+    def upper_bound(index: int) -> float:
+        """Límite superior de la cubeta ``index`` en segundos"""
+        return (1 << index) * 1024 / 1e9
+
+    def percentile(self, fraction: float) -> float:
+        """Aproxima un percentil con el límite superior de su cubeta (segundos)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for i, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return self.upper_bound(i)
+        return self.upper_bound(self.BUCKETS - 1)
+
+
+class MetricsShard:
+    """Contadores de una sesión. Solo escribe el hilo de esa sesión."""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.bytes: Dict[Tuple[str, str], int] = {}
+        self.data_connections = 0
+        self.data_open = 0
+        # Clave de ``bytes`` de la transferencia en curso (ver ``begin_transfer``)
+        self.transfer_key: Tuple[str, str] = ("", "out")
+
+    def observe(self, verb: str, ns: int) -> None:
+        """Registra la duración de un comando"""
+        histogram = self.latency.get(verb)
+        if histogram is None:
+            histogram = self.latency[verb] = LatencyHistogram()
+        histogram.record(ns)
+
+    def add_bytes(self, verb: str, count: int) -> None:
+        """Suma los bytes transferidos por un comando de datos"""
+        key = (verb, TRANSFER_DIRECTION.get(verb, "out"))
+        self.bytes[key] = self.bytes.get(key, 0) + count
+
+    def begin_transfer(self, verb: str) -> None:
+        """Prepara la cuenta de bytes del comando de datos ``verb``: la sesión
+        los suma con ``FTPSession.add_data_bytes`` según se mueven, así que las
+        lecturas ven el progreso de las transferencias largas"""
+        key = self.transfer_key = (verb, TRANSFER_DIRECTION.get(verb, "out"))
+        if key not in self.bytes:
+            self.bytes[key] = 0
+
+    def merge(self, other: "MetricsShard") -> None:
+        # list() copia las vistas de una vez: el hilo dueño puede estar
+        # añadiendo claves mientras se agrega
+        for verb, histogram in list(other.latency.items()):
+            if verb in self.latency:
+                self.latency[verb].merge(histogram)
+            else:
+                self.latency[verb] = histogram.copy()
+        for key, count in list(other.bytes.items()):
+            self.bytes[key] = self.bytes.get(key, 0) + count
+        self.data_connections += other.data_connections
+
+    def copy(self) -> "MetricsShard":
+        clone = MetricsShard()
+        clone.merge(self)
+        return clone
+
+
+class ServerMetrics:
+    """Métricas del servidor FTP repartidas en un fragmento por sesión.
+
+    Cada sesión escribe solo en su ``MetricsShard``, así que el camino de los
+    comandos no toma ningún lock. Altas y bajas de sesiones sustituyen de
+    forma atómica la tupla ``(activos, retirados, total)``; los lectores toman
+    esa tupla una vez y suman sin bloquear a nadie.
+    """
+
+    TIMEOUT_KINDS = ("control_idle", "data_accept", "data_stall")
+
+    def __init__(self):
+        # Los escriben la rueda de temporizadores y, en modo activo, los hilos
+        # de sesión: se incrementan bajo _timeouts_lock
+        self.timeouts: Dict[str, int] = {kind: 0 for kind in self.TIMEOUT_KINDS}
+        self._timeouts_lock = threading.Lock()
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._state: Tuple[Tuple[MetricsShard, ...], MetricsShard, int] = ((), MetricsShard(), 0)
+
+    def record_timeout(self, kind: str) -> None:
+        """Cuenta un timeout de sesión del tipo indicado"""
+        with self._timeouts_lock:
+            self.timeouts[kind] = self.timeouts.get(kind, 0) + 1
+
+    def open_shard(self) -> MetricsShard:
+        """Registra una sesión nueva y devuelve su fragmento"""
+        shard = MetricsShard()
+        with self._lock:
+            live, retired, total = self._state
+            self._state = (live + (shard,), retired, total + 1)
+        return shard
+
+    def close_shard(self, shard: MetricsShard) -> None:
+        """Incorpora el fragmento de una sesión terminada a los totales"""
+        shard.data_open = 0
+        with self._lock:
+            live, retired, total = self._state
+            merged = retired.copy()
+            merged.merge(shard)
+            self._state = (tuple(s for s in live if s is not shard), merged, total)
+
+    def snapshot(self) -> dict:
+        """Agrega todos los fragmentos sin tomar locks"""
+        live, retired, total = self._state
+        totals = retired.copy()
+        data_open = 0
+        for shard in live:
+            totals.merge(shard)
+            data_open += shard.data_open
+        with self._timeouts_lock:
+            timeouts = dict(self.timeouts)
+        return {
+            "uptime": time.time() - self.started_at,
+            "sessions_active": len(live),
+            "sessions_total": total,
+            "data_connections_active": data_open,
+            "data_connections_total": totals.data_connections,
+            "latency": totals.latency,
+            "bytes": totals.bytes,
+            "timeouts": timeouts,
+        }
+
+
+def format_stats(snapshot: dict) -> str:
+    """Respuesta multilínea 211 para ``SITE STATS``"""
+    lines = [
+        "211-Server statistics:",
+        f"    Uptime: {snapshot['uptime']:.0f}s",
+        f"    Sessions: {snapshot['sessions_active']} active, {snapshot['sessions_total']} total",
+        f"    Data connections: {snapshot['data_connections_active']} active, "
+        f"{snapshot['data_connections_total']} total",
+    ]
+    if snapshot["latency"]:
+        lines.append("    Command      count    mean_ms     p50_ms     p95_ms     p99_ms")
+        for verb, histogram in sorted(snapshot["latency"].items()):
+            mean_ms = histogram.total_ns / histogram.count / 1e6 if histogram.count else 0.0
+            lines.append(
+                f"    {verb:<8} {histogram.count:>9} {mean_ms:>10.3f} "
+                f"{histogram.percentile(0.50) * 1000:>10.3f} "
+                f"{histogram.percentile(0.95) * 1000:>10.3f} "
+                f"{histogram.percentile(0.99) * 1000:>10.3f}"
+            )
+    for (verb, direction), count in sorted(snapshot["bytes"].items()):
+        lines.append(f"    Bytes {direction} {verb}: {count}")
+    timeouts = ", ".join(f"{kind}={count}" for kind, count in snapshot["timeouts"].items())
+    lines.append(f"    Timeouts: {timeouts}")
+    lines.append("211 End of statistics")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def format_prometheus(snapshot: dict) -> str:
+    """Serializa una instantánea en el formato de texto de Prometheus"""
+    out = [
+        "# HELP ftp_uptime_seconds Segundos desde el arranque del servidor",
+        "# TYPE ftp_uptime_seconds gauge",
+        f"ftp_uptime_seconds {snapshot['uptime']:.3f}",
+        "# HELP ftp_sessions_active Sesiones de control abiertas",
+        "# TYPE ftp_sessions_active gauge",
+        f"ftp_sessions_active {snapshot['sessions_active']}",
+        "# HELP ftp_sessions_total Sesiones de control aceptadas",
+        "# TYPE ftp_sessions_total counter",
+        f"ftp_sessions_total {snapshot['sessions_total']}",
+        "# HELP ftp_data_connections_active Conexiones de datos abiertas",
+        "# TYPE ftp_data_connections_active gauge",
+        f"ftp_data_connections_active {snapshot['data_connections_active']}",
+        "# HELP ftp_data_connections_total Conexiones de datos establecidas",
+        "# TYPE ftp_data_connections_total counter",
+        f"ftp_data_connections_total {snapshot['data_connections_total']}",
+        "# HELP ftp_command_duration_seconds Latencia de los comandos FTP",
+        "# TYPE ftp_command_duration_seconds histogram",
+    ]
+    for verb, histogram in sorted(snapshot["latency"].items()):
+        cumulative = 0
+        for i, value in enumerate(histogram.counts):
+            cumulative += value
+            out.append(f'ftp_command_duration_seconds_bucket{{verb="{verb}",'
+                       f'le="{LatencyHistogram.upper_bound(i):.9g}"}} {cumulative}')
+        out.append(f'ftp_command_duration_seconds_bucket{{verb="{verb}",le="+Inf"}} {histogram.count}')
+        out.append(f'ftp_command_duration_seconds_sum{{verb="{verb}"}} {histogram.total_ns / 1e9:.9f}')
+        out.append(f'ftp_command_duration_seconds_count{{verb="{verb}"}} {histogram.count}')
+    out += [
+        "# HELP ftp_transfer_bytes_total Bytes transferidos por comando",
+        "# TYPE ftp_transfer_bytes_total counter",
+    ]
+    for (verb, direction), count in sorted(snapshot["bytes"].items()):
+        out.append(f'ftp_transfer_bytes_total{{verb="{verb}",direction="{direction}"}} {count}')
+    out += [
+        "# HELP ftp_timeouts_total Sesiones o transferencias cortadas por timeout",
+        "# TYPE ftp_timeouts_total counter",
+    ]
+    for kind, count in snapshot["timeouts"].items():
+        out.append(f'ftp_timeouts_total{{kind="{kind}"}} {count}')
+    return "\n".join(out) + "\n"
+
+
+class PrometheusFileExporter:
+    """Escribe periódicamente las métricas en un fichero de texto Prometheus.
+
+    Pensado para el textfile collector de node_exporter: el fichero se
+    reemplaza de forma atómica. Se reprograma en la rueda de temporizadores
+    del servidor, sin hilo propio.
+    """
+
+    def __init__(self, metrics: ServerMetrics, timer_wheel, path: str, interval: float = 15.0):
+        self.metrics = metrics
+        self.timer_wheel = timer_wheel
+        self.path = path
+        self.interval = interval
+        self._timer = None
+
+    def start(self) -> None:
+        self._timer = self.timer_wheel.schedule(self.interval, self._tick)
+
+    def stop(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _tick(self) -> None:
+        try:
+            self.write()
+        finally:
+            if self._timer is not None:
+                self._timer = self.timer_wheel.schedule(self.interval, self._tick)
+
+    def write(self) -> None:
+        """Escribe la instantánea actual en ``path``"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(format_prometheus(self.metrics.snapshot()))
+        os.replace(tmp_path, self.path)
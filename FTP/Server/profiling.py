@@ -0,0 +1,112 @@
+import cProfile
+import io
+import itertools
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.server")
+
+
+class CommandProfiler:
+    """Perfilado muestreado de ``Command.execute``.
+
+    Mientras está activo, una de cada ``sample_rate`` ejecuciones se ejecuta
+    bajo ``cProfile``. Solo un hilo perfila a la vez: si otra sesión ya está
+    siendo perfilada la muestra se descarta en lugar de esperar. Con
+    ``memory=True`` también se activa ``tracemalloc`` para poder volcar una
+    instantánea de memoria.
+    """
+
+    def __init__(self, sample_rate: int = 10, memory: bool = False):
+        self.sample_rate = max(1, sample_rate)
+        self.memory = memory
+        self.profile = cProfile.Profile()
+        self.samples = 0
+        self.started_at = time.time()
+        self._counter = itertools.count(1)
+        # Reentrante: SITE PROFILE DUMP puede ejecutarse dentro de una muestra
+        self._lock = threading.RLock()
+        self._started_tracemalloc = False
+        self._memory_snapshot: Optional[tracemalloc.Snapshot] = None
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+
+    def run(self, command, session, client_socket, args):
+        """Ejecuta el comando y lo perfila si le toca muestra"""
+        if next(self._counter) % self.sample_rate or not self._lock.acquire(blocking=False):
+            return command.execute(session, client_socket, args)
+        try:
+            self.samples += 1
+            return self.profile.runcall(command.execute, session, client_socket, args)
+        finally:
+            self._lock.release()
+
+    def stop(self) -> None:
+        """Detiene tracemalloc si lo arrancó este perfilador"""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            # Conservar la memoria viva al parar para poder volcarla luego
+            self._memory_snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def dump(self, directory) -> Path:
+        """Vuelca los resultados y devuelve la ruta del resumen de texto.
+
+        Se escriben ``profile-<ts>.pstats`` (formato binario estándar de
+        ``pstats``), ``profile-<ts>.txt`` con las funciones más costosas y,
+        si hay datos de memoria, ``profile-<ts>.tracemalloc``.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        base = directory / f"{time.strftime('profile-%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+
+        with self._lock:
+            self.profile.create_stats()
+
+        summary = io.StringIO()
+        summary.write(f"# Muestras: {self.samples} (1 de cada {self.sample_rate} comandos)\n")
+        if self.profile.stats:
+            # pstats solo se usa al volcar; no se carga al arrancar el servidor
+            import pstats
+            self.profile.dump_stats(f"{base}.pstats")
+            stats = pstats.Stats(f"{base}.pstats", stream=summary)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+
+        snapshot = tracemalloc.take_snapshot() if self.memory and tracemalloc.is_tracing() else self._memory_snapshot
+        if snapshot is not None:
+            snapshot.dump(f"{base}.tracemalloc")
+            summary.write("\n# Memoria: líneas con más asignaciones vivas\n")
+            for stat in snapshot.statistics("lineno")[:30]:
+                summary.write(f"{stat}\n")
+
+        summary_path = Path(f"{base}.txt")
+        summary_path.write_text(summary.getvalue(), encoding="utf-8")
+        logger.info("Perfil volcado en %s", summary_path)
+        return summary_path
+
+
+def default_profile_dir() -> str:
+    """Directorio por defecto de los volcados, fuera del árbol servido"""
+    return os.path.join(tempfile.gettempdir(), "ftp-profiles")
+
+
+def parse_profile_args(args) -> Optional[tuple]:
+    """Parsea ``START [rate] [MEM]``; devuelve ``(rate, memory)`` o None"""
+    rate, memory = 10, False
+    for arg in args:
+        if arg.upper() == "MEM":
+            memory = True
+        elif arg.isdigit() and int(arg) > 0:
+            rate = int(arg)
+        else:
+            return None
+    return rate, memory
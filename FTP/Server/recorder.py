@@ -0,0 +1,92 @@
+import itertools
+import struct
+import threading
+import time
+from collections import namedtuple
+from typing import Iterator
+
+from FTP.Common.logger import get_logger
+from FTP.Common.utils import mask_secrets
+
+logger = get_logger("ftp.server")
+
+# Cabecera: firma y hora de inicio (epoch) de la grabación
+MAGIC = b"FTPREC01"
+HEADER = struct.Struct("<8sd")
+# Cada registro: tipo, id de sesión y microsegundos desde el inicio
+RECORD = struct.Struct("<BIQ")
+# Cuerpo de un comando: código de respuesta, duración (ns), bytes de datos y longitud de la línea
+COMMAND = struct.Struct("<HQQH")
+
+OPEN, COMMAND_KIND, CLOSE = 1, 2, 3
+
+RecordedEvent = namedtuple("RecordedEvent", "kind session offset_us line code duration_ns data_bytes")
+
+
+class SessionRecorder:
+    """Graba los comandos de control de todas las sesiones en un log binario.
+
+    Solo se guardan la línea de comando (con las contraseñas enmascaradas), el
+    código de respuesta, el tiempo de servicio y el número de bytes de datos:
+    el contenido de los ficheros se reduce a su tamaño, y la herramienta de
+    reproducción lo sustituye por datos sintéticos del mismo tamaño.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, time.time()))
+        self._started = time.monotonic()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _offset_us(self, when: float) -> int:
+        return max(0, int((when - self._started) * 1e6))
+
+    def _write(self, data: bytes) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(data)
+
+    def open_session(self) -> int:
+        session_id = next(self._ids)
+        self._write(RECORD.pack(OPEN, session_id, self._offset_us(time.monotonic())))
+        return session_id
+
+    def command(self, session_id: int, started: float, line: str, code: int,
+                duration_ns: int, data_bytes: int) -> None:
+        """Registra un comando ya respondido; ``started`` es ``time.monotonic()``"""
+        encoded = mask_secrets(line).encode("utf-8", errors="replace")[:0xFFFF]
+        self._write(RECORD.pack(COMMAND_KIND, session_id, self._offset_us(started))
+                    + COMMAND.pack(code, duration_ns, data_bytes, len(encoded)) + encoded)
+
+    def close_session(self, session_id: int) -> None:
+        self._write(RECORD.pack(CLOSE, session_id, self._offset_us(time.monotonic())))
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info("Grabación de sesiones guardada en %s", self.path)
+
+
+def read_recording(path) -> Iterator[RecordedEvent]:
+    """Lee un log de ``SessionRecorder`` en el orden en que se escribió"""
+    with open(path, "rb") as f:
+        magic, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es una grabación de sesiones FTP")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            kind, session_id, offset_us = RECORD.unpack(head)
+            if kind == COMMAND_KIND:
+                body = f.read(COMMAND.size)
+                if len(body) < COMMAND.size:
+                    return
+                code, duration_ns, data_bytes, length = COMMAND.unpack(body)
+                line = f.read(length).decode("utf-8", errors="replace")
+                yield RecordedEvent(kind, session_id, offset_us, line, code, duration_ns, data_bytes)
+            else:
+                yield RecordedEvent(kind, session_id, offset_us, "", 0, 0, 0)
@@ -1,12 +1,16 @@
+import logging
 import socket
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 from FTP.Server.Commands.auth import UserCommand, PassCommand
 from FTP.Server.Commands.transfer_commands import RetrCommand, StorCommand, StouCommand, AppeCommand
 from FTP.Server.Commands.directory_commands import (PwdCommand, CwdCommand, MkdCommand,
                                                 RmdCommand, DeleCommand, RnfrCommand,
                                                 RntoCommand, ListCommand, CdupCommand,
-                                                NlstCommand)
+                                                NlstCommand, SizeCommand, MdtmCommand,
+                                                MfmtCommand, HashCommand, MlsdCommand)
 from FTP.Server.Commands.system_commands import (SystCommand, StatCommand, NoopCommand,
                                              HelpCommand, QuitCommand, TypeCommand,
                                              ModeCommand, StruCommand, FeatCommand,
@@ -16,9 +20,31 @@ from FTP.Server.Commands.connection_commands import PasvCommand, PortCommand
 from FTP.Server.Commands.base_command import Command
 from FTP.Server.Auth.CredentialsManager import CredentialsManager
 from FTP.Server.Commands.site_commands import SiteCommand
+from FTP.Server.session import FTPSession
+from FTP.Server.timer_wheel import TimerWheel
+from FTP.Server.metrics import ServerMetrics, PrometheusFileExporter, TRANSFER_DIRECTION
+from FTP.Server.profiling import CommandProfiler, default_profile_dir
+from FTP.Server.recorder import SessionRecorder
+from FTP.Common.logger import get_logger, is_configured, setup_logging
+from FTP.Common.utils import mask_secrets
+from FTP.Common.constants import (DEFAULT_IDLE_TIMEOUT, DEFAULT_DATA_ACCEPT_TIMEOUT,
+                                  DEFAULT_DATA_STALL_TIMEOUT, DEFAULT_TRANSFER_BUFFER_SIZE)
+
+if TYPE_CHECKING:
+    from FTP.Server.http_metrics import MetricsHTTPServer
+
+logger = get_logger("ftp.server")
 
 class FTPServer:
-    def __init__(self, host='0.0.0.0', port=21, base_dir=None):
+    def __init__(self, host='0.0.0.0', port=21, base_dir=None,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 data_accept_timeout: float = DEFAULT_DATA_ACCEPT_TIMEOUT,
+                 data_stall_timeout: float = DEFAULT_DATA_STALL_TIMEOUT,
+                 metrics_file: Optional[str] = None, metrics_interval: float = 15.0,
+                 http_metrics_port: Optional[int] = None, http_metrics_host: str = '127.0.0.1',
+                 admin_users=None, profile_dir: Optional[str] = None,
+                 buffer_size: int = DEFAULT_TRANSFER_BUFFER_SIZE,
+                 record_file: Optional[str] = None):
         self.host = host
         self.port = port
         # Usar el directorio especificado o crear uno por defecto
@@ -27,28 +53,46 @@ class FTPServer:
         else:
             self.base_dir = Path(base_dir)
 
-        print(f"Directorio base del servidor: {self.base_dir}")  # Debug
+        logger.info("Directorio base del servidor: %s", self.base_dir)
         # Crear el directorio si no existe
         self.base_dir.mkdir(parents=True, exist_ok=True)
-        self.current_dir = self.base_dir
-        self.current_user: Optional[str] = None
-        self.authenticated = False
+        self.buffer_size = buffer_size
         self.commands: Dict[str, Command] = {}
         self.credentials_manager = CredentialsManager()
         self._register_commands()
 
-        # Estado de la conexión de datos
-        self.data_socket: Optional[socket.socket] = None
-        self.passive_server: Optional[socket.socket] = None
-        self.passive_mode = False
-        self.data_addr: Optional[str] = None
-        self.data_port: Optional[int] = None
+        # Timeouts en segundos (0 o None los desactiva)
+        self.idle_timeout = idle_timeout
+        self.data_accept_timeout = data_accept_timeout
+        self.data_stall_timeout = data_stall_timeout
+        self.timer_wheel = TimerWheel()
+        self.metrics = ServerMetrics()
+        # Exportación opcional a un fichero de texto Prometheus
+        self.metrics_exporter: Optional[PrometheusFileExporter] = None
+        if metrics_file:
+            self.metrics_exporter = PrometheusFileExporter(self.metrics, self.timer_wheel,
+                                                           metrics_file, metrics_interval)
+        # Endpoint HTTP opcional (/metrics y /healthz) en su propio hilo
+        self.http_metrics: Optional["MetricsHTTPServer"] = None
+        if http_metrics_port is not None:
+            # http.server solo se importa si se pide el endpoint
+            from FTP.Server.http_metrics import MetricsHTTPServer as HTTPMetrics
+            self.http_metrics = HTTPMetrics(self, http_metrics_host, http_metrics_port)
+
+        # Administradores (SITE PROFILE) y perfilado bajo demanda
+        self.admin_users = set(admin_users if admin_users is not None
+                               else self.credentials_manager.admin_users())
+        self.profile_dir = profile_dir or default_profile_dir()
+        self.profiler: Optional[CommandProfiler] = None
+        self.last_profiler: Optional[CommandProfiler] = None
 
-        # Estado de la transferencia
-        self.transfer_type = 'A'  # ASCII por defecto
-        self.structure = 'F'      # File por defecto
-        self.mode = 'S'          # Stream por defecto
-        self.rename_from: Optional[Path] = None
+        # Grabación opcional de las sesiones para reproducirlas después
+        self.record_file = record_file
+        self.recorder: Optional[SessionRecorder] = None
+
+        self.server_socket: Optional[socket.socket] = None
+        self._running = False
+        self.ready = threading.Event()
 
     def _register_commands(self) -> None:
         """Registra todos los comandos disponibles"""
@@ -68,6 +112,11 @@ class FTPServer:
             "LIST": ListCommand(),
             "CDUP": CdupCommand(),
             "NLST": NlstCommand(),
+            "SIZE": SizeCommand(),
+            "MDTM": MdtmCommand(),
+            "MFMT": MfmtCommand(),
+            "HASH": HashCommand(),
+            "MLSD": MlsdCommand(),
 
             # Comandos de transferencia
             "RETR": RetrCommand(),
@@ -98,45 +147,123 @@ class FTPServer:
 
     def start(self) -> None:
         """Inicia el servidor FTP"""
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.bind((self.host, self.port))
-        server_socket.listen(5)
-        print(f"Servidor FTP iniciado en {self.host}:{self.port}")
+        if not is_configured():
+            setup_logging()
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(5)
+        # Con port=0 el sistema asigna un puerto libre
+        self.port = self.server_socket.getsockname()[1]
+        if self.record_file:
+            self.recorder = SessionRecorder(self.record_file)
+        self.timer_wheel.start()
+        if self.metrics_exporter:
+            self.metrics_exporter.start()
+        if self.http_metrics:
+            self.http_metrics.start()
+        self._running = True
+        self.ready.set()
+        logger.info("Servidor FTP iniciado en %s:%s", self.host, self.port)
 
-        while True:
+        while self._running:
             try:
-                client_socket, client_address = server_socket.accept()
-                print(f"Cliente conectado: {client_address}")
-                self.handle_client(client_socket)
+                client_socket, client_address = self.server_socket.accept()
+                logger.info("Cliente conectado: %s", client_address)
+                threading.Thread(target=self.handle_client, args=(client_socket,),
+                                 name=f"ftp-session-{client_address[1]}", daemon=True).start()
             except Exception as e:
-                print(f"Error en conexión: {e}")
+                if not self._running:
+                    break
+                logger.error("Error en conexión: %s", e)
+
+    def stop(self) -> None:
+        """Detiene el servidor y la rueda de temporizadores"""
+        self._running = False
+        if self.server_socket:
+            try:
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server_socket.close()
+            self.server_socket = None
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+            self.metrics_exporter.write()
+        if self.http_metrics:
+            self.http_metrics.stop()
+        if self.recorder:
+            self.recorder.close()
+        self.timer_wheel.stop()
+
+    def is_healthy(self) -> bool:
+        """Indica si el servidor acepta conexiones y la rueda de temporizadores avanza"""
+        return self._running and self.timer_wheel.is_running()
 
     def handle_client(self, client_socket: socket.socket) -> None:
         """Maneja la conexión con un cliente"""
+        session = FTPSession(self, client_socket)
+        recorder = self.recorder
+        record_id = recorder.open_session() if recorder is not None else 0
         try:
             client_socket.send(b"220 Bienvenido al servidor FTP\r\n")
+            session.arm_idle_timer()
+
+            # Sin Nagle: las respuestas cortas (150 seguida de 226) salen sin esperar ACK
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
-            while True:
+            # Una línea por comando: los clientes pueden encadenar varios en un envío
+            for line in session.read_commands():
                 try:
-                    data = client_socket.recv(1024).decode().strip()
+                    data = line.decode().strip()
                     if not data:
-                        break
+                        continue
+                    received = session.last_activity = time.monotonic()
 
-                    print(f"Comando recibido: {data}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        # No registrar contraseñas en claro
+                        logger.debug("Comando recibido: %s", mask_secrets(data))
                     cmd_parts = data.split()
                     cmd = cmd_parts[0].upper()
                     args = cmd_parts[1:] if len(cmd_parts) > 1 else []
 
-                    if cmd not in ("USER","PASS") and not self.authenticated:
-                        print("Cliente no autenticado")
+                    if cmd not in ("USER","PASS") and not session.authenticated:
+                        logger.info("Cliente no autenticado")
                         client_socket.send(b"530 No autenticado\r\n")
+                        continue
 
                     if cmd in self.commands:
                         command = self.commands[cmd]
-                        response = command.execute(self, client_socket, args)
-                        if response:
-                            print(f"Respuesta: {response}")
-                            client_socket.send(response.encode())
+                        session.busy = True
+                        shard = session.metrics
+                        if cmd in TRANSFER_DIRECTION:
+                            shard.begin_transfer(cmd)
+                        started = time.perf_counter_ns()
+                        data_bytes = session.data_bytes
+                        try:
+                            # Sin perfilado activo el coste es una comparación con None
+                            profiler = self.profiler
+                            if profiler is None:
+                                response = command.execute(session, client_socket, args)
+                            else:
+                                response = profiler.run(command, session, client_socket, args)
+                            if response:
+                                logger.debug("Respuesta: %s", response.rstrip())
+                                client_socket.send(response.encode())
+                        finally:
+                            # También si el comando o el envío fallan: la muestra de latencia
+                            # y el fin de la transferencia no se pierden
+                            session.busy = False
+                            session.last_activity = time.monotonic()
+                            shard.observe(cmd, time.perf_counter_ns() - started)
+                            if cmd in TRANSFER_DIRECTION:
+                                shard.data_open = 0
+
+                        if recorder is not None:
+                            recorder.command(record_id, received, data,
+                                             int(response[:3]) if response and response[:3].isdigit() else 0,
+                                             time.perf_counter_ns() - started,
+                                             session.data_bytes - data_bytes)
 
                         if cmd == "QUIT":
                             break
@@ -144,60 +271,15 @@ class FTPServer:
                         client_socket.send(b"502 Comando no implementado\r\n")
 
                 except Exception as e:
-                    print(f"Error procesando comando: {e}")
+                    logger.error("Error procesando comando: %s", e)
                     client_socket.send(b"500 Error interno del servidor\r\n")
 
         except Exception as e:
-            print(f"Error en sesión de cliente: {e}")
+            logger.error("Error en sesión de cliente: %s", e)
         finally:
-            self._cleanup_client(client_socket)
-
-    def _cleanup_client(self, client_socket: socket.socket) -> None:
-        """Limpia recursos asociados a un cliente"""
-        try:
-            client_socket.close()
-        except:
-            pass
-
-        self._cleanup_data_connection()
-        self.current_user = None
-        self.current_dir = self.base_dir
-        self.rename_from = None
-
-    def _cleanup_data_connection(self) -> None:
-        """Limpia la conexión de datos"""
-        if self.data_socket:
-            try:
-                self.data_socket.close()
-            except:
-                pass
-            self.data_socket = None
-
-        if self.passive_server:
-            try:
-                self.passive_server.close()
-            except:
-                pass
-            self.passive_server = None
-
-        self.passive_mode = False
-        self.data_addr = None
-        self.data_port = None
-
-    def create_data_connection(self) -> bool:
-        """Establece la conexión de datos según el modo actual"""
-        try:
-            if self.passive_mode and self.passive_server:
-                self.data_socket, _ = self.passive_server.accept()
-                return True
-            elif not self.passive_mode and self.data_addr and self.data_port:
-                self.data_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.data_socket.connect((self.data_addr, self.data_port))
-                return True
-            return False
-        except Exception as e:
-            print(f"Error en conexión de datos: {e}")
-            return False
+            if recorder is not None:
+                recorder.close_session(record_id)
+            session.close()
 
 if __name__ == "__main__":
     # Directorio base por defecto en la carpeta FTPRoot
@@ -0,0 +1,257 @@
+import socket
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from FTP.Common.constants import DEFAULT_BUFFER_SIZE
+from FTP.Server.timer_wheel import Timer
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.server.session")
+
+# Límite de una línea de comando sin fin de línea (RFC 959 no fija ninguno)
+MAX_COMMAND_LINE = 8192
+
+
+class FTPSession:
+    """Estado de una conexión de control con un cliente.
+
+    Los comandos reciben la sesión como primer argumento: expone la
+    configuración compartida del servidor (``base_dir``, ``commands``,
+    ``credentials_manager``...) y el estado propio de la conexión.
+    """
+
+    def __init__(self, server, client_socket: socket.socket):
+        self.server = server
+        self.client_socket = client_socket
+
+        # Configuración compartida del servidor
+        self.host = server.host
+        self.port = server.port
+        self.base_dir: Path = server.base_dir
+        self.commands = server.commands
+        self.credentials_manager = server.credentials_manager
+        self.buffer_size = server.buffer_size
+        self.metrics = server.metrics.open_shard()
+
+        # Estado de autenticación y navegación
+        self.current_dir: Path = self.base_dir
+        self.current_user: Optional[str] = None
+        self.authenticated = False
+        self.rename_from: Optional[Path] = None
+        self.restart_point: Optional[int] = None
+
+        # Estado de la conexión de datos
+        self.data_socket: Optional[socket.socket] = None
+        self.passive_server: Optional[socket.socket] = None
+        self.passive_mode = False
+        self.data_addr: Optional[str] = None
+        self.data_port: Optional[int] = None
+
+        # Estado de la transferencia
+        self.transfer_type = 'A'  # ASCII por defecto
+        self.structure = 'F'      # File por defecto
+        self.mode = 'S'          # Stream por defecto
+
+        # Estado de los timeouts
+        self.closed = False
+        self.busy = False
+        self.last_activity = time.monotonic()
+        self.data_bytes = 0
+        self.data_timed_out = False
+        self._idle_timer: Optional[Timer] = None
+        self._data_timer: Optional[Timer] = None
+        self._data_bytes_seen = 0
+        self._command_buffer = bytearray()
+
+    # ------------------------------------------------------------------ #
+    # Lectura del canal de control
+    # ------------------------------------------------------------------ #
+    def read_commands(self) -> Iterator[bytes]:
+        """Líneas de comando completas, aunque lleguen varias en un recv o una en varios"""
+        buffer = self._command_buffer
+        while True:
+            end = buffer.find(b"\n")
+            while end >= 0:
+                line = bytes(buffer[:end])
+                del buffer[:end + 1]
+                yield line
+                end = buffer.find(b"\n")
+            if len(buffer) > MAX_COMMAND_LINE:
+                # Sin fin de línea a la vista: se procesa lo recibido como un comando
+                line = bytes(buffer)
+                buffer.clear()
+                yield line
+            chunk = self.client_socket.recv(DEFAULT_BUFFER_SIZE)
+            if not chunk:
+                return
+            buffer.extend(chunk)
+
+    # ------------------------------------------------------------------ #
+    # Timeout de inactividad del canal de control
+    # ------------------------------------------------------------------ #
+    def arm_idle_timer(self) -> None:
+        """Programa la comprobación de inactividad del canal de control"""
+        timeout = self.server.idle_timeout
+        if timeout:
+            self._idle_timer = self.server.timer_wheel.schedule(timeout, self._on_idle_timer)
+
+    def _on_idle_timer(self) -> None:
+        if self.closed:
+            return
+        timeout = self.server.idle_timeout
+        # Una transferencia larga no cuenta como inactividad del control
+        if self.busy:
+            self._idle_timer = self.server.timer_wheel.schedule(timeout, self._on_idle_timer)
+            return
+        elapsed = time.monotonic() - self.last_activity
+        if elapsed < timeout:
+            self._idle_timer = self.server.timer_wheel.schedule(timeout - elapsed, self._on_idle_timer)
+            return
+
+        self.server.metrics.record_timeout("control_idle")
+        logger.info("Sesión inactiva durante %ss, cerrando conexión", timeout)
+        try:
+            self.client_socket.send(b"421 Timeout: closing control connection\r\n",
+                                    getattr(socket, "MSG_DONTWAIT", 0))
+        except OSError:
+            pass
+        # shutdown despierta al hilo de la sesión bloqueado en recv()
+        self._shutdown(self.client_socket)
+
+    # ------------------------------------------------------------------ #
+    # Conexión de datos
+    # ------------------------------------------------------------------ #
+    def create_data_connection(self) -> bool:
+        """Establece la conexión de datos según el modo actual"""
+        self.data_timed_out = False
+        timeout = self.server.data_accept_timeout
+        try:
+            if self.passive_mode and self.passive_server:
+                timer = None
+                if timeout:
+                    timer = self.server.timer_wheel.schedule(timeout, self._on_accept_timer,
+                                                             self.passive_server)
+                try:
+                    self.data_socket, _ = self.passive_server.accept()
+                finally:
+                    if timer:
+                        timer.cancel()
+            elif not self.passive_mode and self.data_addr and self.data_port:
+                self.data_socket = socket.create_connection((self.data_addr, self.data_port),
+                                                            timeout=timeout or None)
+                self.data_socket.settimeout(None)
+            else:
+                return False
+            self.metrics.data_connections += 1
+            self.metrics.data_open = 1
+            return True
+        except Exception as e:
+            if isinstance(e, socket.timeout):
+                self.server.metrics.record_timeout("data_accept")
+            logger.error("Error en conexión de datos: %s", e)
+            return False
+
+    def _on_accept_timer(self, passive_server: socket.socket) -> None:
+        if passive_server is not self.passive_server:
+            return
+        self.server.metrics.record_timeout("data_accept")
+        logger.info("Timeout esperando la conexión de datos")
+        self._shutdown(passive_server)
+
+    def add_data_bytes(self, count: int) -> None:
+        """Suma ``count`` bytes de datos de la transferencia en curso, también
+        a las métricas de la sesión (ver ``MetricsShard.begin_transfer``)"""
+        self.data_bytes += count
+        metrics = self.metrics
+        metrics.bytes[metrics.transfer_key] += count
+
+    @contextmanager
+    def data_transfer(self):
+        """Vigila el progreso de la conexión de datos durante una transferencia.
+
+        Los bucles de transferencia suman a ``data_bytes`` lo que envían o
+        reciben; si no avanza durante ``data_stall_timeout`` segundos se cierra
+        el socket de datos y ``data_timed_out`` queda activo para responder 426.
+        """
+        timeout = self.server.data_stall_timeout
+        self.data_timed_out = False
+        self._data_bytes_seen = self.data_bytes
+        if timeout:
+            self._data_timer = self.server.timer_wheel.schedule(timeout, self._on_data_timer,
+                                                                self.data_socket)
+        try:
+            yield
+        finally:
+            if self._data_timer:
+                self._data_timer.cancel()
+                self._data_timer = None
+
+    def _on_data_timer(self, data_socket: socket.socket) -> None:
+        if data_socket is not self.data_socket or self._data_timer is None:
+            return
+        if self.data_bytes != self._data_bytes_seen:
+            self._data_bytes_seen = self.data_bytes
+            self._data_timer = self.server.timer_wheel.schedule(self.server.data_stall_timeout,
+                                                                self._on_data_timer, data_socket)
+            return
+
+        self.data_timed_out = True
+        self.server.metrics.record_timeout("data_stall")
+        logger.info("Transferencia detenida, cerrando conexión de datos")
+        self._shutdown(data_socket)
+
+    # ------------------------------------------------------------------ #
+    # Limpieza
+    # ------------------------------------------------------------------ #
+    def close(self) -> None:
+        """Libera todos los recursos asociados a la sesión"""
+        if self.closed:
+            return
+        self.closed = True
+        self.server.metrics.close_shard(self.metrics)
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        try:
+            self.client_socket.close()
+        except:
+            pass
+
+        self.cleanup_data_connection()
+        self.current_user = None
+        self.authenticated = False
+        self.current_dir = self.base_dir
+        self.rename_from = None
+
+    def cleanup_data_connection(self) -> None:
+        """Limpia la conexión de datos"""
+        if self._data_timer:
+            self._data_timer.cancel()
+            self._data_timer = None
+
+        if self.data_socket:
+            try:
+                self.data_socket.close()
+            except:
+                pass
+            self.data_socket = None
+
+        if self.passive_server:
+            try:
+                self.passive_server.close()
+            except:
+                pass
+            self.passive_server = None
+
+        self.passive_mode = False
+        self.data_addr = None
+        self.data_port = None
+
+    @staticmethod
+    def _shutdown(sock: socket.socket) -> None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
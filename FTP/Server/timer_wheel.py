@@ -0,0 +1,103 @@
+import math
+import threading
+import time
+from typing import Callable, List, Optional, Set
+
+from FTP.Common.logger import get_logger
+
+logger = get_logger("ftp.server")
+
+
+class Timer:
+    """Temporizador registrado en una rueda. Se cancela en O(1)."""
+
+    __slots__ = ("wheel", "expiry_tick", "slot", "callback", "args", "cancelled")
+
+    def __init__(self, wheel: "TimerWheel", expiry_tick: int, callback: Callable, args: tuple):
+        self.wheel = wheel
+        self.expiry_tick = expiry_tick
+        self.slot = expiry_tick % wheel.wheel_size
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Cancela el temporizador si todavía no ha expirado"""
+        self.wheel.cancel(self)
+
+
+class TimerWheel:
+    """Rueda de temporizadores con hash (Varghese & Lauck).
+
+    Un único hilo avanza la rueda cada ``tick_interval`` segundos y ejecuta
+    los temporizadores vencidos. Programar y cancelar cuestan O(1), por lo que
+    el coste por sesión no depende del número de sesiones abiertas. Los
+    callbacks se ejecutan en el hilo de la rueda y deben ser rápidos.
+    """
+
+    def __init__(self, tick_interval: float = 0.5, wheel_size: int = 512):
+        self.tick_interval = tick_interval
+        self.wheel_size = wheel_size
+        self._slots: List[Set[Timer]] = [set() for _ in range(wheel_size)]
+        self._lock = threading.Lock()
+        self._current_tick = 0
+        self._started_at = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay: float, callback: Callable, *args) -> Timer:
+        """Programa ``callback(*args)`` para dentro de ``delay`` segundos"""
+        ticks = max(1, math.ceil(delay / self.tick_interval))
+        with self._lock:
+            timer = Timer(self, self._current_tick + ticks, callback, args)
+            self._slots[timer.slot].add(timer)
+        return timer
+
+    def cancel(self, timer: Timer) -> None:
+        """Elimina un temporizador de su ranura"""
+        with self._lock:
+            timer.cancelled = True
+            self._slots[timer.slot].discard(timer)
+
+    def start(self) -> None:
+        """Arranca el hilo que hace avanzar la rueda"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._started_at = time.monotonic() - self._current_tick * self.tick_interval
+        self._thread = threading.Thread(target=self._run, name="ftp-timer-wheel", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo de la rueda"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.tick_interval * 4)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        """Indica si el hilo de la rueda está vivo"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.tick_interval):
+            # Recuperar los ticks perdidos si el hilo se retrasó
+            target_tick = int((time.monotonic() - self._started_at) / self.tick_interval)
+            while self._current_tick < target_tick:
+                self._advance()
+
+    def _advance(self) -> None:
+        """Avanza un tick y ejecuta los temporizadores vencidos de la ranura"""
+        with self._lock:
+            self._current_tick += 1
+            slot = self._slots[self._current_tick % self.wheel_size]
+            expired = [timer for timer in slot if timer.expiry_tick <= self._current_tick]
+            for timer in expired:
+                slot.discard(timer)
+                timer.cancelled = True
+
+        for timer in expired:
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                logger.exception("Error en temporizador: %s", e)
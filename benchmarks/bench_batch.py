@@ -0,0 +1,62 @@
+"""Archivos por segundo de mget/mput según el número de sesiones paralelas.
+
+Muchos archivos pequeños por una sola conexión de control quedan limitados
+por la latencia de cada RETR/STOR; repartirlos entre varias sesiones del
+pool debería escalar casi linealmente hasta saturar el servidor.
+
+    python -m benchmarks.bench_batch --batch-files 200 --batch-workers 1 4 8
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import format_size, login, parse_size, populate, quiet_logging, result, running_server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--batch-files", type=int, default=100, help="archivos por lote")
+    parser.add_argument("--batch-size", type=parse_size, default=parse_size("16K"))
+    parser.add_argument("--batch-workers", nargs="+", type=int, default=[1, 4, 8])
+
+
+def run(args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base, \
+            tempfile.TemporaryDirectory(prefix="ftp-bench-local-") as local:
+        populate(Path(base) / "files", args.batch_files, args.batch_size)
+        size = format_size(args.batch_size)
+        with running_server(base) as server:
+            client = login(server)
+            try:
+                for workers in args.batch_workers:
+                    target = Path(local) / f"mget-{workers}"
+                    batch = client.mget(["files/*"], str(target), workers=workers)
+                    if batch.failed:
+                        raise RuntimeError(batch.summary())
+                    results.append(result("batch_files_per_sec", len(batch.jobs) / batch.elapsed, "files/s",
+                                          op="mget", workers=workers, size=size))
+
+                    client.make_dir(f"up-{workers}")
+                    batch = client.mput(sorted(map(str, target.iterdir())), f"up-{workers}", workers=workers)
+                    if batch.failed:
+                        raise RuntimeError(batch.summary())
+                    results.append(result("batch_files_per_sec", len(batch.jobs) / batch.elapsed, "files/s",
+                                          op="mput", workers=workers, size=size))
+            finally:
+                client.close()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Throughput de LIST según la configuración de logging del servidor.
+
+Compara el logging síncrono con un registro por entrada (equivalente a los
+``print`` anteriores) contra el logging asíncrono por cola. La salida se
+escribe en un sumidero lento que simula una terminal o un pipe saturado.
+
+    python -m benchmarks.bench_list_logging --log-entries 2000 --log-repeat 30
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+from FTP.Common.logger import setup_logging, shutdown_logging
+from benchmarks.common import login, measure, populate, result, running_server
+
+
+class SlowStream:
+    """Flujo de texto que tarda ``delay`` segundos en cada escritura."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+MODES = ("sync-debug", "queue-debug", "queue")
+
+
+def configure(mode: str, sink) -> None:
+    if mode == "sync-debug":
+        # Un write síncrono por registro, como hacían los print()
+        setup_logging(level="DEBUG", stream=sink, asynchronous=False)
+    elif mode == "queue-debug":
+        setup_logging(level="DEBUG", stream=sink)
+    else:
+        setup_logging(level="INFO", stream=sink)
+
+
+def measure_mode(mode: str, entries: int, repeat: int, delay: float) -> float:
+    """Listados por segundo con el logging del servidor en el modo ``mode``"""
+    configure(mode, SlowStream(delay))
+    try:
+        with tempfile.TemporaryDirectory() as base_dir:
+            populate(base_dir, entries)
+            with running_server(base_dir) as server:
+                client = login(server)
+                client.list_directory()  # calentamiento
+                samples = measure(client.list_directory, repeat)
+                client.quit()
+    finally:
+        shutdown_logging()
+    return repeat / sum(samples)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--log-entries", type=int, default=2000)
+    parser.add_argument("--log-repeat", type=int, default=20)
+    parser.add_argument("--log-sink-delay", type=float, default=50e-6,
+                        help="segundos por escritura en el sumidero de logs")
+    parser.add_argument("--log-modes", nargs="+", choices=MODES, default=list(MODES))
+
+
+def run(args) -> list:
+    return [result("list_logging_rate",
+                   measure_mode(mode, args.log_entries, args.log_repeat, args.log_sink_delay), "lists/s",
+                   mode=mode, entries=args.log_entries)
+            for mode in args.log_modes]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    json.dump(run(args), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
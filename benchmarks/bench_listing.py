@@ -0,0 +1,53 @@
+"""Latencia de LIST y NLST según el tamaño del directorio.
+
+Crea un subdirectorio por tamaño y mide la mediana y el p95 de cada listado
+completo (PASV, comando, datos y respuesta final) en milisegundos.
+
+    python -m benchmarks.bench_listing --entries 10 1000 10000
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import login, measure, percentile, populate, quiet_logging, result, running_server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--entries", nargs="+", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--list-repeat", type=int, default=20)
+
+
+def run(args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base:
+        for entries in args.entries:
+            populate(Path(base) / f"dir{entries}", entries)
+        with running_server(base) as server:
+            client = login(server)
+            for entries in args.entries:
+                path = f"dir{entries}"
+                for verb, fn in (("list", client.list_directory), ("nlst", client.list_files)):
+                    fn(path)  # calentamiento de la caché de disco
+                    samples = measure(lambda: fn(path), args.list_repeat)
+                    results.append(result(f"{verb}_latency", statistics.median(samples) * 1000, "ms",
+                                          higher_is_better=False, entries=entries, stat="p50"))
+                    results.append(result(f"{verb}_latency", percentile(samples, 0.95) * 1000, "ms",
+                                          higher_is_better=False, entries=entries, stat="p95"))
+            client.quit()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Ritmo de inicios de sesión (conexión, USER, PASS y QUIT).
+
+Con un cliente mide la latencia de una sesión completa; con varios en
+paralelo, el ritmo agregado que soporta el servidor. La verificación de la
+contraseña (bcrypt) domina el coste.
+
+    python -m benchmarks.bench_login --logins 50 --login-clients 1 4
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from benchmarks.common import login, quiet_logging, result, running_server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--logins", type=int, default=20, help="sesiones por cliente")
+    parser.add_argument("--login-clients", nargs="+", type=int, default=[1, 4])
+
+
+def run(args) -> list:
+    results = []
+    with running_server() as server:
+        login(server).quit()  # calentamiento
+        for clients in args.login_clients:
+            errors = []
+
+            def worker():
+                try:
+                    for _ in range(args.logins):
+                        login(server).quit()
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker) for _ in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            if errors:
+                raise errors[0]
+            results.append(result("login_rate", clients * args.logins / elapsed, "logins/s",
+                                   clients=clients))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
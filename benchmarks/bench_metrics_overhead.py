@@ -0,0 +1,82 @@
+"""Coste de la instrumentación de métricas frente a LIST y RETR.
+
+Mide el coste por comando de la instrumentación del dispatch (dos lecturas
+del reloj, ``begin_transfer`` y ``observe``) más la cuenta de bytes de cada
+bloque transferido (``FTPSession.add_data_bytes``), y lo compara con la
+duración de LIST/RETR en loopback. El objetivo es un sobrecoste inferior al 1%.
+
+    python -m benchmarks.bench_metrics_overhead --overhead-repeat 100
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from FTP.Common.constants import DEFAULT_TRANSFER_BUFFER_SIZE
+from FTP.Server.metrics import MetricsShard
+from benchmarks.common import login, measure, populate, quiet_logging, result, running_server
+
+
+def instrumentation_ns(iterations: int, blocks: int = 1) -> float:
+    """Coste medio por comando de la instrumentación con ``blocks`` bloques de datos, en nanosegundos"""
+    shard = MetricsShard()
+    clock = time.perf_counter_ns
+    start = clock()
+    for _ in range(iterations):
+        shard.begin_transfer("RETR")
+        started = clock()
+        for _ in range(blocks):
+            # Lo que hace FTPSession.add_data_bytes con las métricas
+            shard.bytes[shard.transfer_key] += DEFAULT_TRANSFER_BUFFER_SIZE
+        shard.observe("RETR", clock() - started)
+        shard.data_open = 0
+    return (clock() - start) / iterations
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--overhead-entries", type=int, default=200, help="entradas del directorio de LIST")
+    parser.add_argument("--overhead-file-size", type=int, default=64 * 1024, help="bytes del fichero de RETR")
+    parser.add_argument("--overhead-repeat", type=int, default=50)
+
+
+def run(args) -> list:
+    blocks = max(1, -(-args.overhead_file_size // DEFAULT_TRANSFER_BUFFER_SIZE))
+    cost_ns = {"LIST": instrumentation_ns(200_000), "RETR": instrumentation_ns(200_000, blocks)}
+    with tempfile.TemporaryDirectory() as base_dir:
+        populate(base_dir, args.overhead_entries)
+        with open(os.path.join(base_dir, "payload.bin"), "wb") as f:
+            f.write(os.urandom(args.overhead_file_size))
+        with running_server(base_dir) as server:
+            client = login(server)
+            client.execute("TYPE", "I")
+            local_path = os.path.join(base_dir, "download.bin")
+            command_s = {
+                "LIST": statistics.median(measure(client.list_directory, args.overhead_repeat)),
+                "RETR": statistics.median(measure(lambda: client.download_file("payload.bin", local_path),
+                                                  args.overhead_repeat)),
+            }
+            client.quit()
+
+    results = []
+    for command, seconds in command_s.items():
+        results.append(result("metrics_instrumentation", cost_ns[command], "ns", higher_is_better=False,
+                              command=command))
+        results.append(result("metrics_overhead", cost_ns[command] / (seconds * 1e9) * 100, "%",
+                              higher_is_better=False, command=command))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Microbenchmarks de los parsers de respuestas y listados del cliente.
+
+Al estilo de pytest-benchmark: cada caso se calibra para que una ronda dure
+``--min-time`` segundos, se repite ``--rounds`` veces y se informa el mínimo,
+la media y la desviación por llamada. Además compara la memoria pico
+(``tracemalloc``) de procesar un listado enorme con los parsers que lo
+materializan frente a los parsers en streaming.
+
+    python -m benchmarks.bench_parsers
+    python -m benchmarks.bench_parsers --listing-lines 500000 --only memory
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from FTP.Client.client import FTPClient
+from FTP.Common.utils import (iter_lines, iter_list_response, iter_mlsd_response,
+                              parse_features_response, parse_list_response, parse_mlsd_response)
+from benchmarks.common import result
+
+CHUNK = 4096
+FEAT_REPLY = "211-Features:\n PASV\n SIZE\n UTF8\n REST STREAM\n MLSD\n MDTM\n211 End"
+STAT_REPLY = "211-Server status:\r\n" + "    Transfer type: I\r\n" * 8 + "211 End of status"
+
+
+def list_text(lines: int) -> str:
+    return "".join(f"{f'file-{i:07d}.dat':<50} {i * 37:>10}\r\n" for i in range(lines))
+
+
+def mlsd_text(lines: int) -> str:
+    return "".join(f"type=file;size={i * 37};modify=20240101120000;perm=r; file-{i:07d}.dat\r\n"
+                   for i in range(lines))
+
+
+def chunks(blob: bytes):
+    """Simula la llegada del listado por el socket de datos en bloques"""
+    for start in range(0, len(blob), CHUNK):
+        yield blob[start:start + CHUNK]
+
+
+def bench(fn, rounds: int, min_time: float) -> dict:
+    """Duración por llamada en segundos: mínimo, media y desviación"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time / 10 or loops >= 1 << 24:
+            break
+        loops *= 10
+    loops = max(1, int(loops * min_time / max(time.perf_counter() - start, 1e-9) / 10))
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {"min": min(samples), "mean": statistics.mean(samples),
+            "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0}
+
+
+def micro_cases(lines: int) -> dict:
+    client = FTPClient("127.0.0.1")
+    listing, mlsd = list_text(lines), mlsd_text(lines)
+    return {
+        "parse_code": lambda: client._parse_code("226 Transfer complete"),
+        "parse_code_multiline": lambda: client._parse_code(STAT_REPLY),
+        "parse_pasv": lambda: client._parse_pasv_response("227 Entering Passive Mode (127,0,0,1,195,80)"),
+        "parse_features": lambda: parse_features_response(FEAT_REPLY),
+        f"parse_list_response_{lines}": lambda: parse_list_response(listing),
+        f"iter_list_response_{lines}": lambda: sum(entry.size for entry in iter_list_response(listing)),
+        f"parse_mlsd_response_{lines}": lambda: parse_mlsd_response(mlsd),
+        f"iter_mlsd_response_{lines}": lambda: sum(entry.size for entry in iter_mlsd_response(mlsd)),
+    }
+
+
+def materialized(blob: bytes) -> int:
+    # Lo que hacía list_directory: juntar todo el texto y parsear a una lista de dicts
+    data = [chunk.decode(errors="ignore") for chunk in chunks(blob)]
+    entries = parse_list_response("".join(data))
+    return sum(int(entry["tamaño"]) for entry in entries)
+
+
+def streamed(blob: bytes) -> int:
+    return sum(entry.size for entry in iter_list_response(iter_lines(chunks(blob))))
+
+
+def peak_memory(fn, blob: bytes) -> tuple:
+    """Memoria pico en bytes y duración de ``fn(blob)``"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(blob)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="segundos por ronda")
+    parser.add_argument("--parser-lines", type=int, default=1000)
+    parser.add_argument("--listing-lines", type=int, default=500_000)
+
+
+def run(args) -> list:
+    results = []
+    if getattr(args, "only_parsers", None) in (None, "micro"):
+        for name, fn in micro_cases(args.parser_lines).items():
+            stats = bench(fn, args.rounds, args.min_time)
+            print(f"{name:<32} min {stats['min'] * 1e6:12.3f} us  mean {stats['mean'] * 1e6:12.3f} us"
+                  f"  stddev {stats['stddev'] * 1e6:10.3f} us", file=sys.stderr)
+            results.append(result("parser_time", stats["min"] * 1e6, "us", higher_is_better=False,
+                                  case=name))
+    if getattr(args, "only_parsers", None) in (None, "memory"):
+        blob = list_text(args.listing_lines).encode()
+        if streamed(blob) != materialized(blob):
+            raise AssertionError("Los parsers en streaming y materializado no coinciden")
+        for name, fn in (("materialized", materialized), ("streamed", streamed)):
+            peak, elapsed = peak_memory(fn, blob)
+            print(f"listado de {args.listing_lines} líneas, {name:<12} pico {peak / 1024 ** 2:9.3f} MiB"
+                  f"  {elapsed:7.2f} s", file=sys.stderr)
+            results.append(result("listing_peak_memory", peak / 1024 ** 2, "MiB", higher_is_better=False,
+                                  lines=args.listing_lines, parser=name))
+            results.append(result("listing_parse_rate", args.listing_lines / elapsed, "lines/s",
+                                  lines=args.listing_lines, parser=name))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--only", dest="only_parsers", choices=["micro", "memory"])
+    args = parser.parse_args(argv)
+    json.dump(run(args), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Latencia de comandos de control en serie y encadenados bajo RTT simulado.
+
+Con un enlace lento cada comando enviado en serie cuesta al menos un RTT;
+encadenados (``FTPClient.pipeline``) la serie entera cuesta uno. La mezcla
+incluye respuestas multilínea (FEAT, HELP, STAT) para comprobar que el
+lector de respuestas las separa bien cuando llegan juntas. También se mide
+la latencia de un RETR pequeño (PASV + RETR + 150 + 226) y su tiempo hasta el
+primer byte según ``FTPClient.last_transfer_stats``.
+
+    python -m benchmarks.bench_pipeline --pipeline-rtt-ms 20 100 --pipeline-commands 32
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from FTP.Client.client import FTPClient
+from benchmarks.common import PASSWORD, USER, quiet_logging, result, running_server
+from benchmarks.latency_proxy import LatencyProxy
+
+# Códigos esperados de la mezcla de comandos, en el mismo orden
+COMMANDS = (("NOOP", 200), ("PWD", 257), ("TYPE I", 200), ("SYST", 215),
+            ("FEAT", 211), ("HELP", 214), ("STAT", 211))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--pipeline-rtt-ms", nargs="+", type=float, default=[20.0, 100.0])
+    parser.add_argument("--pipeline-commands", type=int, default=28, help="comandos por serie")
+    parser.add_argument("--pipeline-rounds", type=int, default=3)
+
+
+def _check(client: FTPClient, commands, responses) -> None:
+    """Cada respuesta debe corresponder a su comando: si no, el lector se desincronizó"""
+    for (command, code), response in zip(commands, responses):
+        if client._parse_code(response) != code:
+            raise RuntimeError(f"{command}: respuesta inesperada {response!r}")
+
+
+def run(args) -> list:
+    results = []
+    commands = [COMMANDS[i % len(COMMANDS)] for i in range(args.pipeline_commands)]
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base, \
+            tempfile.TemporaryDirectory(prefix="ftp-bench-local-") as local:
+        (Path(base) / "small.dat").write_bytes(os.urandom(1024))
+        target = str(Path(local) / "small.dat")
+        with running_server(base) as server:
+            for rtt in args.pipeline_rtt_ms:
+                with LatencyProxy("127.0.0.1", server.port, rtt=rtt / 1000) as proxy:
+                    client = FTPClient("127.0.0.1", proxy.port)
+                    client.connect()
+                    client.login(USER, PASSWORD)
+                    try:
+                        timings = {"sequential": [], "pipelined": [], "small_retr": [], "ttfb": []}
+                        for _ in range(args.pipeline_rounds):
+                            start = time.perf_counter()
+                            responses = [client.send_command(command) for command, _ in commands]
+                            timings["sequential"].append(time.perf_counter() - start)
+                            _check(client, commands, responses)
+
+                            start = time.perf_counter()
+                            responses = client.pipeline(*(command for command, _ in commands))
+                            timings["pipelined"].append(time.perf_counter() - start)
+                            _check(client, commands, responses)
+
+                            start = time.perf_counter()
+                            client.download_file("small.dat", target)
+                            timings["small_retr"].append(time.perf_counter() - start)
+                            timings["ttfb"].append(client.last_transfer_stats.first_byte)
+
+                        for mode in ("sequential", "pipelined"):
+                            per_command = min(timings[mode]) / len(commands) * 1000
+                            print(f"rtt {rtt:g} ms, {mode}: {per_command:.2f} ms/comando", file=sys.stderr)
+                            results.append(result("pipeline_command_latency", per_command, "ms",
+                                                  higher_is_better=False, rtt_ms=rtt, mode=mode,
+                                                  commands=len(commands)))
+                        retr = min(timings["small_retr"]) * 1000
+                        print(f"rtt {rtt:g} ms, RETR 1K: {retr:.1f} ms", file=sys.stderr)
+                        results.append(result("pipeline_small_retr_latency", retr, "ms", higher_is_better=False,
+                                              rtt_ms=rtt))
+                        results.append(result("pipeline_small_retr_ttfb", min(timings["ttfb"]) * 1000, "ms",
+                                              higher_is_better=False, rtt_ms=rtt))
+                    finally:
+                        client.close()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
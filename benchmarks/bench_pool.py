@@ -0,0 +1,99 @@
+"""Operaciones por segundo con sesiones del pool frente a conexiones nuevas.
+
+Cada operación (PWD, un RETR pequeño o un CWD que obliga a restaurar el
+directorio) se ejecuta abriendo una conexión nueva con USER/PASS o tomando
+una sesión de ``FTPConnectionPool``, con uno o varios hilos.
+
+    python -m benchmarks.bench_pool --pool-ops 200 --pool-threads 1 4
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from FTP.Client.pool import FTPConnectionPool
+from benchmarks.common import PASSWORD, USER, login, populate, quiet_logging, result, running_server
+
+
+def operations(local_dir: Path) -> dict:
+    target = str(local_dir / "download.dat")
+    return {
+        "pwd": lambda client: client.get_current_dir(),
+        "retr_4k": lambda client: client.download_file("files/f0000000.dat", target),
+        "cwd": lambda client: client.change_dir("files"),
+    }
+
+
+def run_threads(threads: int, total: int, fn) -> float:
+    """Ejecuta ``fn`` ``total`` veces repartidas en ``threads`` hilos; devuelve ops/s"""
+    per_thread = total // threads
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(per_thread):
+                fn()
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return per_thread * threads / elapsed
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--pool-ops", type=int, default=200, help="operaciones con pool por caso")
+    parser.add_argument("--fresh-ops", type=int, default=20, help="operaciones sin pool por caso")
+    parser.add_argument("--pool-threads", nargs="+", type=int, default=[1, 4])
+
+
+def run(args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base, \
+            tempfile.TemporaryDirectory(prefix="ftp-bench-local-") as local:
+        populate(Path(base) / "files", 1, 4096)
+        with running_server(base) as server:
+            for name, op in operations(Path(local)).items():
+                for threads in args.pool_threads:
+                    def fresh():
+                        client = login(server)
+                        client.execute("TYPE", "I")
+                        op(client)
+                        client.quit()
+
+                    rate = run_threads(threads, max(threads, args.fresh_ops), fresh)
+                    results.append(result("pool_ops", rate, "ops/s", op=name, threads=threads, mode="fresh"))
+
+                    with FTPConnectionPool("127.0.0.1", server.port, USER, PASSWORD, size=threads) as pool:
+                        pool.warm()
+
+                        def pooled():
+                            with pool.connection() as client:
+                                op(client)
+
+                        rate = run_threads(threads, max(threads, args.pool_ops), pooled)
+                    results.append(result("pool_ops", rate, "ops/s", op=name, threads=threads, mode="pooled"))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
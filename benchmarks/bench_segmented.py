@@ -0,0 +1,76 @@
+"""Descarga segmentada (REST + RETR en paralelo) bajo latencia simulada.
+
+El cliente se conecta a través de ``LatencyProxy``: con RTT alto y ventana
+fija un único flujo no llena el enlace y repartir el archivo en varios
+rangos multiplica el throughput hasta el límite de CPU o de disco. Las
+sesiones extra se abren antes de medir: el pool del cliente se reutiliza
+entre descargas y el coste de los logins no entra en la medida.
+
+    python -m benchmarks.bench_segmented --segmented-size 64M --rtt-ms 20 50 --segments 1 2 4 8
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from FTP.Client.client import FTPClient
+from benchmarks.bench_transfer import make_file
+from benchmarks.common import PASSWORD, USER, format_size, parse_size, quiet_logging, result, running_server
+from benchmarks.latency_proxy import LatencyProxy
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--segmented-size", default="32M")
+    parser.add_argument("--rtt-ms", nargs="+", type=float, default=[50.0])
+    parser.add_argument("--segments", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--window", default="256K", help="bytes en vuelo por conexión en el proxy")
+
+
+def run(args) -> list:
+    results = []
+    size = parse_size(args.segmented_size)
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base, \
+            tempfile.TemporaryDirectory(prefix="ftp-bench-local-") as local:
+        make_file(Path(base) / "segmented.dat", size)
+        target = Path(local) / "segmented.dat"
+        with running_server(base) as server:
+            for rtt in args.rtt_ms:
+                with LatencyProxy("127.0.0.1", server.port, rtt=rtt / 1000,
+                                  window=parse_size(args.window)) as proxy:
+                    client = FTPClient("127.0.0.1", proxy.port)
+                    client.connect()
+                    client.login(USER, PASSWORD)
+                    client.set_type("I")
+                    try:
+                        # Sesiones abiertas de antemano: se mide la transferencia, no los logins
+                        client.parallel_pool(max(args.segments)).warm()
+                        for segments in args.segments:
+                            start = time.perf_counter()
+                            client.download_file("segmented.dat", str(target), segments=segments)
+                            elapsed = time.perf_counter() - start
+                            if target.stat().st_size != size:
+                                raise RuntimeError(f"Tamaño descargado {target.stat().st_size} != {size}")
+                            target.unlink()
+                            print(f"rtt {rtt:g} ms, {segments} segmentos: {size / elapsed / 1024 ** 2:.2f} MB/s",
+                                  file=sys.stderr)
+                            results.append(result("segmented_throughput", size / elapsed / 1024 ** 2, "MB/s",
+                                                  size=format_size(size), rtt_ms=rtt, segments=segments,
+                                                  window=args.window))
+                    finally:
+                        client.close()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
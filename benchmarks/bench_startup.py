@@ -0,0 +1,134 @@
+"""Tiempo de arranque de los puntos de entrada del cliente, la CLI y el servidor.
+
+Cada punto de entrada se importa en un intérprete nuevo con ``-X importtime``
+y se toma el mejor tiempo acumulado de ``--startup-repeat`` ejecuciones; se
+mide también el proceso completo (``python -c "import ..."``) descontando el
+intérprete vacío. Con ``--startup-check`` el programa sale con código 1 si
+algún módulo supera su presupuesto (``STARTUP_BUDGET_MS``, escalado con
+``--startup-budget-scale`` para máquinas más lentas) o si al importarlo se
+carga alguna dependencia que debe cargarse al usarse (``DEFERRED``).
+
+    python -m benchmarks.bench_startup --startup-repeat 10 --startup-check
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import result
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Presupuesto de importación (ms, acumulado según -X importtime): ~1.6 veces
+# lo medido al introducir la carga diferida (36, 65 y 54 ms)
+STARTUP_BUDGET_MS = {
+    "FTP.Client.client": 60.0,
+    "FTP.Client.cli.FTPCLI": 110.0,
+    "FTP.Server.server": 90.0,
+}
+
+# Módulos que no deben cargarse solo por importar el punto de entrada
+DEFERRED = {
+    "FTP.Client.client": ("argparse", "logging.handlers", "calendar", "random", "FTP.Client.batch",
+                          "FTP.Client.script"),
+    "FTP.Client.cli.FTPCLI": ("rich.progress", "rich.table", "rich.panel", "FTP.Client.jobs",
+                              "FTP.Client.script"),
+    "FTP.Server.server": ("cryptography", "passlib", "http.server", "pstats"),
+}
+
+# Sin PYTHONPATH ni site de usuario: el árbol se importa desde ROOT (directorio actual)
+PYTHON = [sys.executable, "-E", "-s"]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--startup-repeat", type=int, default=5, help="intérpretes nuevos por punto de entrada")
+    parser.add_argument("--startup-budget-scale", type=float, default=1.0,
+                        help="multiplicador de los presupuestos de STARTUP_BUDGET_MS")
+
+
+def import_time(module: str) -> float:
+    """Milisegundos acumulados de importar ``module`` según ``-X importtime``"""
+    stderr = subprocess.run(PYTHON + ["-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    for line in stderr.splitlines():
+        # "import time:  self [us] | cumulative | nombre" (el nivel superior sin sangría)
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"{module} no aparece en la salida de -X importtime")
+
+
+def process_time(code: str) -> float:
+    """Milisegundos de reloj de un intérprete que ejecuta ``code``"""
+    start = time.perf_counter()
+    subprocess.run(PYTHON + ["-c", code], cwd=ROOT, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def loaded_modules(module: str) -> set:
+    """Módulos cargados tras importar ``module``, sin los que ya carga el intérprete vacío"""
+    def listing(code: str) -> set:
+        return set(subprocess.run(PYTHON + ["-c", code + "; print('\\n'.join(sys.modules))"], cwd=ROOT,
+                                  capture_output=True, text=True, check=True).stdout.split())
+
+    return listing(f"import sys, {module}") - listing("import sys")
+
+
+def deferred_loaded(module: str) -> list:
+    loaded = loaded_modules(module)
+    return sorted(name for name in DEFERRED.get(module, ())
+                  if name in loaded or any(other.startswith(name + ".") for other in loaded))
+
+
+def run(args) -> list:
+    results = []
+    repeat = max(1, args.startup_repeat)
+    bare = min(process_time("pass") for _ in range(repeat))
+    for module, budget in STARTUP_BUDGET_MS.items():
+        imported = min(import_time(module) for _ in range(repeat))
+        process = min(process_time(f"import {module}") for _ in range(repeat)) - bare
+        budget *= args.startup_budget_scale
+        status = "dentro del presupuesto" if imported <= budget else "FUERA DEL PRESUPUESTO"
+        print(f"{module}: importación {imported:.1f} ms (presupuesto {budget:.0f} ms, {status}), "
+              f"proceso +{process:.1f} ms sobre el intérprete vacío", file=sys.stderr)
+        results.append(result("startup_import_ms", imported, "ms", higher_is_better=False, module=module))
+        results.append(result("startup_process_ms", process, "ms", higher_is_better=False, module=module))
+    return results
+
+
+def check(args, results: list) -> list:
+    """Incumplimientos: presupuestos superados y dependencias cargadas antes de tiempo"""
+    failures = []
+    for entry in results:
+        module = entry["params"]["module"]
+        budget = STARTUP_BUDGET_MS[module] * args.startup_budget_scale
+        if entry["name"] == "startup_import_ms" and entry["value"] > budget:
+            failures.append(f"{module}: {entry['value']:.1f} ms > {budget:.0f} ms")
+    for module in STARTUP_BUDGET_MS:
+        early = deferred_loaded(module)
+        if early:
+            failures.append(f"{module} carga al importarse: {', '.join(early)}")
+    return failures
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--startup-check", action="store_true",
+                        help="salir con código 1 si se supera un presupuesto o se carga algo diferido")
+    args = parser.parse_args(argv)
+    results = run(args)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    if args.startup_check:
+        failures = check(args, results)
+        for failure in failures:
+            print(f"REGRESIÓN: {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
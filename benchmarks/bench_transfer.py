@@ -0,0 +1,184 @@
+"""Throughput de RETR/STOR/APPE en loopback.
+
+Recorre tamaños de fichero (de 1 KB a 4 GB, los grandes como ficheros
+dispersos), TYPE A frente a I, tamaños de bloque de cliente y servidor y
+niveles de concurrencia. Cada medida se repite y se informa la mediana en
+MB/s.
+
+    python -m benchmarks.bench_transfer --sizes 1K 1M 64M --repeat 5
+    python -m benchmarks.bench_transfer --sizes 4G --max-upload 256M
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import format_size, login, parse_size, quiet_logging, result, running_server
+
+DEFAULT_SIZES = ["1K", "64K", "1M", "16M"]
+# A partir de este tamaño los ficheros de origen se crean dispersos
+SPARSE_THRESHOLD = 256 * 1024 ** 2
+# Como mucho se transfieren ~256 MB por tamaño para acotar la duración
+BYTES_PER_SIZE = 256 * 1024 ** 2
+LINE = b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!?\n"
+
+
+def make_file(path: Path, size: int) -> Path:
+    """Crea un fichero de ``size`` bytes de texto (disperso si es grande)"""
+    with open(path, "wb") as f:
+        if size >= SPARSE_THRESHOLD:
+            f.truncate(size)
+        else:
+            block = LINE * (1 + min(size, 1024 ** 2) // len(LINE))
+            remaining = size
+            while remaining:
+                chunk = block[:remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+    return path
+
+
+def repetitions(size: int, repeat: int) -> int:
+    return max(1, min(repeat, BYTES_PER_SIZE // max(size, 1)))
+
+
+def mbps(size: int, samples: list) -> float:
+    return size / statistics.median(samples) / 1024 ** 2
+
+
+def timed_transfers(client, verb: str, size: int, remote: str, local_dir: Path, repeat: int) -> list:
+    """Ejecuta ``repeat`` transferencias y devuelve sus duraciones"""
+    samples = []
+    source = local_dir / f"upload-{size}.dat"
+    if verb != "RETR" and not source.exists():
+        make_file(source, size)
+    for i in range(repetitions(size, repeat)):
+        target = f"{verb.lower()}-{size}-{i}.dat"
+        start = time.perf_counter()
+        if verb == "RETR":
+            client.download_file(remote, str(local_dir / "download.dat"))
+        elif verb == "STOR":
+            client.upload_file(str(source), target)
+        else:
+            client.append_file(str(source), target)
+        samples.append(time.perf_counter() - start)
+        if verb != "RETR":
+            client.delete_file(target)
+    return samples
+
+
+def bench_sizes(server, base_dir: Path, local_dir: Path, sizes: list, types: list,
+                repeat: int, max_upload: int) -> list:
+    results = []
+    client = login(server)
+    for size in sizes:
+        remote = make_file(base_dir / f"payload-{size}.dat", size).name
+        for type_code in types:
+            client.execute("TYPE", type_code)
+            for verb in ("RETR", "STOR", "APPE"):
+                if verb != "RETR" and size > max_upload:
+                    continue
+                samples = timed_transfers(client, verb, size, remote, local_dir, repeat)
+                results.append(result(verb.lower(), mbps(size, samples), "MB/s",
+                                      size=format_size(size), type=type_code))
+        (base_dir / remote).unlink()
+    client.quit()
+    return results
+
+
+def bench_buffers(base_dir: Path, local_dir: Path, buffers: list, size: int, repeat: int) -> list:
+    results = []
+    remote = make_file(base_dir / "payload-buffers.dat", size).name
+    for buffer_size in buffers:
+        # El mismo tamaño de bloque en el servidor y en el cliente
+        with running_server(base_dir, buffer_size=buffer_size) as server:
+            client = login(server, buffer_size=buffer_size)
+            client.execute("TYPE", "I")
+            for verb in ("RETR", "STOR"):
+                samples = timed_transfers(client, verb, size, remote, local_dir, repeat)
+                results.append(result(f"{verb.lower()}_buffer", mbps(size, samples), "MB/s",
+                                      size=format_size(size), buffer=buffer_size))
+            client.quit()
+    (base_dir / remote).unlink()
+    return results
+
+
+def bench_concurrency(server, base_dir: Path, local_dir: Path, levels: list, size: int,
+                      repeat: int) -> list:
+    results = []
+    remote = make_file(base_dir / "payload-concurrency.dat", size).name
+    for clients in levels:
+        sessions = [login(server) for _ in range(clients)]
+        barrier = threading.Barrier(clients + 1)
+        errors = []
+
+        def worker(client, index):
+            client.execute("TYPE", "I")
+            target = str(local_dir / f"concurrent-{index}.dat")
+            barrier.wait()
+            try:
+                for _ in range(repeat):
+                    client.download_file(remote, target)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(client, i)) for i, client in enumerate(sessions)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        for client in sessions:
+            client.quit()
+        if errors:
+            raise errors[0]
+        results.append(result("retr_concurrent", size * clients * repeat / elapsed / 1024 ** 2, "MB/s",
+                              size=format_size(size), clients=clients))
+    (base_dir / remote).unlink()
+    return results
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="p. ej. 1K 1M 4G")
+    parser.add_argument("--types", nargs="+", default=["I", "A"], choices=["A", "I"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-upload", default="1G",
+                        help="tamaño máximo para STOR/APPE (escriben datos reales en disco)")
+    parser.add_argument("--buffers", nargs="+", type=int, default=[4096, 8192, 65536, 262144])
+    parser.add_argument("--buffer-file-size", default="16M")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--concurrency-file-size", default="4M")
+
+
+def run(args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base, \
+            tempfile.TemporaryDirectory(prefix="ftp-bench-local-") as local:
+        base_dir, local_dir = Path(base), Path(local)
+        with running_server(base_dir) as server:
+            results += bench_sizes(server, base_dir, local_dir, [parse_size(s) for s in args.sizes],
+                                   args.types, args.repeat, parse_size(args.max_upload))
+            results += bench_concurrency(server, base_dir, local_dir, args.clients,
+                                         parse_size(args.concurrency_file_size), args.repeat)
+        results += bench_buffers(base_dir, local_dir, args.buffers, parse_size(args.buffer_file_size),
+                                 args.repeat)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""CPU del cliente por GB en RETR/STOR: camino de datos anterior frente al actual.
+
+El camino anterior lee bloques de 4 KB en objetos ``bytes`` nuevos y los
+envía con ``sendall``, y en la descarga crea un ``bytes`` por cada ``recv``.
+El actual sube con ``socket.sendfile`` y descarga con ``recv_into`` sobre un
+único buffer de ``--zerocopy-buffer`` bytes. Se mide el tiempo de CPU del
+hilo del cliente (el servidor corre en otros hilos del mismo proceso) y el
+throughput.
+
+    python -m benchmarks.bench_zerocopy --zerocopy-size 512M --zerocopy-repeat 3
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from FTP.Client.client import FTPClient
+from FTP.Common.constants import DEFAULT_BUFFER_SIZE, DEFAULT_DATA_BUFFER_SIZE
+from benchmarks.bench_transfer import make_file
+from benchmarks.common import (PASSWORD, USER, format_size, login, parse_size, quiet_logging, result,
+                               running_server)
+
+
+class LegacyDataPath(FTPClient):
+    """``FTPClient`` con el camino de datos anterior (bloques ``bytes`` de 4 KB)"""
+
+    def _receive_data(self, local_path: str, offset: int = 0):
+        try:
+            with open(local_path, "wb") as f:
+                while True:
+                    chunk = self.data_sock.recv(self.buffer_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+        finally:
+            self._close_data_connection()
+
+    def _send_data(self, local_path: str):
+        try:
+            with open(local_path, "rb") as f:
+                while True:
+                    chunk = f.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    self.data_sock.sendall(chunk)
+        finally:
+            self._close_data_connection()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--zerocopy-size", default="256M", help="tamaño del fichero transferido")
+    parser.add_argument("--zerocopy-repeat", type=int, default=3)
+    parser.add_argument("--zerocopy-buffer", type=int, default=DEFAULT_DATA_BUFFER_SIZE,
+                        help="tamaño del buffer de recv_into del camino actual")
+
+
+def _measure(client: FTPClient, verb: str, remote: str, local: Path, repeat: int) -> tuple:
+    """Mejor CPU del hilo y mejor tiempo de reloj de ``repeat`` transferencias"""
+    cpu, wall = [], []
+    for i in range(repeat):
+        start_cpu, start = time.thread_time(), time.perf_counter()
+        if verb == "RETR":
+            client.download_file(remote, str(local / "download.dat"))
+        else:
+            client.upload_file(str(local / "upload.dat"), f"upload-{i}.dat")
+        cpu.append(time.thread_time() - start_cpu)
+        wall.append(time.perf_counter() - start)
+        if verb == "STOR":
+            client.delete_file(f"upload-{i}.dat")
+    return min(cpu), min(wall)
+
+
+def run(args) -> list:
+    results = []
+    size = parse_size(args.zerocopy_size)
+    gigabytes = size / 1024 ** 3
+    with tempfile.TemporaryDirectory(prefix="ftp-bench-") as base, \
+            tempfile.TemporaryDirectory(prefix="ftp-bench-local-") as local:
+        base_dir, local_dir = Path(base), Path(local)
+        remote = make_file(base_dir / "payload-zerocopy.dat", size).name
+        make_file(local_dir / "upload.dat", size)
+        with running_server(base_dir) as server:
+            legacy = LegacyDataPath("127.0.0.1", server.port, DEFAULT_BUFFER_SIZE)
+            legacy.connect()
+            legacy.login(USER, PASSWORD)
+            clients = {"legacy": legacy, "zerocopy": login(server, buffer_size=args.zerocopy_buffer)}
+            for path, client in clients.items():
+                client.execute("TYPE", "I")
+                for verb in ("RETR", "STOR"):
+                    cpu, wall = _measure(client, verb, remote, local_dir, args.zerocopy_repeat)
+                    print(f"{verb} {path}: {cpu / gigabytes:.2f} s CPU/GB, "
+                          f"{size / wall / 1024 ** 2:.0f} MB/s", file=sys.stderr)
+                    params = dict(verb=verb, path=path, size=format_size(size),
+                                  buffer=client.buffer_size)
+                    results.append(result("zerocopy_client_cpu", cpu / gigabytes, "s/GB",
+                                          higher_is_better=False, **params))
+                    results.append(result("zerocopy_throughput", size / wall / 1024 ** 2, "MB/s",
+                                          **params))
+                client.quit()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    with quiet_logging():
+        json.dump(run(args), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
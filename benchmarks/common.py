@@ -0,0 +1,122 @@
+"""Utilidades compartidas por los benchmarks: servidor en loopback y cronómetro."""
+import contextlib
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from FTP.Client.client import FTPClient
+from FTP.Common.logger import setup_logging, shutdown_logging
+from FTP.Server.server import FTPServer
+
+USER = "admin"
+PASSWORD = "admin123"
+
+
+@contextlib.contextmanager
+def running_server(base_dir=None, **server_kwargs):
+    """Arranca un ``FTPServer`` en un puerto efímero de loopback"""
+    with contextlib.ExitStack() as stack:
+        if base_dir is None:
+            base_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="ftp-bench-"))
+        server = FTPServer(host="127.0.0.1", port=0, base_dir=base_dir, **server_kwargs)
+        thread = threading.Thread(target=server.start, name="ftp-bench-server", daemon=True)
+        thread.start()
+        if not server.ready.wait(10):
+            raise RuntimeError("El servidor no arrancó")
+        try:
+            yield server
+        finally:
+            server.stop()
+            thread.join(timeout=5)
+
+
+@contextlib.contextmanager
+def quiet_logging(level: str = "WARNING"):
+    """Logging del paquete ``ftp`` a ``os.devnull`` mientras se mide; al salir
+    se detiene y se cierra el fichero"""
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        setup_logging(level=level, stream=sink)
+        try:
+            yield
+        finally:
+            shutdown_logging()
+
+
+def login(server, user: str = USER, password: str = PASSWORD, **client_kwargs) -> FTPClient:
+    """Abre una sesión autenticada contra el servidor de pruebas"""
+    client = FTPClient("127.0.0.1", server.port, **client_kwargs)
+    client.connect()
+    client.execute("USER", user)
+    client.execute("PASS", password)
+    return client
+
+
+def populate(directory, count: int, size: int = 0, prefix: str = "f") -> Path:
+    """Crea ``count`` ficheros de ``size`` bytes en ``directory``"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    payload = b"x" * size
+    for i in range(count):
+        (directory / f"{prefix}{i:07d}.dat").write_bytes(payload)
+    return directory
+
+
+def measure(fn, repeat: int) -> list:
+    """Ejecuta ``fn`` ``repeat`` veces y devuelve las duraciones en segundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples: list, q: float) -> float:
+    """Percentil ``q`` (0-1) por el método del rango más cercano"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """Convierte ``1K``, ``16M``, ``4G``... a bytes"""
+    text = text.strip().upper().rstrip("B")
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ""
+    return int(float(text[:len(text) - len(unit)]) * _SIZE_UNITS[unit])
+
+
+def format_size(size: int) -> str:
+    """Inversa de ``parse_size`` para los nombres de los resultados"""
+    for unit in ("G", "M", "K"):
+        if size >= _SIZE_UNITS[unit] and size % _SIZE_UNITS[unit] == 0:
+            return f"{size // _SIZE_UNITS[unit]}{unit}"
+    return str(size)
+
+
+def result(name: str, value: float, unit: str, higher_is_better: bool = True, **params) -> dict:
+    """Registro de un resultado en el formato común del JSON de la suite"""
+    return {"name": name, "params": params, "value": value, "unit": unit,
+            "higher_is_better": higher_is_better}
+
+
+def environment() -> dict:
+    """Metadatos de la máquina y la revisión medida"""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                  text=True, cwd=Path(__file__).parent, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        revision = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": revision,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
@@ -0,0 +1,71 @@
+"""Compara una ejecución de la suite con una línea base guardada.
+
+Empareja los resultados por nombre y parámetros y marca como regresión todo
+cambio en la dirección mala que supere el umbral (10% por defecto). Sale con
+código 1 si hay alguna regresión, para poder usarlo en CI.
+
+    python -m benchmarks.compare benchmarks/baseline.json current.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+
+
+def result_key(entry: dict) -> tuple:
+    return (entry["name"],) + tuple(sorted((k, str(v)) for k, v in entry["params"].items()))
+
+
+def describe(key: tuple) -> str:
+    name, *params = key
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params)}]" if params else name
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    # Se aceptan tanto el documento de la suite como la lista de un benchmark suelto
+    results = document["results"] if isinstance(document, dict) else document
+    return {result_key(entry): entry for entry in results}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> tuple:
+    """Devuelve ``(filas, regresiones)`` para los resultados comunes"""
+    rows, regressions = [], []
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        if not before["value"]:
+            continue
+        change = (after["value"] - before["value"]) / before["value"]
+        worse = -change if before["higher_is_better"] else change
+        status = "REGRESIÓN" if worse > threshold else ("mejora" if -worse > threshold else "")
+        row = (describe(key), before["value"], after["value"], before["unit"], change, status)
+        rows.append(row)
+        if status == "REGRESIÓN":
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="cambio relativo tolerado")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    rows, regressions = compare(baseline, current, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    for name, before, after, unit, change, status in rows:
+        print(f"{name:<{width}}  {before:>12.3f} -> {after:>12.3f} {unit:<9} {change:+8.1%}  {status}")
+    for key in sorted(baseline.keys() - current.keys()):
+        print(f"{describe(key):<{width}}  ausente en la ejecución actual")
+    for key in sorted(current.keys() - baseline.keys()):
+        print(f"{describe(key):<{width}}  nuevo, sin línea base")
+
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es) por encima del {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
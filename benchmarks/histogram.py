@@ -0,0 +1,87 @@
+"""Histograma de latencias de precisión acotada al estilo HdrHistogram."""
+import math
+from typing import Iterable
+
+
+class HdrHistogram:
+    """Histograma log-lineal de valores enteros (microsegundos).
+
+    Cada potencia de dos se divide en ``sub_bucket_count / 2`` sub-cubetas
+    lineales, así que el error relativo de cualquier percentil queda por
+    debajo de ``10 ** -significant_digits`` sea cual sea la magnitud. El
+    registro es O(1) y el tamaño crece con el logaritmo del valor máximo.
+    """
+
+    def __init__(self, significant_digits: int = 2):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits debe estar entre 1 y 5")
+        self.significant_digits = significant_digits
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.counts = [0] * self.sub_bucket_count
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self.sub_bucket_bits)
+        return bucket * self.sub_bucket_half + (value >> bucket)
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Mayor valor que cae en la cubeta ``index``"""
+        if index < self.sub_bucket_count:
+            return index
+        bucket = index // self.sub_bucket_half - 1
+        sub = index - bucket * self.sub_bucket_half
+        return ((sub + 1) << bucket) - 1
+
+    def record(self, value: int, count: int = 1) -> None:
+        value = max(0, int(value))
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += count
+        self.total += count
+        self.sum += value * count
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def record_seconds(self, seconds: float) -> None:
+        self.record(round(seconds * 1e6))
+
+    def merge(self, other: "HdrHistogram") -> None:
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Histogramas con distinta precisión")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, q: float) -> int:
+        """Valor en el percentil ``q`` (0-100), acotado por el máximo real"""
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def summary(self, percentiles: Iterable[float] = (50, 95, 99, 99.9)) -> dict:
+        """Resumen en microsegundos: cuenta, media, mínimo, máximo y percentiles"""
+        result = {"count": self.total, "mean": self.mean(), "min": self.min or 0, "max": self.max}
+        for q in percentiles:
+            result[f"p{q:g}".replace(".", "")] = self.percentile(q)
+        return result
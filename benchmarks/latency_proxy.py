@@ -0,0 +1,194 @@
+"""Proxy TCP que simula un enlace con latencia y ventana limitada.
+
+Se coloca entre cliente y servidor en loopback: cada bloque se entrega
+``rtt / 2`` segundos después de leerlo y en cada sentido hay como mucho
+``window`` bytes en vuelo, así que una sola conexión queda limitada a unos
+``window / (rtt / 2)`` bytes/s, como un flujo TCP con ventana fija en un
+enlace de alto BDP. Las respuestas 227 se reescriben para que las
+conexiones de datos PASV también pasen por el proxy.
+
+    with LatencyProxy("127.0.0.1", server.port, rtt=0.05) as proxy:
+        client = FTPClient("127.0.0.1", proxy.port)
+"""
+import re
+import socket
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+PASV_REPLY = re.compile(rb"^227 [^\r\n]*?(\d+),(\d+),(\d+),(\d+),(\d+),(\d+)[^\r\n]*", re.MULTILINE)
+
+
+class DelayedPipe:
+    """Copia ``src`` -> ``dst`` con retardo fijo y a lo sumo ``window`` bytes en vuelo."""
+
+    def __init__(self, src: socket.socket, dst: socket.socket, delay: float, window: int,
+                 transform: Optional[Callable[[bytes], bytes]] = None,
+                 on_close: Optional[Callable[[bool], None]] = None):
+        self.src, self.dst = src, dst
+        self.delay = delay
+        self.window = window
+        self.transform = transform
+        self.on_close = on_close
+        self._queue = deque()
+        self._queued = 0
+        self._cond = threading.Condition()
+        self._aborted = False
+        threading.Thread(target=self._read, daemon=True).start()
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def _read(self) -> None:
+        try:
+            while True:
+                chunk = self.src.recv(65536)
+                if not chunk:
+                    break
+                if self.transform:
+                    chunk = self.transform(chunk)
+                with self._cond:
+                    while self._queued >= self.window and not self._aborted:
+                        self._cond.wait()
+                    if self._aborted:
+                        return
+                    self._queue.append((time.monotonic() + self.delay, chunk))
+                    self._queued += len(chunk)
+                    self._cond.notify_all()
+        except OSError:
+            pass
+        finally:
+            with self._cond:
+                self._queue.append((time.monotonic() + self.delay, None))
+                self._cond.notify_all()
+
+    def _write(self) -> None:
+        aborted = False
+        try:
+            while True:
+                with self._cond:
+                    while not self._queue:
+                        self._cond.wait()
+                    due, chunk = self._queue.popleft()
+                wait = due - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                if chunk is None:
+                    self.dst.shutdown(socket.SHUT_WR)
+                    return
+                self.dst.sendall(chunk)
+                with self._cond:
+                    self._queued -= len(chunk)
+                    self._cond.notify_all()
+        except OSError:
+            # El destino cortó (p. ej. un segmento abortado): se propaga el corte
+            aborted = True
+            with self._cond:
+                self._aborted = True
+                self._cond.notify_all()
+        finally:
+            if self.on_close:
+                self.on_close(aborted)
+
+
+class _ProxiedConnection:
+    """Par de sockets unidos por dos ``DelayedPipe``; se cierran al terminar ambos."""
+
+    def __init__(self, client: socket.socket, server: socket.socket, delay: float, window: int,
+                 rewrite: Optional[Callable[[bytes], bytes]] = None):
+        self.sockets = (client, server)
+        self._open = 2
+        self._lock = threading.Lock()
+        DelayedPipe(client, server, delay, window, on_close=self._closed)
+        DelayedPipe(server, client, delay, window, transform=rewrite, on_close=self._closed)
+
+    def _closed(self, aborted: bool) -> None:
+        with self._lock:
+            self._open -= 1
+            done = self._open == 0 or aborted
+        if done:
+            for sock in self.sockets:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+
+class LatencyProxy:
+    """Proxy de control FTP (y de los datos PASV) con RTT simulado."""
+
+    def __init__(self, target_host: str, target_port: int, rtt: float = 0.05,
+                 window: int = 256 * 1024, host: str = "127.0.0.1"):
+        self.target = (target_host, target_port)
+        self.delay = rtt / 2
+        self.window = window
+        self.host = host
+        self.port = 0
+        self._listener: Optional[socket.socket] = None
+        self._running = False
+
+    def start(self) -> "LatencyProxy":
+        self._listener = socket.create_server((self.host, 0))
+        self.port = self._listener.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_control, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._listener:
+            self._listener.close()
+
+    def __enter__(self) -> "LatencyProxy":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _accept_control(self) -> None:
+        while self._running:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            try:
+                server = socket.create_connection(self.target)
+            except OSError:
+                client.close()
+                continue
+            _ProxiedConnection(client, server, self.delay, self.window, rewrite=self._control_rewriter())
+
+    def _control_rewriter(self) -> Callable[[bytes], bytes]:
+        """Reescribe las respuestas 227 de una conexión de control (por líneas completas)"""
+        pending = bytearray()
+
+        def rewrite(chunk: bytes) -> bytes:
+            pending.extend(chunk)
+            end = pending.rfind(b"\n") + 1
+            if not end:
+                return b""
+            lines, pending[:] = bytes(pending[:end]), pending[end:]
+            return PASV_REPLY.sub(self._proxy_data, lines)
+
+        return rewrite
+
+    def _proxy_data(self, match) -> bytes:
+        """Abre un listener para una conexión de datos PASV y devuelve la 227 reescrita"""
+        numbers = [int(n) for n in match.groups()]
+        target = (".".join(map(str, numbers[:4])), (numbers[4] << 8) + numbers[5])
+        listener = socket.create_server((self.host, 0))
+        listener.settimeout(30)
+        port = listener.getsockname()[1]
+
+        def accept():
+            try:
+                client, _ = listener.accept()
+                server = socket.create_connection(target)
+                _ProxiedConnection(client, server, self.delay, self.window)
+            except OSError:
+                pass
+            finally:
+                listener.close()
+
+        threading.Thread(target=accept, daemon=True).start()
+        address = ",".join(self.host.split(".") + [str(port >> 8), str(port & 0xFF)])
+        return f"227 Entering Passive Mode ({address})".encode()
@@ -0,0 +1,310 @@
+"""Generador de carga multicliente con mezclas de operaciones configurables.
+
+Lanza N usuarios simulados (un hilo y una sesión ``FTPClient`` por usuario)
+que eligen cada operación según una mezcla ponderada, por ejemplo 70% RETR
+pequeño, 20% LIST y 10% STOR. Dos modos:
+
+* bucle cerrado (por defecto): cada usuario encadena operaciones, con un
+  tiempo de reflexión opcional entre ellas;
+* bucle abierto (``--rate``): las llegadas siguen un proceso de Poisson con
+  el ritmo indicado y la latencia se mide desde el instante programado, de
+  modo que las colas cuando el servidor no da abasto sí cuentan (sin
+  omisión coordinada).
+
+Sin ``--host`` arranca el servidor del repositorio en loopback con los
+ficheros necesarios, así que funciona sin red. Los percentiles salen de un
+``HdrHistogram`` por operación y se exportan a JSON y/o CSV. Contra un
+servidor externo deben existir ``small/``, ``large/``, ``listing/`` y
+``uploads/`` como los crea ``prepare_fixtures``.
+
+    python -m benchmarks.loadgen --users 8 --duration 30 --mix retr_small:70,list:20,stor:10
+    python -m benchmarks.loadgen --users 16 --rate 200 --profile browse --csv carga.csv
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from FTP.Client.client import FTPClient
+from benchmarks.common import PASSWORD, USER, environment, populate, quiet_logging, running_server
+from benchmarks.histogram import HdrHistogram
+
+PROFILES = {
+    "default": "retr_small:70,list:20,stor:10",
+    "download": "retr_small:50,retr_large:30,list:15,nlst:5",
+    "upload": "stor:60,list:20,retr_small:20",
+    "browse": "list:40,nlst:20,cwd:20,pwd:10,retr_small:10",
+}
+SMALL_FILES = 100
+SMALL_SIZE = 4 * 1024
+LARGE_SIZE = 4 * 1024 ** 2
+UPLOAD_SIZE = 64 * 1024
+
+
+def parse_mix(text: str) -> dict:
+    """Parsea ``op:peso,op:peso`` y valida las operaciones"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition(":")
+        name = name.strip()
+        if name not in SimulatedUser.OPERATIONS:
+            raise ValueError(f"Operación desconocida: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def prepare_fixtures(base_dir: Path) -> None:
+    """Crea en el servidor local los ficheros que usan las operaciones"""
+    populate(base_dir / "small", SMALL_FILES, SMALL_SIZE, prefix="s")
+    populate(base_dir / "large", 1, LARGE_SIZE, prefix="l")
+    populate(base_dir / "listing", 500, prefix="e")
+    (base_dir / "uploads").mkdir(exist_ok=True)
+
+
+class SimulatedUser:
+    """Una sesión de control y las operaciones que puede ejecutar."""
+
+    OPERATIONS = ("retr_small", "retr_large", "stor", "list", "nlst", "cwd", "pwd", "noop")
+
+    def __init__(self, index: int, host: str, port: int, work_dir: Path, user: str, password: str):
+        self.index = index
+        self.address = (host, port)
+        self.credentials = (user, password)
+        self.client = self._connect()
+        self.download_path = str(work_dir / f"download-{index}.dat")
+        self.upload_path = str(work_dir / "upload.dat")
+        self.uploads = 0
+        self.rng = random.Random(index)
+
+    def _connect(self) -> FTPClient:
+        client = FTPClient(*self.address)
+        client.connect()
+        client.execute("USER", self.credentials[0])
+        client.execute("PASS", self.credentials[1])
+        client.execute("TYPE", "I")
+        return client
+
+    def reconnect(self) -> None:
+        """Sustituye una sesión rota para no contaminar las siguientes operaciones"""
+        self.close()
+        self.client = self._connect()
+
+    def run(self, operation: str) -> None:
+        getattr(self, f"op_{operation}")()
+
+    def op_retr_small(self) -> None:
+        self.client.download_file(f"small/s{self.rng.randrange(SMALL_FILES):07d}.dat", self.download_path)
+
+    def op_retr_large(self) -> None:
+        self.client.download_file("large/l0000000.dat", self.download_path)
+
+    def op_stor(self) -> None:
+        self.uploads += 1
+        self.client.upload_file(self.upload_path, f"uploads/u{self.index}-{self.uploads}.dat")
+
+    def op_list(self) -> None:
+        self.client.list_directory("listing")
+
+    def op_nlst(self) -> None:
+        self.client.list_files("listing")
+
+    def op_cwd(self) -> None:
+        self.client.change_dir("listing")
+        self.client.change_to_parent_dir()
+
+    def op_pwd(self) -> None:
+        self.client.get_current_dir()
+
+    def op_noop(self) -> None:
+        self.client.noop()
+
+    def close(self) -> None:
+        try:
+            self.client.quit()
+        except Exception:
+            pass
+
+
+class LoadGenerator:
+    """Reparte las operaciones entre los usuarios y agrega las latencias."""
+
+    def __init__(self, host: str, port: int, work_dir: Path, users: int, mix: dict,
+                 duration: float, rate: float = None, think_time: float = 0.0,
+                 user: str = USER, password: str = PASSWORD, seed: int = 0):
+        self.host, self.port = host, port
+        self.work_dir = work_dir
+        self.users = users
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.duration = duration
+        self.rate = rate
+        self.think_time = think_time
+        self.user, self.password = user, password
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.histograms = {name: HdrHistogram() for name in self.operations}
+        self.errors = {name: 0 for name in self.operations}
+        self.elapsed = 0.0
+
+    def _record(self, local: dict, operation: str, seconds: float, failed: bool) -> None:
+        if failed:
+            with self._lock:
+                self.errors[operation] += 1
+        else:
+            local.setdefault(operation, HdrHistogram()).record_seconds(seconds)
+
+    def _merge(self, local: dict) -> None:
+        with self._lock:
+            for operation, histogram in local.items():
+                self.histograms[operation].merge(histogram)
+
+    def _execute(self, user: SimulatedUser, operation: str) -> bool:
+        try:
+            user.run(operation)
+            return False
+        except Exception:
+            user.reconnect()
+            return True
+
+    def _closed_loop(self, user: SimulatedUser, deadline: float) -> None:
+        local = {}
+        rng = random.Random(user.index)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(self.operations, self.weights)[0]
+            start = time.perf_counter()
+            failed = self._execute(user, operation)
+            self._record(local, operation, time.perf_counter() - start, failed)
+            if self.think_time:
+                time.sleep(rng.expovariate(1 / self.think_time))
+        self._merge(local)
+
+    def _open_loop(self, user: SimulatedUser, arrivals: queue.Queue) -> None:
+        local = {}
+        while True:
+            item = arrivals.get()
+            if item is None:
+                break
+            scheduled, operation = item
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            failed = self._execute(user, operation)
+            # Latencia desde el instante programado, incluida la espera en cola
+            self._record(local, operation, time.perf_counter() - scheduled, failed)
+        self._merge(local)
+
+    def run(self) -> None:
+        sessions = [SimulatedUser(i, self.host, self.port, self.work_dir, self.user, self.password)
+                    for i in range(self.users)]
+        start = time.perf_counter()
+        deadline = start + self.duration
+        if self.rate:
+            arrivals: queue.Queue = queue.Queue()
+            threads = [threading.Thread(target=self._open_loop, args=(s, arrivals)) for s in sessions]
+            for thread in threads:
+                thread.start()
+            scheduled = start
+            while True:
+                scheduled += self.rng.expovariate(self.rate)
+                if scheduled >= deadline:
+                    break
+                arrivals.put((scheduled, self.rng.choices(self.operations, self.weights)[0]))
+            for _ in threads:
+                arrivals.put(None)
+        else:
+            threads = [threading.Thread(target=self._closed_loop, args=(s, deadline)) for s in sessions]
+            for thread in threads:
+                thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+        for session in sessions:
+            session.close()
+
+    def report(self) -> dict:
+        operations = {}
+        for name in self.operations:
+            summary = self.histograms[name].summary()
+            summary["errors"] = self.errors[name]
+            summary["ops_per_sec"] = summary["count"] / self.elapsed if self.elapsed else 0.0
+            operations[name] = summary
+        total = sum(summary["count"] for summary in operations.values())
+        return {
+            "environment": environment(),
+            "config": {"users": self.users, "duration": self.duration, "rate": self.rate,
+                       "think_time": self.think_time,
+                       "mix": dict(zip(self.operations, self.weights))},
+            "elapsed": self.elapsed,
+            "ops_per_sec": total / self.elapsed if self.elapsed else 0.0,
+            "errors": sum(self.errors.values()),
+            "unit": "us",
+            "operations": operations,
+        }
+
+
+CSV_FIELDS = ["operation", "count", "errors", "ops_per_sec", "mean", "min", "p50", "p95", "p99", "p999", "max"]
+
+
+def write_csv(report: dict, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for name, summary in report["operations"].items():
+            writer.writerow({"operation": name, **{key: summary[key] for key in CSV_FIELDS[1:]}})
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", help="servidor externo (por defecto, uno local en loopback)")
+    parser.add_argument("--port", type=int, default=21)
+    parser.add_argument("--user", default=USER)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    parser.add_argument("--mix", help="mezcla explícita op:peso,...; tiene prioridad sobre --profile")
+    parser.add_argument("--rate", type=float, help="bucle abierto: llegadas por segundo")
+    parser.add_argument("--think-time", type=float, default=0.0, help="media en segundos (bucle cerrado)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="fichero JSON (por defecto, stdout)")
+    parser.add_argument("--csv", dest="csv_path")
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix or PROFILES[args.profile])
+
+    with quiet_logging():
+        with tempfile.TemporaryDirectory(prefix="ftp-load-") as work:
+            work_dir = Path(work)
+            (work_dir / "upload.dat").write_bytes(os.urandom(UPLOAD_SIZE))
+            if args.host:
+                host, port = args.host, args.port
+                generator = LoadGenerator(host, port, work_dir, args.users, mix, args.duration,
+                                          args.rate, args.think_time, args.user, args.password, args.seed)
+                generator.run()
+            else:
+                prepare_fixtures(work_dir / "root")
+                with running_server(work_dir / "root") as server:
+                    generator = LoadGenerator("127.0.0.1", server.port, work_dir, args.users, mix,
+                                              args.duration, args.rate, args.think_time, seed=args.seed)
+                    generator.run()
+
+    report = generator.report()
+    if args.csv_path:
+        write_csv(report, args.csv_path)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif not args.csv_path:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
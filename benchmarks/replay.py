@@ -0,0 +1,287 @@
+"""Reproduce sesiones grabadas por ``FTPServer(record_file=...)``.
+
+Cada sesión grabada se reproduce en su propio hilo y conexión, respetando
+los instantes originales de cada comando multiplicados por ``1/--speed``
+(``--speed 0`` envía los comandos sin esperas). Los ficheros se sustituyen
+por datos sintéticos del mismo tamaño: sin ``--host`` se arranca el
+servidor del repositorio sobre un árbol generado a partir de la grabación.
+
+Los comandos PORT se reproducen como PASV (la dirección grabada es la del
+cliente original) y la contraseña, enmascarada en el log, se toma de
+``--password``. La salida usa el formato de ``benchmarks.suite``, así que
+para comparar dos versiones del servidor basta con reproducir la misma
+grabación contra ambas y usar ``benchmarks.compare``:
+
+    python -m benchmarks.replay sesiones.rec --output antes.json
+    python -m benchmarks.replay sesiones.rec --host 10.0.0.5 --port 2121 --speed 4 --output despues.json
+    python -m benchmarks.compare antes.json despues.json
+    python -m benchmarks.replay sesiones.rec --prepare /srv/ftp   # árbol para un servidor externo
+"""
+import argparse
+import json
+import posixpath
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from FTP.Server.metrics import TRANSFER_DIRECTION
+from FTP.Server.recorder import COMMAND_KIND, read_recording
+from benchmarks.common import PASSWORD, environment, quiet_logging, result, running_server
+from benchmarks.histogram import HdrHistogram
+
+# Mismo reparto que las métricas del servidor: "out" descarga, "in" sube
+DOWNLOADS = frozenset(verb for verb, direction in TRANSFER_DIRECTION.items() if direction == "out")
+UPLOADS = frozenset(verb for verb, direction in TRANSFER_DIRECTION.items() if direction == "in")
+LISTINGS = DOWNLOADS - {"RETR"}
+REPLY_LINE = re.compile(r"^(\d{3}) ", re.MULTILINE)
+PASV_ADDRESS = re.compile(r"(\d+),(\d+),(\d+),(\d+),(\d+),(\d+)")
+BLOCK = bytes(64 * 1024)
+
+
+def load_sessions(path) -> dict:
+    """Agrupa los comandos grabados por sesión, en orden"""
+    sessions = defaultdict(list)
+    for event in read_recording(path):
+        if event.kind == COMMAND_KIND:
+            sessions[event.session].append(event)
+    return dict(sessions)
+
+
+def prepare_tree(sessions: dict, root: Path) -> None:
+    """Crea los directorios y ficheros sintéticos que leen las sesiones"""
+    root.mkdir(parents=True, exist_ok=True)
+    for events in sessions.values():
+        cwd = "/"
+        for event in events:
+            verb, _, arg = event.line.partition(" ")
+            verb = verb.upper()
+            target = posixpath.normpath(posixpath.join(cwd, arg)) if arg else cwd
+            local = root / target.lstrip("/")
+            if (verb in ("CWD", "MKD") or verb in LISTINGS) and event.code < 400:
+                local.mkdir(parents=True, exist_ok=True)
+                if verb == "CWD":
+                    cwd = target
+            elif verb == "CDUP" and event.code < 400:
+                cwd = posixpath.dirname(cwd.rstrip("/")) or "/"
+            elif verb in UPLOADS and arg:
+                local.parent.mkdir(parents=True, exist_ok=True)
+            elif verb == "RETR" and arg and event.code < 400:
+                local.parent.mkdir(parents=True, exist_ok=True)
+                if not local.exists() or local.stat().st_size < event.data_bytes:
+                    # Disperso: mismo tamaño sin escribir los datos
+                    with open(local, "wb") as f:
+                        f.truncate(event.data_bytes)
+
+
+class ReplayedSession:
+    """Conexión de control que reproduce los comandos de una sesión grabada."""
+
+    def __init__(self, host: str, port: int, password: str, timeout: float):
+        self.address = (host, port)
+        self.password = password
+        self.sock = socket.create_connection(self.address, timeout=timeout)
+        self.buffer = ""
+        self.passive = None
+        self.data = None
+        self.bytes = 0
+        self.read_reply()
+
+    def read_reply(self) -> str:
+        """Lee una respuesta completa y guarda lo sobrante para la siguiente"""
+        while True:
+            match = REPLY_LINE.search(self.buffer)
+            end = self.buffer.find("\r\n", match.end()) if match else -1
+            if end >= 0:
+                reply, self.buffer = self.buffer[:end], self.buffer[end + 2:]
+                return reply[match.start():]
+            try:
+                chunk = self.sock.recv(65536)
+            except socket.timeout:
+                # Respuestas multilínea sin línea final: se da por terminada
+                reply, self.buffer = self.buffer, ""
+                return reply
+            if not chunk:
+                raise ConnectionError("Conexión de control cerrada")
+            self.buffer += chunk.decode(errors="replace")
+
+    def command(self, line: str) -> str:
+        self.sock.sendall(f"{line}\r\n".encode())
+        return self.read_reply()
+
+    def _open_passive(self) -> None:
+        reply = self.command("PASV")
+        match = PASV_ADDRESS.search(reply)
+        if not match:
+            raise ConnectionError(f"Respuesta PASV inválida: {reply}")
+        numbers = [int(n) for n in match.groups()]
+        self.data = socket.create_connection((".".join(map(str, numbers[:4])), (numbers[4] << 8) + numbers[5]))
+
+    def _close_data(self) -> None:
+        if self.data:
+            self.data.close()
+            self.data = None
+
+    def replay(self, event) -> str:
+        verb, _, arg = event.line.partition(" ")
+        verb = verb.upper()
+        if verb == "PASS":
+            return self.command(f"PASS {self.password}")
+        if verb in ("PASV", "PORT"):
+            self._close_data()
+            self._open_passive()
+            return "227"
+        if verb not in DOWNLOADS and verb not in UPLOADS:
+            return self.command(event.line)
+
+        reply = self.command(event.line)
+        if not reply.startswith("1"):
+            self._close_data()
+            return reply
+        try:
+            if verb in DOWNLOADS:
+                while True:
+                    chunk = self.data.recv(65536)
+                    if not chunk:
+                        break
+                    self.bytes += len(chunk)
+            else:
+                remaining = event.data_bytes
+                while remaining:
+                    sent = self.data.send(BLOCK[:min(remaining, len(BLOCK))])
+                    remaining -= sent
+                    self.bytes += sent
+                self.data.shutdown(socket.SHUT_WR)
+        except OSError:
+            # El servidor cortó la transferencia; su respuesta final lo explica
+            pass
+        finally:
+            self._close_data()
+        return self.read_reply()
+
+    def close(self) -> None:
+        self._close_data()
+        self.sock.close()
+
+
+class Replayer:
+    """Lanza todas las sesiones y acumula latencias por verbo."""
+
+    def __init__(self, sessions: dict, host: str, port: int, password: str, speed: float,
+                 timeout: float = 5.0):
+        self.sessions = sessions
+        self.host, self.port = host, port
+        self.password = password
+        self.speed = speed
+        self.timeout = timeout
+        self.histograms = defaultdict(HdrHistogram)
+        self.code_mismatches = 0
+        self.errors = 0
+        self.commands = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def _run_session(self, events: list, start: float) -> None:
+        local = defaultdict(HdrHistogram)
+        mismatches = errors = 0
+        origin = events[0].offset_us
+        session = None
+        try:
+            session = ReplayedSession(self.host, self.port, self.password, self.timeout)
+            for event in events:
+                if self.speed:
+                    delay = start + (event.offset_us - origin) / 1e6 / self.speed - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                verb = event.line.partition(" ")[0].upper()
+                began = time.perf_counter()
+                reply = session.replay(event)
+                local[verb].record_seconds(time.perf_counter() - began)
+                if event.code and verb not in ("PASV", "PORT") and reply[:3] != str(event.code):
+                    mismatches += 1
+        except (OSError, ConnectionError):
+            errors += 1
+        finally:
+            if session:
+                session.close()
+        with self._lock:
+            for verb, histogram in local.items():
+                self.histograms[verb].merge(histogram)
+            self.code_mismatches += mismatches
+            self.errors += errors
+            self.commands += sum(h.total for h in local.values())
+            self.bytes += session.bytes if session else 0
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._run_session, args=(events, start))
+                   for events in self.sessions.values() if events]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+    def results(self) -> list:
+        results = [
+            result("replay_commands_per_sec", self.commands / self.elapsed, "cmd/s", speed=self.speed),
+            result("replay_throughput", self.bytes / self.elapsed / 1024 ** 2, "MB/s", speed=self.speed),
+        ]
+        for verb, histogram in sorted(self.histograms.items()):
+            for q in (50, 95, 99):
+                results.append(result("replay_latency", histogram.percentile(q) / 1000, "ms",
+                                      higher_is_better=False, verb=verb, stat=f"p{q}", speed=self.speed))
+        return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--host", help="servidor externo (por defecto, uno local en loopback)")
+    parser.add_argument("--port", type=int, default=21)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = tiempo real, 0 = sin esperas")
+    parser.add_argument("--prepare", metavar="DIR", help="solo generar el árbol sintético en DIR")
+    parser.add_argument("--output", "-o")
+    args = parser.parse_args(argv)
+
+    sessions = load_sessions(args.recording)
+    if args.prepare:
+        prepare_tree(sessions, Path(args.prepare))
+        return
+
+    with quiet_logging():
+        if args.host:
+            replayer = Replayer(sessions, args.host, args.port, args.password, args.speed)
+            replayer.run()
+        else:
+            with tempfile.TemporaryDirectory(prefix="ftp-replay-") as root:
+                prepare_tree(sessions, Path(root))
+                with running_server(root) as server:
+                    replayer = Replayer(sessions, "127.0.0.1", server.port, args.password, args.speed)
+                    replayer.run()
+
+    document = {
+        "environment": environment(),
+        "recording": {"path": args.recording, "sessions": len(sessions),
+                      "commands": sum(len(events) for events in sessions.values())},
+        "errors": replayer.errors,
+        "code_mismatches": replayer.code_mismatches,
+        "results": replayer.results(),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Suite completa de benchmarks de loopback con salida JSON.
+
+Ejecuta transferencias, listados e inicios de sesión contra un ``FTPServer``
+en un puerto efímero y escribe un único documento JSON con los metadatos de
+la máquina y la lista de resultados, apto para ``benchmarks.compare``.
+
+    python -m benchmarks.suite --output benchmarks/baseline.json
+    python -m benchmarks.suite --output current.json --only transfer listing
+    python -m benchmarks.compare benchmarks/baseline.json current.json
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import (bench_batch, bench_list_logging, bench_listing, bench_login, bench_metrics_overhead,
+                        bench_parsers, bench_pipeline, bench_pool, bench_segmented, bench_startup,
+                        bench_transfer, bench_zerocopy)
+from benchmarks.common import environment, quiet_logging
+
+BENCHMARKS = {
+    "transfer": bench_transfer,
+    "listing": bench_listing,
+    "login": bench_login,
+    "parsers": bench_parsers,
+    "pool": bench_pool,
+    "batch": bench_batch,
+    "segmented": bench_segmented,
+    "pipeline": bench_pipeline,
+    "zerocopy": bench_zerocopy,
+    "startup": bench_startup,
+    "metrics_overhead": bench_metrics_overhead,
+    "list_logging": bench_list_logging,
+}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", "-o", help="fichero JSON de salida (por defecto, stdout)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    for module in BENCHMARKS.values():
+        module.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.only:
+        print(f"Ejecutando {name}...", file=sys.stderr)
+        # Por benchmark: list_logging configura y retira su propio logging
+        with quiet_logging():
+            results += BENCHMARKS[name].run(args)
+
+    document = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from benchmarks.common import login, populate, running_server
+
+
+def test_mget_skips_directories_and_reports_bytes(tmp_path):
+    remote = tmp_path / "remote"
+    populate(remote, 3, 64 * 1024)
+    (remote / "sub.dat").mkdir()
+    calls = []
+    with running_server(remote) as server:
+        client = login(server)
+        result = client.mget(["*.dat"], str(tmp_path / "local"), workers=2,
+                             progress=lambda *args: calls.append(args[1:]))
+        client.close()
+    assert len(result.jobs) == 3 and not result.failed
+    # Además del aviso por archivo llegan los bytes de cada sesión
+    assert len(calls) > 3
+    assert calls[-1] == (3, 3, 3 * 64 * 1024, 3 * 64 * 1024)
+
+
+def test_mput_replaces_existing_files(tmp_path):
+    remote, local = tmp_path / "remote", tmp_path / "local"
+    remote.mkdir()
+    populate(local, 2, 1024)
+    paths = sorted(str(path) for path in local.iterdir())
+    with running_server(remote) as server:
+        client = login(server)
+        assert not client.mput(paths).failed
+        local.joinpath("f0000000.dat").write_bytes(b"nuevo")
+        assert not client.mput(paths).failed
+        client.close()
+    assert sorted(path.name for path in remote.iterdir()) == ["f0000000.dat", "f0000001.dat"]
+    assert remote.joinpath("f0000000.dat").read_bytes() == b"nuevo"
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from benchmarks.common import login, running_server
+from FTP.Client.cache import ListingCache, absolute_path
+
+
+def filled_cache(ttl: float = 30.0) -> ListingCache:
+    cache = ListingCache(ttl)
+    for path in ("/", "/a", "/a/b", "/a/b/c", "/a/bc", "/x"):
+        cache.put("LIST", path, [path])
+        cache.put("NLST", path, path)
+    return cache
+
+
+def cached_paths(cache: ListingCache, kind: str = "LIST") -> set:
+    return {path for path in ("/", "/a", "/a/b", "/a/b/c", "/a/bc", "/x") if cache.get(kind, path) is not None}
+
+
+def test_invalidate_drops_path_parent_and_descendants():
+    cache = filled_cache()
+    cache.invalidate("/a/b")
+    # "/a/bc" comparte prefijo de texto pero no cuelga de "/a/b"
+    assert cached_paths(cache) == {"/", "/a/bc", "/x"}
+    assert cached_paths(cache, "NLST") == {"/", "/a/bc", "/x"}
+    assert cache.invalidations == 6
+
+
+def test_invalidate_everything():
+    cache = filled_cache()
+    cache.invalidate()
+    assert cached_paths(cache) == set()
+
+
+def test_invalidate_entry_only_touches_one_kind():
+    cache = filled_cache()
+    cache.invalidate_entry("LIST", "/a")
+    assert cache.get("LIST", "/a") is None
+    assert cache.get("NLST", "/a") == "/a"
+
+
+def test_entries_expire_after_ttl():
+    cache = filled_cache(ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("LIST", "/") is None
+    assert cache.stats()["entries"] == 11
+
+
+def test_absolute_path():
+    assert absolute_path("/a", "b/../c") == "/a/c"
+    assert absolute_path("/a", "/x") == "/x"
+    assert absolute_path(None, "") == "/"
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("a")
+    (tmp_path / "local.txt").write_text("nuevo")
+    with running_server(tmp_path) as server:
+        client = login(server)
+        client.enable_cache()
+        yield client, tmp_path
+        client.close()
+
+
+def test_client_changes_invalidate_cached_listing(client):
+    client, root = client
+    assert client.list_files("docs").split() == ["a.txt"]
+    # Un cambio hecho por otro cliente no se ve hasta que caduca la entrada
+    (root / "docs" / "b.txt").write_text("b")
+    assert client.list_files("docs").split() == ["a.txt"]
+    assert client.cache.hits == 1
+
+    # Un cambio del propio cliente invalida el directorio afectado
+    client.upload_file(str(root / "local.txt"), "docs/c.txt")
+    assert sorted(client.list_files("docs").split()) == ["a.txt", "b.txt", "c.txt"]
+    client.delete_file("docs/a.txt")
+    assert sorted(client.list_files("docs").split()) == ["b.txt", "c.txt"]
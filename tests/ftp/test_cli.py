@@ -0,0 +1,21 @@
+from FTP.Client.cli.FTPCLI import FTPCLI
+from FTP.Client.client import FTPClient
+
+
+def test_keepalive_can_be_replaced_and_disabled_while_active():
+    client = FTPClient("127.0.0.1")
+    cli = FTPCLI(client)
+    try:
+        cli.onecmd("keepalive 5")
+        first = cli.keepalive
+        assert first is not None and first.client is client
+
+        cli.onecmd("keepalive 10")
+        assert cli.keepalive is not first and cli.keepalive.interval == 10
+
+        cli.onecmd("keepalive off")
+        assert cli.keepalive is None
+        assert client.tcp_keepalive is None
+    finally:
+        if cli.keepalive is not None:
+            cli.keepalive.stop()
@@ -0,0 +1,113 @@
+import socket
+import struct
+
+import pytest
+
+from benchmarks.common import login, running_server
+
+PAYLOAD = bytes(range(256)) * 256
+
+
+class FlakySocket:
+    """Socket de datos que se corta tras ``chunks`` lecturas"""
+
+    def __init__(self, sock, chunks: int):
+        self._sock = sock
+        self._chunks = chunks
+
+    def recv_into(self, buffer):
+        if self._chunks == 0:
+            raise ConnectionResetError("corte simulado")
+        self._chunks -= 1
+        return self._sock.recv_into(buffer)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "remote").mkdir()
+    (tmp_path / "remote" / "data.bin").write_bytes(PAYLOAD)
+    with running_server(tmp_path / "remote") as server:
+        client = login(server, buffer_size=4096)
+        client.execute("TYPE", "I")
+        client.enable_retry(retries=2, base_delay=0.01, max_delay=0.01)
+        yield client
+        client.close()
+
+
+def test_failure_before_data_does_not_resume_from_stale_file(client, tmp_path, monkeypatch):
+    local = tmp_path / "data.bin"
+    local.write_bytes(b"viejo" * 3000)
+    setup = client._setup_data_connection
+    calls = []
+
+    def failing_setup():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionResetError("corte antes del 150")
+        return setup()
+
+    monkeypatch.setattr(client, "_setup_data_connection", failing_setup)
+    client.download_file("data.bin", str(local))
+    assert local.read_bytes() == PAYLOAD
+    assert client.retry_metrics.resumes == 0
+
+
+def test_cut_download_resumes_from_bytes_written(client, tmp_path, monkeypatch):
+    local = tmp_path / "data.bin"
+    accept = client._accept_data_connection
+    calls = []
+
+    def flaky_accept():
+        accept()
+        calls.append(1)
+        if len(calls) == 1:
+            client.data_sock = FlakySocket(client.data_sock, chunks=3)
+
+    monkeypatch.setattr(client, "_accept_data_connection", flaky_accept)
+    client.download_file("data.bin", str(local))
+    assert local.read_bytes() == PAYLOAD
+    assert client.retry_metrics.resumes == 1
+    assert 0 < client.retry_metrics.resumed_bytes < len(PAYLOAD)
+
+
+class CutUploadSocket:
+    """Socket de datos que envía ``limit`` bytes y se corta (con RST si ``reset``)"""
+
+    def __init__(self, sock, limit: int, reset: bool):
+        self._sock = sock
+        self._limit = limit
+        self._reset = reset
+
+    def sendfile(self, f, offset=0, count=None):
+        f.seek(offset)
+        self._sock.sendall(f.read(self._limit))
+        if self._reset:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        raise ConnectionResetError("corte simulado")
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+@pytest.mark.parametrize("reset", [True, False], ids=["server-426", "lost-226"])
+def test_cut_upload_is_sent_again_under_the_same_name(client, tmp_path, monkeypatch, reset):
+    local = tmp_path / "up.bin"
+    local.write_bytes(PAYLOAD)
+    accept = client._accept_data_connection
+    calls = []
+
+    def flaky_accept():
+        accept()
+        calls.append(1)
+        if len(calls) == 1:
+            client.data_sock = CutUploadSocket(client.data_sock, 8192, reset)
+
+    monkeypatch.setattr(client, "_accept_data_connection", flaky_accept)
+    client.upload_file(str(local), "up.bin")
+    remote = tmp_path / "remote"
+    assert sorted(path.name for path in remote.iterdir()) == ["data.bin", "up.bin"]
+    assert (remote / "up.bin").read_bytes() == PAYLOAD
+    assert client.retry_metrics.retries == 1
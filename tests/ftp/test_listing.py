@@ -0,0 +1,14 @@
+from benchmarks.common import login, populate, running_server
+
+ENTRIES = 20000
+
+
+def test_large_listings_arrive_complete(tmp_path):
+    populate(tmp_path / "big", ENTRIES)
+    with running_server(tmp_path) as server:
+        client = login(server)
+        client.execute("TYPE", "I")
+        assert len(client.list_files("big").split()) == ENTRIES
+        assert len(list(client.iter_directory("big"))) == ENTRIES
+        assert len(list(client.iter_mlsd("big"))) == ENTRIES
+        client.close()
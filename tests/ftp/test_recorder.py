@@ -0,0 +1,32 @@
+import time
+
+from FTP.Common.utils import mask_secrets
+from FTP.Server.recorder import COMMAND_KIND, SessionRecorder, read_recording
+
+PASSWORDS = ("S3cretPW", "0ldPW", "N3wPW", "hunter2")
+
+
+def test_mask_secrets_keeps_verb_and_user():
+    assert mask_secrets("PASS hunter2") == "PASS ****"
+    assert mask_secrets("site adduser bob S3cretPW") == "site adduser bob ****"
+    assert mask_secrets("SITE PASSRESET bob 0ldPW N3wPW") == "SITE PASSRESET bob **** ****"
+    assert mask_secrets("SITE REMOVEUSER bob") == "SITE REMOVEUSER bob"
+    assert mask_secrets("RETR PASSWORDS.txt") == "RETR PASSWORDS.txt"
+
+
+def test_recording_contains_no_passwords(tmp_path):
+    path = tmp_path / "session.rec"
+    recorder = SessionRecorder(path)
+    session = recorder.open_session()
+    for line in ("USER admin", "PASS hunter2", "SITE ADDUSER bob S3cretPW",
+                 "SITE PASSRESET bob 0ldPW N3wPW", "PWD"):
+        recorder.command(session, time.monotonic(), line, 200, 1000, 0)
+    recorder.close_session(session)
+    recorder.close()
+
+    lines = [event.line for event in read_recording(path) if event.kind == COMMAND_KIND]
+    assert lines == ["USER admin", "PASS ****", "SITE ADDUSER bob ****",
+                     "SITE PASSRESET bob **** ****", "PWD"]
+    raw = path.read_bytes()
+    for password in PASSWORDS:
+        assert password.encode() not in raw
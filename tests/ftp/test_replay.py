@@ -0,0 +1,23 @@
+from benchmarks.replay import DOWNLOADS, LISTINGS, UPLOADS, prepare_tree
+from FTP.Server.metrics import TRANSFER_DIRECTION
+from FTP.Server.recorder import RecordedEvent
+
+
+def test_direction_sets_match_server_metrics():
+    assert DOWNLOADS == {"RETR", "LIST", "NLST", "MLSD"}
+    assert UPLOADS == {"STOR", "STOU", "APPE"}
+    assert DOWNLOADS | UPLOADS == set(TRANSFER_DIRECTION)
+    assert not DOWNLOADS & UPLOADS
+    assert LISTINGS == {"LIST", "NLST", "MLSD"}
+
+
+def test_prepare_tree_creates_listed_directories(tmp_path):
+    def event(line, code=226, data_bytes=0):
+        return RecordedEvent(2, 1, 0, line, code, 0, data_bytes)
+
+    sessions = {1: [event("MLSD docs"), event("CWD pub", 250), event("RETR a.bin", data_bytes=1024),
+                    event("LIST missing", 550)]}
+    prepare_tree(sessions, tmp_path)
+    assert (tmp_path / "docs").is_dir()
+    assert (tmp_path / "pub" / "a.bin").stat().st_size == 1024
+    assert not (tmp_path / "missing").exists()
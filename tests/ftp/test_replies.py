@@ -0,0 +1,68 @@
+import socket
+
+import pytest
+
+from FTP.Client.client import FTPClient
+from FTP.Common.exceptions import FTPConnectionError
+
+
+@pytest.fixture
+def wired():
+    """Cliente cuyo canal de control es un extremo de un socketpair"""
+    client_end, server_end = socket.socketpair()
+    client = FTPClient("127.0.0.1")
+    client.control_sock = client_end
+    yield client, server_end
+    client_end.close()
+    server_end.close()
+
+
+def test_single_line_reply(wired):
+    client, server = wired
+    server.sendall(b"200 Command okay\r\n")
+    assert client._get_response() == "200 Command okay"
+
+
+def test_multiline_reply_ends_at_same_code_with_space(wired):
+    client, server = wired
+    server.sendall(b"211-Features:\r\n MDTM\r\n211-no es el final\r\n226 otro codigo\r\n SIZE\r\n211 End\r\n")
+    assert client._get_response().splitlines() == [
+        "211-Features:", " MDTM", "211-no es el final", "226 otro codigo", " SIZE", "211 End"]
+
+
+def test_bare_code_terminates_multiline_reply(wired):
+    client, server = wired
+    server.sendall(b"211-Status\r\n texto\r\n211\r\n200 siguiente\r\n")
+    assert client._get_response().splitlines() == ["211-Status", " texto", "211"]
+    assert client._get_response() == "200 siguiente"
+
+
+def test_pipelined_replies_stay_buffered(wired):
+    client, server = wired
+    server.sendall(b"331 Password required\r\n230-Bienvenido\r\n230 Logged in\r\n257 \"/\"\r\n")
+    assert client._get_response() == "331 Password required"
+    assert client._get_response() == "230-Bienvenido\r\n230 Logged in"
+    assert client._get_response() == '257 "/"'
+
+
+def test_reply_split_across_reads(wired):
+    client, server = wired
+    server.sendall(b"150 Opening data conn")
+    server.sendall(b"ection\r\n2")
+    server.sendall(b"26 Transfer complete\n")
+    assert client._get_response() == "150 Opening data connection"
+    assert client._get_response() == "226 Transfer complete"
+
+
+def test_unknown_code_with_dash_is_a_single_line(wired):
+    client, server = wired
+    server.sendall(b"999-raro\r\n200 ok\r\n")
+    assert client._get_response() == "999-raro"
+    assert client._get_response() == "200 ok"
+
+
+def test_closed_connection_raises(wired):
+    client, server = wired
+    server.close()
+    with pytest.raises(FTPConnectionError):
+        client._get_response()
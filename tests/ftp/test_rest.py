@@ -0,0 +1,87 @@
+import re
+import socket
+
+import pytest
+
+from benchmarks.common import PASSWORD, USER, running_server
+
+PAYLOAD = bytes(range(256)) * 16
+
+
+class RawSession:
+    """Sesión de control mínima para ver las respuestas tal cual"""
+
+    def __init__(self, port: int):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+        self.reader = self.sock.makefile("rb")
+        self.reader.readline()
+
+    def command(self, line: str) -> str:
+        self.sock.sendall(line.encode() + b"\r\n")
+        return self.reader.readline().decode().strip()
+
+    def retr(self, name: str):
+        """RETR por PASV: respuesta final y datos recibidos"""
+        port = re.search(r"(\d+),(\d+)\)", self.command("PASV")).groups()
+        data = socket.create_connection(("127.0.0.1", int(port[0]) * 256 + int(port[1])), timeout=10)
+        reply = self.command(f"RETR {name}")
+        received = b""
+        if reply.startswith("150"):
+            while True:
+                chunk = data.recv(65536)
+                if not chunk:
+                    break
+                received += chunk
+            reply = self.reader.readline().decode().strip()
+        data.close()
+        return reply, received
+
+    def close(self) -> None:
+        self.reader.close()
+        self.sock.close()
+
+
+@pytest.fixture
+def session(tmp_path):
+    (tmp_path / "data.bin").write_bytes(PAYLOAD)
+    with running_server(tmp_path) as server:
+        session = RawSession(server.port)
+        assert session.command(f"USER {USER}").startswith("331")
+        assert session.command(f"PASS {PASSWORD}").startswith("230")
+        yield session
+        session.close()
+
+
+def test_rest_resumes_binary_download(session):
+    session.command("TYPE I")
+    assert session.command("REST 1000").startswith("350")
+    reply, data = session.retr("data.bin")
+    assert reply.startswith("226") and data == PAYLOAD[1000:]
+
+
+def test_rest_past_end_of_file_is_554(session):
+    session.command("TYPE I")
+    assert session.command(f"REST {len(PAYLOAD) + 1}").startswith("350")
+    reply, data = session.retr("data.bin")
+    assert reply.startswith("554") and data == b""
+    # REST solo afecta a la transferencia siguiente
+    reply, data = session.retr("data.bin")
+    assert reply.startswith("226") and data == PAYLOAD
+
+
+def test_rest_at_end_of_file_sends_nothing(session):
+    session.command("TYPE I")
+    session.command(f"REST {len(PAYLOAD)}")
+    reply, data = session.retr("data.bin")
+    assert reply.startswith("226") and data == b""
+
+
+def test_rest_in_ascii_mode_is_504(session):
+    session.command("TYPE A")
+    assert session.command("REST 10").startswith("350")
+    reply, data = session.retr("data.bin")
+    assert reply.startswith("504") and data == b""
+
+
+def test_rest_requires_a_number(session):
+    assert session.command("REST abc").startswith("501")
@@ -0,0 +1,37 @@
+import errno
+import socket
+
+import pytest
+
+from FTP.Client.retry import is_transient
+from FTP.Common.exceptions import FTPAuthError, FTPClientError, FTPConnectionError, FTPTransferError
+
+
+@pytest.mark.parametrize("error", [
+    ConnectionResetError(),
+    BrokenPipeError(),
+    ConnectionRefusedError(),
+    socket.timeout(),
+    TimeoutError(),
+    OSError(errno.EHOSTUNREACH, "No route to host"),
+    FTPConnectionError(421, "Servicio no disponible"),
+    FTPClientError(425, "No se puede abrir la conexión de datos"),
+    FTPTransferError(426, "Conexión cerrada; transferencia abortada"),
+    FTPClientError(450, "Archivo no disponible"),
+])
+def test_network_errors_and_4xx_are_transient(error):
+    assert is_transient(error)
+
+
+@pytest.mark.parametrize("error", [
+    FileNotFoundError(errno.ENOENT, "No such file or directory"),
+    PermissionError(errno.EACCES, "Permission denied"),
+    IsADirectoryError(errno.EISDIR, "Is a directory"),
+    NotADirectoryError(errno.ENOTDIR, "Not a directory"),
+    OSError(errno.ENOSPC, "No space left on device"),
+    FTPClientError(550, "Archivo no encontrado"),
+    FTPAuthError(530, "No autenticado"),
+    ValueError("argumento inválido"),
+])
+def test_local_and_permanent_errors_are_not_transient(error):
+    assert not is_transient(error)
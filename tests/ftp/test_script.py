@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks.common import login, running_server
+from FTP.Client.script import parse_script, run_script
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("bb")
+    with running_server(tmp_path) as server:
+        client = login(server)
+        yield client
+        client.close()
+
+
+def test_listings_use_a_data_connection(client):
+    commands = parse_script(["LIST", "NLST docs", "MLSD", "PWD", "LIST missing"])
+    results, _ = run_script(client, commands)
+    listing, names, mlsd, pwd, missing = results
+    assert listing.ok and listing.code == 226 and "b.txt" in listing.response
+    assert names.ok and names.response.split() == ["a.txt"]
+    assert mlsd.ok and "type=dir" in mlsd.response and "b.txt" in mlsd.response
+    # La sesión sigue sincronizada tras los listados
+    assert pwd.code == 257
+    assert not missing.ok and missing.code >= 400
+
+
+def test_listing_rejects_extra_arguments(client):
+    (result,), _ = run_script(client, parse_script(["NLST a b"]))
+    assert not result.ok and "una ruta" in result.error
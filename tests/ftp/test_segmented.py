@@ -0,0 +1,17 @@
+from benchmarks.common import login, populate, running_server
+
+SIZE = 3 * 1024 * 1024
+
+
+def test_segmented_download_only_in_binary(tmp_path):
+    populate(tmp_path / "remote", 1, SIZE)
+    local = tmp_path / "local.dat"
+    with running_server(tmp_path / "remote") as server:
+        client = login(server)
+        client.set_type("I")
+        assert "segments" in client.download_file("f0000000.dat", str(local), segments=3)
+        assert local.stat().st_size == SIZE
+        # En ASCII los offsets de SIZE no valen: descarga normal
+        client.set_type("A")
+        assert "segments" not in client.download_file("f0000000.dat", str(local), segments=3)
+        client.close()
@@ -0,0 +1,23 @@
+from benchmarks.common import login, running_server
+from FTP.Server.Commands.base_command import Command
+
+
+class FailingTransfer(Command):
+    """RETR que abre la conexión de datos y falla con una excepción"""
+
+    def execute(self, server, client_socket, args):
+        server.create_data_connection()
+        raise RuntimeError("fallo simulado")
+
+
+def test_failed_command_still_records_latency_and_closes_transfer(tmp_path):
+    with running_server(tmp_path) as server:
+        server.commands["RETR"] = FailingTransfer()
+        client = login(server)
+        client.enter_passive_mode()
+        response = client.send_command("RETR", "x")
+        assert response.startswith("500")
+        snapshot = server.metrics.snapshot()
+        assert snapshot["latency"]["RETR"].count == 1
+        assert snapshot["data_connections_active"] == 0
+        client.close()